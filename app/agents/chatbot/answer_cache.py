@@ -0,0 +1,152 @@
+import math
+import re
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.agents.chatbot.routing import normalize_message
+from app.core import data_version
+from app.core.config import settings
+
+VECTOR_DIMENSIONS = 1 << 18
+WORD_PATTERN = re.compile(r"\w+")
+# Words that don't change what a question asks for; every other word must match
+STOPWORDS = frozenset(
+    "a an the my me i we our is are was were be do does did can could would will you your "
+    "please show list give tell get find see what which who whom whose how of for to in on "
+    "at by from about with there any all some this that these those".split()
+)
+
+
+def vectorize(text: str) -> dict[int, float]:
+    """Hashed word and character-trigram features of a normalized question, L2-normalized.
+
+    A cheap local stand-in for an embedding model, used only to rank entries
+    that already share every content word (see content_words).
+    """
+    features: dict[int, float] = {}
+    for word in WORD_PATTERN.findall(text):
+        key = zlib.crc32(b"w:" + word.encode()) % VECTOR_DIMENSIONS
+        features[key] = features.get(key, 0.0) + 1.0
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            key = zlib.crc32(b"c:" + padded[i:i + 3].encode()) % VECTOR_DIMENSIONS
+            features[key] = features.get(key, 0.0) + 0.5
+
+    norm = math.sqrt(sum(v * v for v in features.values())) or 1.0
+    return {k: v / norm for k, v in features.items()}
+
+
+def content_words(text: str) -> frozenset[str]:
+    """The words of a normalized question that carry its meaning, numbers included."""
+    return frozenset(w for w in WORD_PATTERN.findall(text) if w not in STOPWORDS)
+
+
+def cosine(a: dict[int, float], b: dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+@dataclass
+class CachedAnswer:
+    question: str
+    content: frozenset[str]
+    vector: dict[int, float]
+    answer: str
+    version: int
+    expires_at: float
+
+
+class AnswerCache:
+    """Final chatbot answers to first-turn questions, per user.
+
+    Looked up by normalized question text. With `similarity` > 0 it falls back
+    to the most similar cached question above that score, but only among
+    questions with exactly the same content words: fuzzy matching absorbs
+    stopword and word-order differences ("show my top 5 for backend" /
+    "backend top 5"), never a changed word, so "shortlisted" never serves
+    "rejected" and "top 5" never serves "top 3". Entries are only valid for
+    the data version they were answered at.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, similarity: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self._entries: OrderedDict[tuple[int, str], CachedAnswer] = OrderedDict()
+        self._by_user: dict[int, dict[str, CachedAnswer]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int, question: str) -> str | None:
+        normalized = normalize_message(question)
+        version = data_version.get_data_version(user_id)
+        now = time.monotonic()
+
+        entry = self._entries.get((user_id, normalized))
+        if entry is None and self.similarity > 0:
+            entry = self._most_similar(user_id, normalized)
+
+        if entry is None or entry.version != version or entry.expires_at < now:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((user_id, entry.question))
+        self.hits += 1
+        return entry.answer
+
+    def put(self, user_id: int, question: str, answer: str, version: int) -> None:
+        """Store an answer computed at `version` (read before the turn started)."""
+        if version != data_version.get_data_version(user_id):
+            return
+        normalized = normalize_message(question)
+        entry = CachedAnswer(
+            question=normalized,
+            content=content_words(normalized),
+            vector=vectorize(normalized) if self.similarity > 0 else {},
+            answer=answer,
+            version=version,
+            expires_at=time.monotonic() + self.ttl_seconds,
+        )
+        self._entries[(user_id, normalized)] = entry
+        self._entries.move_to_end((user_id, normalized))
+        self._by_user.setdefault(user_id, {})[normalized] = entry
+        while len(self._entries) > self.max_entries:
+            (old_user, old_question), _ = self._entries.popitem(last=False)
+            self._drop_from_index(old_user, old_question)
+
+    def invalidate(self, user_id: int, version: int | None = None, changes: list | None = None) -> None:
+        """Drop a user's answers (data_version listener)."""
+        for question in self._by_user.pop(user_id, {}):
+            self._entries.pop((user_id, question), None)
+
+    def _most_similar(self, user_id: int, normalized: str) -> CachedAnswer | None:
+        candidates = self._by_user.get(user_id)
+        if not candidates:
+            return None
+        content = content_words(normalized)
+        vector = vectorize(normalized)
+        best, best_score = None, self.similarity
+        for entry in candidates.values():
+            if entry.content != content:
+                continue
+            score = cosine(vector, entry.vector)
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
+
+    def _drop_from_index(self, user_id: int, question: str) -> None:
+        questions = self._by_user.get(user_id)
+        if questions is not None:
+            questions.pop(question, None)
+            if not questions:
+                del self._by_user[user_id]
+
+
+answer_cache = AnswerCache(
+    max_entries=settings.CHAT_ANSWER_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CHAT_ANSWER_CACHE_TTL_SECONDS,
+    similarity=settings.CHAT_ANSWER_CACHE_SIMILARITY,
+)
+data_version.subscribe(answer_cache.invalidate)
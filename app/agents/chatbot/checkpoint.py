@@ -0,0 +1,140 @@
+import logging
+from contextlib import AsyncExitStack
+
+from langchain_core.messages import AIMessage, BaseMessage, RemoveMessage, ToolMessage
+from langgraph.checkpoint.base import BaseCheckpointSaver
+
+from app.agents.chatbot.context import split_turns
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PRUNED_TOOL_RESULT = "[Earlier tool result pruned — call the tool again if you need this data.]"
+
+_exit_stack: AsyncExitStack | None = None
+
+
+async def open_checkpointer() -> BaseCheckpointSaver | None:
+    """Open the checkpointer selected by CHAT_CHECKPOINTER and create its tables.
+
+    Backends: "none" (default; turns are rebuilt from stored messages),
+    "memory" (single process, lost on restart), "sqlite" (local dev) or
+    "postgres" (separate pool of CHAT_CHECKPOINT_POOL_SIZE connections; its
+    tables are created here, not by alembic).
+    """
+    global _exit_stack
+    backend = settings.CHAT_CHECKPOINTER.lower()
+
+    if backend == "none":
+        return None
+
+    if backend == "memory":
+        from langgraph.checkpoint.memory import InMemorySaver
+
+        return InMemorySaver()
+
+    _exit_stack = AsyncExitStack()
+
+    if backend == "sqlite":
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        saver = await _exit_stack.enter_async_context(
+            AsyncSqliteSaver.from_conn_string(settings.CHAT_CHECKPOINT_SQLITE_PATH)
+        )
+    elif backend == "postgres":
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+        from psycopg.rows import dict_row
+        from psycopg_pool import AsyncConnectionPool
+
+        pool = AsyncConnectionPool(
+            settings.DATABASE_URL,
+            max_size=settings.CHAT_CHECKPOINT_POOL_SIZE,
+            kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+            open=False,
+        )
+        await pool.open()
+        _exit_stack.push_async_callback(pool.close)
+        saver = AsyncPostgresSaver(pool)  # type: ignore[arg-type]
+    else:
+        raise ValueError(f"Unknown CHAT_CHECKPOINTER backend: {settings.CHAT_CHECKPOINTER}")
+
+    await saver.setup()
+    logger.info("Chat checkpointer ready (%s)", backend)
+    return saver
+
+
+async def close_checkpointer() -> None:
+    """Release connections held by the checkpointer."""
+    global _exit_stack
+    if _exit_stack is not None:
+        await _exit_stack.aclose()
+        _exit_stack = None
+
+
+def thread_config(conversation_id: int) -> dict:
+    """LangGraph config addressing the checkpoint thread of a conversation."""
+    return {"configurable": {"thread_id": str(conversation_id)}}
+
+
+def _unanswered_tool_calls(turn: list[BaseMessage]) -> list[BaseMessage]:
+    """AIMessages in `turn` whose tool_calls were never all answered, plus their partial answers.
+
+    This happens when a turn is cancelled between chat_node and tool_node: the
+    checkpoint keeps the tool_calls without results, and the provider rejects
+    every later request that contains them.
+    """
+    answered = {msg.tool_call_id for msg in turn if isinstance(msg, ToolMessage)}
+    dangling: list[BaseMessage] = []
+    for msg in turn:
+        if isinstance(msg, AIMessage) and msg.tool_calls:
+            call_ids = {call["id"] for call in msg.tool_calls}
+            if not call_ids <= answered:
+                dangling.append(msg)
+                dangling.extend(
+                    m for m in turn if isinstance(m, ToolMessage) and m.tool_call_id in call_ids
+                )
+    return dangling
+
+
+def prune_checkpoint_messages(
+    messages: list[BaseMessage], unfolded_turns: int | None = None
+) -> list[BaseMessage]:
+    """Build add_messages updates that keep a restored thread bounded and valid.
+
+    - Only the last `unfolded_turns` turns are kept (older ones are already in the
+      rolling summary), and never more than CHAT_CHECKPOINT_MAX_TURNS.
+    - Tool results older than CHAT_TOOL_RESULT_KEEP_TURNS are replaced by a short stub.
+      The ToolMessage itself is kept so every tool_call still has its answer.
+    - An AIMessage whose tool_calls have no results is removed with any partial results.
+    """
+    turns = split_turns(messages)
+    updates: list[BaseMessage] = []
+
+    keep = settings.CHAT_CHECKPOINT_MAX_TURNS
+    if unfolded_turns is not None:
+        keep = min(keep, unfolded_turns)
+    removed = max(len(turns) - keep, 0)
+    for turn in turns[:removed]:
+        updates.extend(RemoveMessage(id=msg.id) for msg in turn if msg.id)  # type: ignore[arg-type]
+
+    dropped: set[str] = set()
+    for turn in turns[removed:]:
+        for msg in _unanswered_tool_calls(turn):
+            if msg.id:
+                dropped.add(msg.id)
+                updates.append(RemoveMessage(id=msg.id))
+
+    fresh_from = max(len(turns) - settings.CHAT_TOOL_RESULT_KEEP_TURNS, removed)
+    for turn in turns[removed:fresh_from]:
+        for msg in turn:
+            if isinstance(msg, ToolMessage) and msg.content != PRUNED_TOOL_RESULT and msg.id not in dropped:
+                updates.append(
+                    ToolMessage(
+                        id=msg.id,
+                        content=PRUNED_TOOL_RESULT,
+                        tool_call_id=msg.tool_call_id,
+                        name=msg.name,
+                    )
+                )
+
+    return updates
@@ -0,0 +1,226 @@
+import asyncio
+import logging
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_groq import ChatGroq
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.core.llm_scheduler import Priority, llm_scheduler
+from app.models.conversation import Conversation, Message
+from app.utils.tokens import estimate_message_tokens, estimate_messages_tokens, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """\
+You maintain a running summary of a conversation between a recruiter and the Unroll AI assistant.
+Merge the existing summary with the new turns into one updated summary of at most {max_words} words.
+Keep candidate names, job titles, scores, recommendations, IDs and any decisions or preferences
+the recruiter stated. Drop greetings and filler. Output only the summary text.
+
+Existing summary:
+{summary}
+
+New turns:
+{turns}
+"""
+
+
+# ------------------------------------------------------------------
+# Context window
+# ------------------------------------------------------------------
+
+
+def split_turns(messages: list[BaseMessage]) -> list[list[BaseMessage]]:
+    """Group messages into turns, each starting at a HumanMessage.
+
+    Keeping turns intact guarantees an AIMessage with tool_calls is never
+    separated from the ToolMessages that answer it.
+    """
+    turns: list[list[BaseMessage]] = []
+    for msg in messages:
+        if isinstance(msg, HumanMessage) or not turns:
+            turns.append([msg])
+        else:
+            turns[-1].append(msg)
+    return turns
+
+
+def trim_to_budget(messages: list[BaseMessage], budget: int) -> list[BaseMessage]:
+    """Keep the most recent whole turns that fit in `budget` tokens.
+
+    The latest turn is always kept, even if it alone exceeds the budget.
+    """
+    turns = split_turns(messages)
+    if not turns:
+        return []
+
+    kept = [turns[-1]]
+    used = estimate_messages_tokens(turns[-1])
+    for turn in reversed(turns[:-1]):
+        cost = estimate_messages_tokens(turn)
+        if used + cost > budget:
+            break
+        kept.append(turn)
+        used += cost
+
+    return [msg for turn in reversed(kept) for msg in turn]
+
+
+def build_model_messages(
+    messages: list[BaseMessage],
+    summary: str | None,
+    digest: str | None = None,
+) -> tuple[list[BaseMessage], int]:
+    """Build the prompt for one LLM call: system prompt + data digest + summary + trimmed history.
+
+    Returns the messages and their estimated prompt token count.
+    """
+    system_content = settings.CHATBOT_SYSTEM_PROMPT
+    if digest:
+        system_content += (
+            "\nUSER DATA SNAPSHOT (current; answer from it directly when it is enough, "
+            f"call tools for anything else):\n{digest}\n"
+        )
+    if summary:
+        system_content += f"\nSUMMARY OF EARLIER CONVERSATION:\n{summary}\n"
+    system = SystemMessage(content=system_content)
+
+    system_tokens = estimate_message_tokens(system)
+    history = trim_to_budget(messages, settings.CHAT_CONTEXT_TOKEN_BUDGET - system_tokens)
+    return [system] + history, system_tokens + estimate_messages_tokens(history)
+
+
+def needs_summary(messages: list[Message], summary_message_id: int | None) -> bool:
+    """Whether the unsummarized part of a persisted history is large enough to fold."""
+    tokens = sum(
+        estimate_tokens(m.content)
+        for m in messages
+        if summary_message_id is None or m.id > summary_message_id
+    )
+    return tokens > settings.CHAT_SUMMARY_TRIGGER_TOKENS
+
+
+# ------------------------------------------------------------------
+# Rolling summary
+# ------------------------------------------------------------------
+
+
+class ConversationSummarizer:
+    """Folds older conversation turns into `Conversation.summary` in the background.
+
+    Summaries are recomputed incrementally: only messages newer than
+    `summary_message_id` are sent, together with the previous summary.
+    Runs on its own DB session so it never blocks the chat response.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal):
+        self._session_factory = session_factory
+        self._llm: ChatGroq | None = None
+        self._pending: set[int] = set()
+        self._tasks: set[asyncio.Task] = set()
+
+    def schedule(self, conversation_id: int) -> None:
+        """Schedule a summary update; no-op if one is already running for this conversation."""
+        if conversation_id in self._pending:
+            return
+        self._pending.add(conversation_id)
+        task = asyncio.create_task(self._run(conversation_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, conversation_id: int) -> None:
+        try:
+            await self.summarize(conversation_id)
+        except Exception:
+            logger.exception("Summarization failed for conversation %d", conversation_id)
+        finally:
+            self._pending.discard(conversation_id)
+
+    async def summarize(self, conversation_id: int) -> bool:
+        """Fold everything except the most recent turns into the rolling summary.
+
+        The conversation is read in one session and the summary written in
+        another, so no connection is held while waiting for the LLM.
+        """
+        async with self._session_factory() as db:
+            result = await db.execute(
+                select(Conversation).where(Conversation.id == conversation_id)
+            )
+            conv = result.scalar_one_or_none()
+            if not conv:
+                return False
+
+            pending = [
+                m for m in conv.messages
+                if conv.summary_message_id is None or m.id > conv.summary_message_id
+            ]
+            to_fold = self._select_foldable(pending)
+            if not to_fold:
+                return False
+            user_id = conv.user_id
+            previous_summary = conv.summary
+            previous_message_id = conv.summary_message_id
+
+        turns = "\n".join(f"{m.role}: {m.content}" for m in to_fold)
+        async with llm_scheduler.slot(Priority.BATCH, user_id):
+            response = await self._get_llm().ainvoke(
+                SUMMARY_PROMPT.format(
+                    max_words=settings.CHAT_SUMMARY_MAX_WORDS,
+                    summary=previous_summary or "(none)",
+                    turns=turns,
+                )
+            )
+
+        async with self._session_factory() as db:
+            # Only if the conversation still exists and nothing else folded it meanwhile
+            result = await db.execute(
+                update(Conversation)
+                .where(
+                    Conversation.id == conversation_id,
+                    Conversation.summary_message_id.is_not_distinct_from(previous_message_id),
+                )
+                .values(summary=str(response.content).strip(), summary_message_id=to_fold[-1].id)
+            )
+            await db.commit()
+        if not result.rowcount:  # type: ignore[attr-defined]
+            return False
+
+        logger.info(
+            "Folded %d messages into summary for conversation %d",
+            len(to_fold),
+            conversation_id,
+        )
+        return True
+
+    def _select_foldable(self, pending: list[Message]) -> list[Message]:
+        """Return the oldest messages, leaving CHAT_SUMMARY_KEEP_TOKENS of recent history.
+
+        The cut is moved back to a user message so a turn is never split.
+        """
+        kept_tokens = 0
+        cut = len(pending)
+        while cut > 0:
+            cost = estimate_tokens(pending[cut - 1].content)
+            if kept_tokens + cost > settings.CHAT_SUMMARY_KEEP_TOKENS:
+                break
+            kept_tokens += cost
+            cut -= 1
+
+        while 0 < cut < len(pending) and pending[cut].role != "user":
+            cut -= 1
+
+        return pending[:cut]
+
+    def _get_llm(self) -> ChatGroq:
+        if self._llm is None:
+            self._llm = ChatGroq(
+                model=settings.GROQ_SUMMARY_MODEL,
+                api_key=settings.GROQ_API_KEY,  # type: ignore[arg-type]
+                temperature=0,
+            )
+        return self._llm
+
+
+summarizer = ConversationSummarizer()
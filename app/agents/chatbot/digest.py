@@ -0,0 +1,176 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from sqlalchemy import desc, func, select
+
+from app.core import data_version
+from app.core.config import settings
+from app.core.db import get_tool_session
+from app.models.analysis import Analysis
+from app.models.job import Job
+
+
+@dataclass
+class JobDigest:
+    """Candidate count and best candidates for one job (job_id None = no job)."""
+
+    job_id: int | None
+    title: str
+    candidates: int = 0
+    top: list[tuple[int, str, str]] = field(default_factory=list)  # (score, name, recommendation)
+
+    def add_candidate(self, score: int, name: str, recommendation: str) -> None:
+        self.candidates += 1
+        self.top.append((score, name, recommendation))
+        self.top.sort(key=lambda c: c[0], reverse=True)
+        del self.top[settings.CHAT_DIGEST_TOP_N:]
+
+    def render(self) -> str:
+        label = f"[job_id {self.job_id}] {self.title}" if self.job_id else self.title
+        line = f"- {label}: {self.candidates} candidates"
+        if self.top:
+            line += "; top: " + ", ".join(f"{name} {score} {rec}" for score, name, rec in self.top)
+        return line
+
+
+@dataclass
+class UserDigest:
+    version: int
+    expires_at: float
+    total_jobs: int
+    jobs: dict[int, JobDigest]  # most recent first
+    unassigned: JobDigest
+
+    def render(self) -> str:
+        if not self.jobs and not self.unassigned.candidates:
+            return "The user has no jobs or analyses yet."
+        header = f"Jobs ({self.total_jobs}):"
+        if self.total_jobs > len(self.jobs):
+            header = f"Jobs ({len(self.jobs)} most recent of {self.total_jobs}):"
+        lines = [header] + [job.render() for job in self.jobs.values()]
+        if self.unassigned.candidates:
+            lines.append(self.unassigned.render())
+        return "\n".join(lines)
+
+
+class DigestCache:
+    """Per-user snapshot of jobs and top candidates for the chatbot system prompt.
+
+    Built with a few aggregate queries on first use, then kept current by applying
+    committed job/analysis inserts in place (see data_version.subscribe). Any
+    other write drops the digest so it is rebuilt on the next chat turn.
+    """
+
+    def __init__(self, max_users: int, ttl_seconds: float):
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self._digests: OrderedDict[int, UserDigest] = OrderedDict()
+
+    async def get(self, user_id: int) -> str:
+        digest = self._digests.get(user_id)
+        version = data_version.get_data_version(user_id)
+        if digest is None or digest.version != version or digest.expires_at < time.monotonic():
+            digest = await self._build(user_id, version)
+            self._store(user_id, digest)
+        else:
+            self._digests.move_to_end(user_id)
+        return digest.render()
+
+    def apply_changes(self, user_id: int, version: int, changes: list) -> None:
+        """data_version listener: patch a current digest with committed inserts."""
+        digest = self._digests.get(user_id)
+        if digest is None:
+            return
+        if digest.version != version - 1:
+            self._digests.pop(user_id, None)
+            return
+
+        # Jobs first, so analyses inserted in the same commit find their job
+        for op, obj in sorted(changes, key=lambda change: not isinstance(change[1], Job)):
+            if op == "insert" and isinstance(obj, Job):
+                digest.jobs = {obj.id: JobDigest(job_id=obj.id, title=obj.title), **digest.jobs}
+                digest.total_jobs += 1
+                while len(digest.jobs) > settings.CHAT_DIGEST_MAX_JOBS:
+                    digest.jobs.pop(next(reversed(digest.jobs)))
+            elif op == "insert" and isinstance(obj, Analysis):
+                job = digest.unassigned if obj.job_id is None else digest.jobs.get(obj.job_id)
+                if job is not None:
+                    job.add_candidate(obj.overall_score, obj.candidate_name, obj.recommendation)
+            elif isinstance(obj, (Job, Analysis)):
+                self._digests.pop(user_id, None)
+                return
+
+        digest.version = version
+
+    def _store(self, user_id: int, digest: UserDigest) -> None:
+        self._digests[user_id] = digest
+        self._digests.move_to_end(user_id)
+        while len(self._digests) > self.max_users:
+            self._digests.popitem(last=False)
+
+    async def _build(self, user_id: int, version: int) -> UserDigest:
+        top_n = settings.CHAT_DIGEST_TOP_N
+
+        async with get_tool_session(user_id) as db:
+            total_jobs = (
+                await db.execute(select(func.count()).select_from(Job).where(Job.user_id == user_id))
+            ).scalar_one()
+
+            job_rows = await db.execute(
+                select(Job.id, Job.title)
+                .where(Job.user_id == user_id)
+                .order_by(desc(Job.created_at))
+                .limit(settings.CHAT_DIGEST_MAX_JOBS)
+            )
+            jobs = {job_id: JobDigest(job_id=job_id, title=title) for job_id, title in job_rows.all()}
+            unassigned = JobDigest(job_id=None, title="Analyses without a job")
+
+            counts = await db.execute(
+                select(Analysis.job_id, func.count())
+                .where(Analysis.user_id == user_id)
+                .group_by(Analysis.job_id)
+            )
+            for job_id, count in counts.all():
+                target = unassigned if job_id is None else jobs.get(job_id)
+                if target is not None:
+                    target.candidates = count
+
+            rank = func.row_number().over(
+                partition_by=Analysis.job_id, order_by=desc(Analysis.overall_score)
+            ).label("rank")
+            ranked = (
+                select(
+                    Analysis.job_id,
+                    Analysis.overall_score,
+                    Analysis.candidate_name,
+                    Analysis.recommendation,
+                    rank,
+                )
+                .where(Analysis.user_id == user_id)
+                .subquery()
+            )
+            top = await db.execute(
+                select(ranked.c.job_id, ranked.c.overall_score, ranked.c.candidate_name, ranked.c.recommendation)
+                .where(ranked.c.rank <= top_n)
+                .order_by(ranked.c.job_id, ranked.c.rank)
+            )
+            for job_id, score, name, rec in top.all():
+                target = unassigned if job_id is None else jobs.get(job_id)
+                if target is not None:
+                    target.top.append((score, name, rec))
+
+        return UserDigest(
+            version=version,
+            expires_at=time.monotonic() + self.ttl_seconds,
+            total_jobs=total_jobs,
+            jobs=jobs,
+            unassigned=unassigned,
+        )
+
+
+digest_cache = DigestCache(
+    max_users=settings.CHAT_DIGEST_MAX_USERS,
+    ttl_seconds=settings.CHAT_DIGEST_TTL_SECONDS,
+)
+data_version.subscribe(digest_cache.apply_changes)
@@ -1,7 +1,15 @@
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END
 
 from app.agents.chatbot.state import AgentState
-from app.agents.chatbot.nodes import chat_node, tool_node
+from app.agents.chatbot.nodes import chat_node, fast_chat_node, template_node, tool_node
+from app.agents.chatbot.routing import (
+    ROUTE_FAST,
+    ROUTE_TEMPLATE,
+    ROUTE_TOOLS,
+    classify_message,
+    last_human_text,
+)
 
 
 def should_use_tools(state: AgentState) -> str:
@@ -12,19 +20,38 @@ def should_use_tools(state: AgentState) -> str:
     return END
 
 
-def build_chatbot_graph():
+def route_message(state: AgentState) -> str:
+    """Conditional entry: send trivial and FAQ messages to the fast path."""
+    return classify_message(last_human_text(state["messages"]))
+
+
+def build_chatbot_graph(checkpointer: BaseCheckpointSaver | None = None):
     """Build and compile the chatbot agent graph.
 
     Flow:
-        START → chat_node → (has tool_calls?) → tool_node → chat_node (loop)
-                           → (no tool_calls?) → END
+        START → (greeting / thanks?) → template_node → END
+              → (platform FAQ?)      → fast_chat_node → END
+              → (anything else)      → chat_node → (has tool_calls?) → tool_node → chat_node (loop)
+                                                 → (no tool_calls?) → END
+
+    With a checkpointer, state (including tool results) persists per
+    conversation, keyed by thread_id = conversation id.
     """
     graph = StateGraph(AgentState)
 
     graph.add_node("chat_node", chat_node)
     graph.add_node("tool_node", tool_node)
+    graph.add_node("template_node", template_node)
+    graph.add_node("fast_chat_node", fast_chat_node)
 
-    graph.set_entry_point("chat_node")
+    graph.set_conditional_entry_point(
+        route_message,
+        {
+            ROUTE_TEMPLATE: "template_node",
+            ROUTE_FAST: "fast_chat_node",
+            ROUTE_TOOLS: "chat_node",
+        },
+    )
 
     graph.add_conditional_edges(
         "chat_node",
@@ -33,8 +60,7 @@ def build_chatbot_graph():
     )
 
     graph.add_edge("tool_node", "chat_node")
+    graph.add_edge("template_node", END)
+    graph.add_edge("fast_chat_node", END)
 
-    return graph.compile()
-
-
-compiled_graph = build_chatbot_graph()
+    return graph.compile(checkpointer=checkpointer)
@@ -1,30 +1,88 @@
 import logging
+from langchain_core.messages import AIMessage, SystemMessage
 from langchain_groq import ChatGroq
-from langchain_core.messages import SystemMessage
 from langgraph.prebuilt import ToolNode
 
+from app.core.circuit_breaker import get_breaker
 from app.core.config import settings
+from app.core.llm_scheduler import Priority, llm_scheduler
+from app.agents.chatbot.context import build_model_messages, trim_to_budget
+from app.agents.chatbot.digest import digest_cache
+from app.agents.chatbot.routing import FAQ_SYSTEM_PROMPT, last_human_text, template_reply
 from app.agents.chatbot.state import AgentState
 from app.agents.chatbot.tools import all_tools
 
 logger = logging.getLogger(__name__)
 
-llm = ChatGroq(
-    model=settings.GROQ_MODEL,
-    api_key=settings.GROQ_API_KEY,
-    temperature=0.3,
-)
+
+def _chat_llm(model: str) -> ChatGroq:
+    return ChatGroq(
+        model=model,
+        api_key=settings.GROQ_API_KEY,
+        temperature=0.3,
+        timeout=settings.GROQ_TIMEOUT_SECONDS,
+        max_retries=settings.GROQ_MAX_RETRIES,
+    )
+
+
+llm = _chat_llm(settings.GROQ_MODEL)
 llm_with_tools = llm.bind_tools(all_tools)
 
+# Serves chat turns while GROQ_MODEL's circuit is open
+fallback_llm_with_tools = None
+if settings.GROQ_FALLBACK_MODEL and settings.GROQ_FALLBACK_MODEL != settings.GROQ_MODEL:
+    fallback_llm_with_tools = _chat_llm(settings.GROQ_FALLBACK_MODEL).bind_tools(all_tools)
+
+# Small model without tool schemas for platform FAQs (see routing.classify_message)
+fast_llm = _chat_llm(settings.GROQ_FAST_MODEL)
+
 tool_node = ToolNode(all_tools)
 
 
+async def _invoke_chat_llm(messages: list):
+    """Invoke the chat model, or the fallback model while its circuit is open.
+
+    Unlike analyses, a turn doesn't fall back after a failed call: tokens may
+    already have been streamed to the client.
+    """
+    model, runnable = settings.GROQ_MODEL, llm_with_tools
+    if fallback_llm_with_tools is not None and not get_breaker(model).available():
+        model, runnable = settings.GROQ_FALLBACK_MODEL, fallback_llm_with_tools
+    async with get_breaker(model).guard():
+        return await runnable.ainvoke(messages)
+
+
 async def chat_node(state: AgentState) -> dict:
     """Invoke the LLM with the system prompt and conversation history.
 
     The LLM decides whether to respond directly or call tools.
     If it returns tool_calls, the graph routes to tool_node.
+    History is trimmed to CHAT_CONTEXT_TOKEN_BUDGET, with older turns
+    represented by the rolling summary. The user's data digest lets common
+    questions be answered without tool calls.
     """
-    messages = [SystemMessage(content=settings.CHATBOT_SYSTEM_PROMPT)] + state["messages"]
-    response = await llm_with_tools.ainvoke(messages)
+    digest = None
+    if settings.CHAT_DIGEST_ENABLED:
+        digest = await digest_cache.get(state["user_id"])
+    messages, prompt_tokens = build_model_messages(
+        state["messages"], state.get("summary"), digest
+    )
+    logger.debug("chat_node prompt: %d messages, ~%d tokens", len(messages), prompt_tokens)
+    async with llm_scheduler.slot(Priority.INTERACTIVE, state["user_id"]):
+        response = await _invoke_chat_llm(messages)
+    return {"messages": [response]}
+
+
+async def template_node(state: AgentState) -> dict:
+    """Answer greetings, thanks and capability questions from templates — no LLM call."""
+    reply = template_reply(last_human_text(state["messages"]))
+    return {"messages": [AIMessage(content=reply or "")]}
+
+
+async def fast_chat_node(state: AgentState) -> dict:
+    """Answer platform FAQs with the small model, a short FAQ prompt and minimal history."""
+    history = trim_to_budget(state["messages"], settings.CHAT_FAST_PATH_TOKEN_BUDGET)
+    async with llm_scheduler.slot(Priority.INTERACTIVE, state["user_id"]):
+        async with get_breaker(settings.GROQ_FAST_MODEL).guard():
+            response = await fast_llm.ainvoke([SystemMessage(content=FAQ_SYSTEM_PROMPT)] + history)
     return {"messages": [response]}
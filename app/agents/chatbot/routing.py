@@ -0,0 +1,97 @@
+import re
+
+from langchain_core.messages import BaseMessage, HumanMessage
+
+from app.core.config import settings
+
+ROUTE_TEMPLATE = "template_node"
+ROUTE_FAST = "fast_chat_node"
+ROUTE_TOOLS = "chat_node"
+
+GREETING_REPLY = (
+    "Hi! I'm the Unroll AI Assistant. Ask me about your jobs, candidates and resume "
+    "analyses — for example \"who are my top candidates?\" or \"how many candidates did I reject?\""
+)
+THANKS_REPLY = "You're welcome! Let me know if there's anything else you'd like to know about your candidates."
+GOODBYE_REPLY = "Goodbye! Your conversation is saved, so you can pick it up any time."
+CAPABILITIES_REPLY = """\
+I can help you with your Unroll AI data:
+- Look up your jobs, uploaded resumes and resume analyses
+- Rank and compare candidates by score and recommendation
+- Break down a candidate's scores, skills, experience and red flags
+- Give statistics such as recommendation counts or average scores per job
+- Explain how scoring and recommendations work"""
+
+# (pattern, reply) — matched against the whole normalized message
+TEMPLATES: list[tuple[re.Pattern, str]] = [
+    (re.compile(r"(hi|hello|hey|hiya|yo|good (morning|afternoon|evening))( there)?"), GREETING_REPLY),
+    (re.compile(r"(thanks|thank you|thx|ty|cheers)( so much| a lot| very much)?"), THANKS_REPLY),
+    (re.compile(r"(bye|goodbye|see you|see ya)( later)?"), GOODBYE_REPLY),
+    (
+        re.compile(r"(help|what can you do|what do you do|who are you|what are you|how can you help( me)?)"),
+        CAPABILITIES_REPLY,
+    ),
+]
+
+# Questions about how the platform works, answerable without the user's data
+FAQ_PATTERN = re.compile(
+    r"\b(how|what|why)\b.*\b(scor\w*|recommend\w*|weight\w*|rubric|hire|consider|reject"
+    r"|red flags?|key vectors?|upload\w*|pdf|privacy|bias\w*|analy[sz]\w*)\b"
+)
+# Anything pointing at the user's own records must go through the tools
+DATA_REFERENCE_PATTERN = re.compile(
+    r"\d|\b(i|me|we|us|my|our|mine|top|best|worst|list|show|compare|which|who|whose|candidates?|"
+    r"applicants?|jobs?|positions?|roles?)\b"
+)
+
+FAQ_SYSTEM_PROMPT = """\
+You are the Unroll AI Assistant. Answer questions about how the Unroll AI Resume Analyzer works,
+briefly and accurately. You have no access to the user's data in this mode; if the question needs it,
+ask the user to rephrase it as a question about their candidates or jobs.
+
+How the platform works:
+- Users upload resume PDFs, optionally matched to a job they created. An AI analyst extracts contact,
+  education, skills and experience, and scores the resume against the job.
+- Category scores (0-100): experience, projects, tech, education — only job-relevant evidence counts.
+  If the primary required skill is missing, the tech score is capped at 25.
+- Overall score weights: juniors (<2 years) experience 10%, projects 50%, tech 25%, education 15%;
+  experienced (2+ years) experience 50%, projects 10%, tech 25%, education 15%.
+- Recommendation: HIRE if overall >= 75, CONSIDER if 50-74, REJECT if below 50.
+- Red flags are only raised with direct evidence (employment gaps, job hopping, unverifiable claims,
+  inconsistent dates). Protected characteristics are never considered.
+"""
+
+
+def normalize_message(text: str) -> str:
+    return re.sub(r"\s+", " ", text.lower()).strip(" \t\n!?.,")
+
+
+def template_reply(text: str) -> str | None:
+    """Canned reply for greetings, thanks and capability questions, if the message is one."""
+    normalized = normalize_message(text)
+    for pattern, reply in TEMPLATES:
+        if pattern.fullmatch(normalized):
+            return reply
+    return None
+
+
+def classify_message(text: str) -> str:
+    """Pick the graph entry node for a user message.
+
+    Only messages that clearly need no user data leave the tool-using path.
+    """
+    if not settings.CHAT_FAST_PATH_ENABLED:
+        return ROUTE_TOOLS
+    if template_reply(text) is not None:
+        return ROUTE_TEMPLATE
+    normalized = normalize_message(text)
+    if FAQ_PATTERN.search(normalized) and not DATA_REFERENCE_PATTERN.search(normalized):
+        return ROUTE_FAST
+    return ROUTE_TOOLS
+
+
+def last_human_text(messages: list[BaseMessage]) -> str:
+    for msg in reversed(messages):
+        if isinstance(msg, HumanMessage):
+            return msg.content if isinstance(msg.content, str) else ""
+    return ""
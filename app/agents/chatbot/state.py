@@ -8,7 +8,9 @@ class AgentState(TypedDict):
 
     messages: Full conversation history (managed by add_messages reducer).
     user_id:  Authenticated user's ID — used to scope all tool queries.
+    summary:  Rolling summary of turns no longer sent verbatim to the LLM.
     """
 
     messages: Annotated[list, add_messages]
     user_id: int
+    summary: str | None
@@ -10,6 +10,12 @@ from app.agents.chatbot.tools.job_tools import (
     get_job_details,
     get_analyses_for_job,
 )
+from app.agents.chatbot.tools.stats_tools import (
+    get_recommendation_counts,
+    get_score_statistics,
+    get_job_statistics,
+    get_experience_distribution,
+)
 
 all_tools = [
     get_all_analyses,
@@ -21,4 +27,8 @@ all_tools = [
     get_all_jobs,
     get_job_details,
     get_analyses_for_job,
+    get_recommendation_counts,
+    get_score_statistics,
+    get_job_statistics,
+    get_experience_distribution,
 ]
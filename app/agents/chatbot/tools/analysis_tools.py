@@ -1,24 +1,32 @@
-import json
 from typing import Annotated
 
 from langchain_core.tools import tool
 from langgraph.prebuilt import InjectedState
 from sqlalchemy import select, desc
 
+from app.agents.chatbot.tools.cache import cached_tool
+from app.agents.chatbot.tools.encoding import encode_object, encode_table, tool_budget
 from app.core.db import get_tool_session
 from app.models.analysis import Analysis
 from app.models.job import Job
 
 
 @tool
-async def get_all_analyses(state: Annotated[dict, InjectedState]) -> str:
-    """Get a summary list of all resume analyses for the current user.
-    Returns each analysis with: id, candidate name, target role, overall score, recommendation, and date.
+@cached_tool
+async def get_all_analyses(
+    state: Annotated[dict, InjectedState],
+    fields: list[str] | None = None,
+    page: int = 1,
+) -> str:
+    """Get a summary table of all resume analyses for the current user.
+    Columns: id, candidate_name, target_role, overall_score, recommendation, job_id, created_at.
+    Use `fields` to return only some columns. Long results are paged: if the output has
+    next_page, call again with that page.
     Use this when the user asks about their analyses, candidates, or overall results.
     """
     user_id = state["user_id"]
 
-    async with get_tool_session() as db:
+    async with get_tool_session(user_id) as db:
         result = await db.execute(
             select(Analysis)
             .where(Analysis.user_id == user_id)
@@ -38,21 +46,33 @@ async def get_all_analyses(state: Annotated[dict, InjectedState]) -> str:
                 "overall_score": a.overall_score,
                 "recommendation": a.recommendation,
                 "job_id": a.job_id,
-                "created_at": a.created_at.isoformat(),
+                "created_at": a.created_at.date().isoformat(),
             })
-        return json.dumps(items, indent=2)
+        return encode_table(
+            items, budget=tool_budget("get_all_analyses"), fields=fields, page=page
+        )
 
 
 @tool
-async def get_analysis_details(analysis_id: int, state: Annotated[dict, InjectedState]) -> str:
-    """Get the full detailed analysis for a specific analysis ID.
-    Returns complete data including scores, score justifications, skills, experience,
-    red flags, key vectors, summary, and recommendation.
+@cached_tool
+async def get_analysis_details(
+    analysis_id: int,
+    state: Annotated[dict, InjectedState],
+    fields: list[str] | None = None,
+    page: int = 1,
+) -> str:
+    """Get the detailed analysis for a specific analysis ID.
+    Top-level fields: id, candidate_name, target_role, overall_score, recommendation,
+    total_experience_years, job_id, created_at, contact, education, scores,
+    score_justification, summary, shortlist_summary, key_vectors, skills, experience,
+    red_flags, extraction_status.
+    Request only the `fields` you need. Long results are paged: if the output has
+    next_page, call again with that page.
     Use this when the user asks for details about a specific candidate or analysis.
     """
     user_id = state["user_id"]
 
-    async with get_tool_session() as db:
+    async with get_tool_session(user_id) as db:
         result = await db.execute(
             select(Analysis).where(
                 Analysis.id == analysis_id, Analysis.user_id == user_id
@@ -71,20 +91,30 @@ async def get_analysis_details(analysis_id: int, state: Annotated[dict, Injected
             "recommendation": analysis.recommendation,
             "total_experience_years": analysis.total_experience_years,
             "job_id": analysis.job_id,
-            "created_at": analysis.created_at.isoformat(),
-            "analysis_result": analysis.analysis_result,
+            "created_at": analysis.created_at.date().isoformat(),
         }
-        return json.dumps(data, indent=2, default=str)
+        for key, value in analysis.analysis_result.items():
+            data.setdefault(key, value)
+        return encode_object(
+            data, budget=tool_budget("get_analysis_details"), fields=fields, page=page
+        )
 
 
 @tool
-async def search_analyses_by_candidate(candidate_name: str, state: Annotated[dict, InjectedState]) -> str:
+@cached_tool
+async def search_analyses_by_candidate(
+    candidate_name: str,
+    state: Annotated[dict, InjectedState],
+    fields: list[str] | None = None,
+    page: int = 1,
+) -> str:
     """Search analyses by candidate name (partial, case-insensitive match).
+    Columns: id, candidate_name, target_role, overall_score, recommendation, created_at.
     Use this when the user asks about a specific person by name.
     """
     user_id = state["user_id"]
 
-    async with get_tool_session() as db:
+    async with get_tool_session(user_id) as db:
         result = await db.execute(
             select(Analysis)
             .where(
@@ -106,25 +136,34 @@ async def search_analyses_by_candidate(candidate_name: str, state: Annotated[dic
                 "target_role": a.target_role,
                 "overall_score": a.overall_score,
                 "recommendation": a.recommendation,
-                "created_at": a.created_at.isoformat(),
+                "created_at": a.created_at.date().isoformat(),
             })
-        return json.dumps(items, indent=2)
+        return encode_table(
+            items, budget=tool_budget("search_analyses_by_candidate"), fields=fields, page=page
+        )
 
 
 @tool
+@cached_tool
 async def get_top_candidates(
     state: Annotated[dict, InjectedState],
     limit: int = 5,
     job_id: int | None = None,
+    fields: list[str] | None = None,
 ) -> str:
     """Get the top candidates ranked by overall score.
+    Columns: rank, candidate_name, target_role, overall_score, recommendation, job_title.
     Optionally filter by job_id to see top candidates for a specific job.
     Use this when the user asks about best candidates or rankings.
     """
     user_id = state["user_id"]
 
-    async with get_tool_session() as db:
-        query = select(Analysis).where(Analysis.user_id == user_id)
+    async with get_tool_session(user_id) as db:
+        query = (
+            select(Analysis, Job.title)
+            .outerjoin(Job, Job.id == Analysis.job_id)
+            .where(Analysis.user_id == user_id)
+        )
 
         if job_id is not None:
             query = query.where(Analysis.job_id == job_id)
@@ -132,26 +171,20 @@ async def get_top_candidates(
         query = query.order_by(desc(Analysis.overall_score)).limit(limit)
 
         result = await db.execute(query)
-        analyses = result.scalars().all()
+        rows = result.all()
 
-        if not analyses:
+        if not rows:
             return "No analyses found."
 
         items = []
-        for rank, a in enumerate(analyses, 1):
-            item = {
+        for rank, (a, job_title) in enumerate(rows, 1):
+            items.append({
                 "rank": rank,
                 "candidate_name": a.candidate_name,
                 "target_role": a.target_role,
                 "overall_score": a.overall_score,
                 "recommendation": a.recommendation,
-            }
-            if a.job_id:
-                job_result = await db.execute(
-                    select(Job.title).where(Job.id == a.job_id)
-                )
-                job_title = job_result.scalar_one_or_none()
-                item["job_title"] = job_title or "Unknown"
-            items.append(item)
-
-        return json.dumps(items, indent=2)
+                "job_title": job_title or ("Unknown" if a.job_id else None),
+            })
+
+        return encode_table(items, budget=tool_budget("get_top_candidates"), fields=fields)
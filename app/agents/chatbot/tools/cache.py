@@ -0,0 +1,79 @@
+import functools
+import inspect
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from app.core.config import settings
+from app.core.data_version import get_data_version
+
+CacheKey = tuple[int, str, str]
+
+
+class ToolResultCache:
+    """Bounded LRU of tool results keyed by (user_id, tool, args).
+
+    Each entry records the user's data version at computation time; a bumped
+    version (any analysis/job/resume write) turns the entry into a miss.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[CacheKey, tuple[int, float, str]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: CacheKey, version: int) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != version or entry[1] < time.monotonic():
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def set(self, key: CacheKey, version: int, value: str) -> None:
+        self._entries[key] = (version, time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+tool_cache = ToolResultCache(
+    max_entries=settings.CHAT_TOOL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.CHAT_TOOL_CACHE_TTL_SECONDS,
+)
+
+
+def cached_tool(func: Callable[..., Awaitable[str]]) -> Callable[..., Awaitable[str]]:
+    """Cache a chatbot tool coroutine in `tool_cache`.
+
+    Apply below @tool. The wrapped function must take the injected `state`;
+    all other arguments form the cache key.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> str:
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        user_id = arguments.pop("state")["user_id"]
+
+        key = (user_id, func.__name__, json.dumps(arguments, sort_keys=True, default=str))
+        version = get_data_version(user_id)
+
+        cached = tool_cache.get(key, version)
+        if cached is not None:
+            return cached
+
+        result = await func(*args, **kwargs)
+        tool_cache.set(key, version, result)
+        return result
+
+    return wrapper
@@ -0,0 +1,148 @@
+import json
+import math
+from typing import Any
+
+from app.core.config import settings
+from app.utils.tokens import CHARS_PER_TOKEN, estimate_tokens
+
+TRUNCATION_MARKER = "…[truncated]"
+
+# Tokens reserved for the envelope (columns, paging keys) around the payload
+ENVELOPE_TOKENS = 60
+
+
+def dumps(data: Any) -> str:
+    """Compact JSON: no indentation or spaces after separators."""
+    return json.dumps(data, separators=(",", ":"), default=str, ensure_ascii=False)
+
+
+def tool_budget(tool_name: str) -> int:
+    """Token budget for one call of `tool_name`."""
+    return settings.CHAT_TOOL_OUTPUT_BUDGETS.get(
+        tool_name, settings.CHAT_TOOL_OUTPUT_TOKEN_BUDGET
+    )
+
+
+def _unknown_fields(fields: list[str], available: list[str]) -> str:
+    return f"Unknown fields {fields}. Available fields: {', '.join(available)}."
+
+
+def _fit(value: Any, max_tokens: int) -> Any:
+    """Shrink a value to roughly `max_tokens`, marking what was cut."""
+    if estimate_tokens(dumps(value)) <= max_tokens:
+        return value
+
+    max_chars = max(max_tokens * CHARS_PER_TOKEN, 1)
+    if isinstance(value, str):
+        return value[:max_chars] + TRUNCATION_MARKER
+    if isinstance(value, list):
+        kept, used = [], 0
+        for item in value:
+            cost = estimate_tokens(dumps(item))
+            if used + cost > max_tokens:
+                break
+            kept.append(item)
+            used += cost
+        return kept + [f"{TRUNCATION_MARKER} {len(value) - len(kept)} more"]
+    return dumps(value)[:max_chars] + TRUNCATION_MARKER
+
+
+def _paginate(items: list, budget: int) -> list[list]:
+    """Greedily pack items into pages of at most `budget` tokens each.
+
+    Items must already be fitted to the budget (see `_fit`).
+    """
+    pages: list[list] = [[]]
+    used = 0
+    for item in items:
+        cost = estimate_tokens(dumps(item))
+        if pages[-1] and used + cost > budget:
+            pages.append([])
+            used = 0
+        pages[-1].append(item)
+        used += cost
+    return pages
+
+
+def _with_paging(data: dict, page: int, pages: int) -> dict:
+    if pages > 1:
+        data["page"] = page
+        data["pages"] = pages
+    if page < pages:
+        data["next_page"] = page + 1
+        data["note"] = f"Output truncated to fit the budget; call again with page={page + 1} for more."
+    return data
+
+
+def encode_table(
+    rows: list[dict],
+    *,
+    budget: int,
+    fields: list[str] | None = None,
+    page: int = 1,
+    meta: dict | None = None,
+) -> str:
+    """Encode a list of records as {"columns": [...], "rows": [[...], ...]}.
+
+    `fields` projects columns; rows beyond the token budget spill onto
+    later pages, reachable with `page`.
+    """
+    available = list(rows[0]) if rows else []
+    columns = [c for c in available if c in fields] if fields else available
+    if fields and not columns:
+        return _unknown_fields(fields, available)
+
+    row_budget = budget - ENVELOPE_TOKENS
+    values = [[_fit(row.get(c), row_budget // max(len(columns), 1)) for c in columns] for row in rows]
+    pages = _paginate(values, row_budget)
+    page = min(max(page, 1), len(pages))
+
+    data = dict(meta or {})
+    data["columns"] = columns
+    data["rows"] = pages[page - 1]
+    if len(pages) > 1:
+        data["total_rows"] = len(rows)
+    return dumps(_with_paging(data, page, len(pages)))
+
+
+def encode_object(
+    data: dict,
+    *,
+    budget: int,
+    fields: list[str] | None = None,
+    page: int = 1,
+) -> str:
+    """Encode one record as compact JSON.
+
+    `fields` projects top-level keys; keys that don't fit the token budget
+    spill onto later pages and oversized values are truncated.
+    """
+    available = list(data)
+    keys = [k for k in available if k in fields] if fields else available
+    if fields and not keys:
+        return _unknown_fields(fields, available)
+
+    value_budget = budget - ENVELOPE_TOKENS
+    pages = _paginate(
+        [(k, _fit(data[k], value_budget - estimate_tokens(k) - 2)) for k in keys],
+        value_budget,
+    )
+    page = min(max(page, 1), len(pages))
+    return dumps(_with_paging(dict(pages[page - 1]), page, len(pages)))
+
+
+def encode_text(
+    text: str,
+    *,
+    budget: int,
+    page: int = 1,
+    meta: dict | None = None,
+) -> str:
+    """Encode long text in budget-sized pages under a "content" key."""
+    chunk = max((budget - ENVELOPE_TOKENS) * CHARS_PER_TOKEN, 1)
+    pages = max(math.ceil(len(text) / chunk), 1)
+    page = min(max(page, 1), pages)
+
+    data = dict(meta or {})
+    data["content"] = text[(page - 1) * chunk:page * chunk]
+    return dumps(_with_paging(data, page, pages))
@@ -1,24 +1,32 @@
-import json
 from typing import Annotated
 
 from langchain_core.tools import tool
 from langgraph.prebuilt import InjectedState
 from sqlalchemy import select, desc
 
+from app.agents.chatbot.tools.cache import cached_tool
+from app.agents.chatbot.tools.encoding import encode_table, encode_text, tool_budget
 from app.core.db import get_tool_session
 from app.models.job import Job
 from app.models.analysis import Analysis
 
 
 @tool
-async def get_all_jobs(state: Annotated[dict, InjectedState]) -> str:
-    """Get a list of all job positions created by the current user.
-    Returns each job with: id, title, description preview, and creation date.
+@cached_tool
+async def get_all_jobs(
+    state: Annotated[dict, InjectedState],
+    fields: list[str] | None = None,
+    page: int = 1,
+) -> str:
+    """Get a table of all job positions created by the current user.
+    Columns: id, title, description_preview, created_at.
+    Use `fields` to return only some columns. Long results are paged: if the output has
+    next_page, call again with that page.
     Use this when the user asks about their job listings.
     """
     user_id = state["user_id"]
 
-    async with get_tool_session() as db:
+    async with get_tool_session(user_id) as db:
         result = await db.execute(
             select(Job)
             .where(Job.user_id == user_id)
@@ -35,20 +43,26 @@ async def get_all_jobs(state: Annotated[dict, InjectedState]) -> str:
                 "id": j.id,
                 "title": j.title,
                 "description_preview": j.description[:200] + "..." if len(j.description) > 200 else j.description,
-                "created_at": j.created_at.isoformat(),
+                "created_at": j.created_at.date().isoformat(),
             })
-        return json.dumps(items, indent=2)
+        return encode_table(items, budget=tool_budget("get_all_jobs"), fields=fields, page=page)
 
 
 @tool
-async def get_job_details(job_id: int, state: Annotated[dict, InjectedState]) -> str:
+@cached_tool
+async def get_job_details(
+    job_id: int,
+    state: Annotated[dict, InjectedState],
+    page: int = 1,
+) -> str:
     """Get the full details of a specific job position by its ID.
-    Returns the complete job title and description.
+    Returns the complete job title and description. Long descriptions are paged:
+    if the output has next_page, call again with that page.
     Use this when the user asks about a specific job's requirements.
     """
     user_id = state["user_id"]
 
-    async with get_tool_session() as db:
+    async with get_tool_session(user_id) as db:
         result = await db.execute(
             select(Job).where(Job.id == job_id, Job.user_id == user_id)
         )
@@ -57,23 +71,36 @@ async def get_job_details(job_id: int, state: Annotated[dict, InjectedState]) ->
         if not job:
             return f"Job with ID {job_id} not found."
 
-        return json.dumps({
-            "id": job.id,
-            "title": job.title,
-            "description": job.description,
-            "created_at": job.created_at.isoformat(),
-        }, indent=2)
+        return encode_text(
+            job.description,
+            budget=tool_budget("get_job_details"),
+            page=page,
+            meta={
+                "id": job.id,
+                "title": job.title,
+                "created_at": job.created_at.date().isoformat(),
+            },
+        )
 
 
 @tool
-async def get_analyses_for_job(job_id: int, state: Annotated[dict, InjectedState]) -> str:
+@cached_tool
+async def get_analyses_for_job(
+    job_id: int,
+    state: Annotated[dict, InjectedState],
+    fields: list[str] | None = None,
+    page: int = 1,
+) -> str:
     """Get all resume analyses linked to a specific job position.
-    Returns a summary of each candidate analyzed for this job.
+    Columns: id, candidate_name, overall_score, recommendation, total_experience_years, created_at.
+    Use `fields` to return only some columns. Long results are paged: if the output has
+    next_page, call again with that page.
     Use this when the user asks about candidates for a specific role or job.
+    For counts or averages prefer the statistics tools.
     """
     user_id = state["user_id"]
 
-    async with get_tool_session() as db:
+    async with get_tool_session(user_id) as db:
         job_result = await db.execute(
             select(Job).where(Job.id == job_id, Job.user_id == user_id)
         )
@@ -100,11 +127,13 @@ async def get_analyses_for_job(job_id: int, state: Annotated[dict, InjectedState
                 "overall_score": a.overall_score,
                 "recommendation": a.recommendation,
                 "total_experience_years": a.total_experience_years,
-                "created_at": a.created_at.isoformat(),
+                "created_at": a.created_at.date().isoformat(),
             })
 
-        return json.dumps({
-            "job_title": job.title,
-            "total_candidates": len(items),
-            "candidates": items,
-        }, indent=2)
+        return encode_table(
+            items,
+            budget=tool_budget("get_analyses_for_job"),
+            fields=fields,
+            page=page,
+            meta={"job_title": job.title, "total_candidates": len(items)},
+        )
@@ -1,23 +1,31 @@
-import json
 from typing import Annotated
 
 from langchain_core.tools import tool
 from langgraph.prebuilt import InjectedState
 from sqlalchemy import select, desc
 
+from app.agents.chatbot.tools.cache import cached_tool
+from app.agents.chatbot.tools.encoding import encode_table, encode_text, tool_budget
 from app.core.db import get_tool_session
 from app.models.resume import Resume
 
 
 @tool
-async def get_all_resumes(state: Annotated[dict, InjectedState]) -> str:
-    """Get a list of all uploaded resumes for the current user.
-    Returns each resume with: id, url, content preview (first 200 chars), and upload date.
+@cached_tool
+async def get_all_resumes(
+    state: Annotated[dict, InjectedState],
+    fields: list[str] | None = None,
+    page: int = 1,
+) -> str:
+    """Get a table of all uploaded resumes for the current user.
+    Columns: id, url, content_preview (first 200 chars), created_at.
+    Use `fields` to return only some columns. Long results are paged: if the output has
+    next_page, call again with that page.
     Use this when the user asks about their uploaded resumes.
     """
     user_id = state["user_id"]
 
-    async with get_tool_session() as db:
+    async with get_tool_session(user_id) as db:
         result = await db.execute(
             select(Resume)
             .where(Resume.user_id == user_id)
@@ -34,20 +42,26 @@ async def get_all_resumes(state: Annotated[dict, InjectedState]) -> str:
                 "id": r.id,
                 "url": r.url,
                 "content_preview": r.content[:200] + "..." if len(r.content) > 200 else r.content,
-                "created_at": r.created_at.isoformat(),
+                "created_at": r.created_at.date().isoformat(),
             })
-        return json.dumps(items, indent=2)
+        return encode_table(items, budget=tool_budget("get_all_resumes"), fields=fields, page=page)
 
 
 @tool
-async def get_resume_content(resume_id: int, state: Annotated[dict, InjectedState]) -> str:
-    """Get the full extracted text content of a specific resume by its ID.
+@cached_tool
+async def get_resume_content(
+    resume_id: int,
+    state: Annotated[dict, InjectedState],
+    page: int = 1,
+) -> str:
+    """Get the extracted text content of a specific resume by its ID.
+    Long resumes are paged: if the output has next_page, call again with that page.
     Use this when the user wants to see the actual content of a resume,
     or when you need the resume text to answer questions about it.
     """
     user_id = state["user_id"]
 
-    async with get_tool_session() as db:
+    async with get_tool_session(user_id) as db:
         result = await db.execute(
             select(Resume).where(
                 Resume.id == resume_id, Resume.user_id == user_id
@@ -58,9 +72,13 @@ async def get_resume_content(resume_id: int, state: Annotated[dict, InjectedStat
         if not resume:
             return f"Resume with ID {resume_id} not found."
 
-        return json.dumps({
-            "id": resume.id,
-            "url": resume.url,
-            "content": resume.content,
-            "created_at": resume.created_at.isoformat(),
-        }, indent=2)
+        return encode_text(
+            resume.content,
+            budget=tool_budget("get_resume_content"),
+            page=page,
+            meta={
+                "id": resume.id,
+                "url": resume.url,
+                "created_at": resume.created_at.date().isoformat(),
+            },
+        )
@@ -0,0 +1,208 @@
+from typing import Annotated
+
+from langchain_core.tools import tool
+from langgraph.prebuilt import InjectedState
+from sqlalchemy import case, desc, func, select
+
+from app.agents.chatbot.tools.cache import cached_tool
+from app.agents.chatbot.tools.encoding import dumps, encode_table, tool_budget
+from app.core.db import get_tool_session
+from app.models.analysis import Analysis
+from app.models.job import Job
+
+EXPERIENCE_BUCKETS = [(0, 2, "0-2y"), (2, 5, "2-5y"), (5, 10, "5-10y")]
+EXPERIENCE_BUCKET_OVERFLOW = "10y+"
+
+
+async def _job_title(db, job_id: int, user_id: int) -> str | None:
+    result = await db.execute(
+        select(Job.title).where(Job.id == job_id, Job.user_id == user_id)
+    )
+    return result.scalar_one_or_none()
+
+
+@tool
+@cached_tool
+async def get_recommendation_counts(
+    state: Annotated[dict, InjectedState],
+    job_id: int | None = None,
+) -> str:
+    """Count candidates by recommendation (HIRE / CONSIDER / REJECT), computed in the database.
+    Optionally filter by job_id. Use this for questions like "how many candidates did I reject?"
+    instead of listing all analyses.
+    """
+    user_id = state["user_id"]
+
+    async with get_tool_session(user_id) as db:
+        query = (
+            select(Analysis.recommendation, func.count())
+            .where(Analysis.user_id == user_id)
+            .group_by(Analysis.recommendation)
+        )
+        data: dict = {}
+        if job_id is not None:
+            title = await _job_title(db, job_id, user_id)
+            if title is None:
+                return f"Job with ID {job_id} not found."
+            query = query.where(Analysis.job_id == job_id)
+            data["job_title"] = title
+
+        result = await db.execute(query)
+        counts = {rec: count for rec, count in result.all()}
+        data["total"] = sum(counts.values())
+        for rec in ("HIRE", "CONSIDER", "REJECT"):
+            data[rec] = counts.get(rec, 0)
+        return dumps(data)
+
+
+@tool
+@cached_tool
+async def get_score_statistics(
+    state: Annotated[dict, InjectedState],
+    job_id: int | None = None,
+) -> str:
+    """Get overall-score statistics computed in the database: count, average, min, max
+    and percentiles (p25, median, p75, p90). Optionally filter by job_id.
+    Use this for questions about average or typical scores.
+    """
+    user_id = state["user_id"]
+    score = Analysis.overall_score
+
+    async with get_tool_session(user_id) as db:
+        query = select(
+            func.count(),
+            func.avg(score),
+            func.min(score),
+            func.max(score),
+            func.percentile_cont(0.25).within_group(score),
+            func.percentile_cont(0.5).within_group(score),
+            func.percentile_cont(0.75).within_group(score),
+            func.percentile_cont(0.9).within_group(score),
+        ).where(Analysis.user_id == user_id)
+
+        data: dict = {}
+        if job_id is not None:
+            title = await _job_title(db, job_id, user_id)
+            if title is None:
+                return f"Job with ID {job_id} not found."
+            query = query.where(Analysis.job_id == job_id)
+            data["job_title"] = title
+
+        count, avg, low, high, p25, p50, p75, p90 = (await db.execute(query)).one()
+        if not count:
+            return "No analyses found."
+
+        data.update({
+            "count": count,
+            "avg": round(float(avg), 1),
+            "min": low,
+            "max": high,
+            "p25": round(p25, 1),
+            "median": round(p50, 1),
+            "p75": round(p75, 1),
+            "p90": round(p90, 1),
+        })
+        return dumps(data)
+
+
+@tool
+@cached_tool
+async def get_job_statistics(
+    state: Annotated[dict, InjectedState],
+    page: int = 1,
+) -> str:
+    """Get per-job candidate statistics computed in the database: number of candidates,
+    average and best overall score, and HIRE / CONSIDER / REJECT counts for each job.
+    Jobs are ordered by candidate count; if the output has next_page, call again with that page.
+    Use this for questions comparing jobs or asking for averages per job.
+    """
+    user_id = state["user_id"]
+    rec = Analysis.recommendation
+
+    async with get_tool_session(user_id) as db:
+        result = await db.execute(
+            select(
+                Job.id,
+                Job.title,
+                func.count(Analysis.id),
+                func.avg(Analysis.overall_score),
+                func.max(Analysis.overall_score),
+                func.count(Analysis.id).filter(rec == "HIRE"),
+                func.count(Analysis.id).filter(rec == "CONSIDER"),
+                func.count(Analysis.id).filter(rec == "REJECT"),
+            )
+            .outerjoin(Analysis, Analysis.job_id == Job.id)
+            .where(Job.user_id == user_id)
+            .group_by(Job.id, Job.title)
+            .order_by(desc(func.count(Analysis.id)))
+        )
+        rows = result.all()
+
+        if not rows:
+            return "No jobs found. The user hasn't created any job positions yet."
+
+        items = [
+            {
+                "job_id": job_id,
+                "title": title,
+                "candidates": count,
+                "avg_score": round(float(avg), 1) if avg is not None else None,
+                "best_score": best,
+                "hire": hire,
+                "consider": consider,
+                "reject": reject,
+            }
+            for job_id, title, count, avg, best, hire, consider, reject in rows
+        ]
+        return encode_table(items, budget=tool_budget("get_job_statistics"), page=page)
+
+
+@tool
+@cached_tool
+async def get_experience_distribution(
+    state: Annotated[dict, InjectedState],
+    job_id: int | None = None,
+) -> str:
+    """Get the distribution of candidates by total years of experience
+    (0-2, 2-5, 5-10, 10+ years) with the candidate count and average score per bucket,
+    computed in the database. Optionally filter by job_id.
+    """
+    user_id = state["user_id"]
+    years = Analysis.total_experience_years
+    bucket = case(
+        *[((years >= low) & (years < high), label) for low, high, label in EXPERIENCE_BUCKETS],
+        else_=EXPERIENCE_BUCKET_OVERFLOW,
+    ).label("bucket")
+
+    async with get_tool_session(user_id) as db:
+        query = (
+            select(bucket, func.count(), func.avg(Analysis.overall_score))
+            .where(Analysis.user_id == user_id)
+            .group_by(bucket)
+        )
+        data: dict = {}
+        if job_id is not None:
+            title = await _job_title(db, job_id, user_id)
+            if title is None:
+                return f"Job with ID {job_id} not found."
+            query = query.where(Analysis.job_id == job_id)
+            data["job_title"] = title
+
+        result = await db.execute(query)
+        by_bucket = {label: (count, avg) for label, count, avg in result.all()}
+        if not by_bucket:
+            return "No analyses found."
+
+        labels = [label for _, _, label in EXPERIENCE_BUCKETS] + [EXPERIENCE_BUCKET_OVERFLOW]
+        items = [
+            {
+                "experience": label,
+                "candidates": by_bucket[label][0],
+                "avg_score": round(float(by_bucket[label][1]), 1),
+            }
+            for label in labels
+            if label in by_bucket
+        ]
+        return encode_table(
+            items, budget=tool_budget("get_experience_distribution"), meta=data
+        )
@@ -1,4 +1,5 @@
 from typing import Protocol
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph.state import CompiledStateGraph
 
 
@@ -25,14 +26,14 @@ def get_agent(name: str) -> CompiledStateGraph:
     return _registry[name]
 
 
-def startup_agents() -> None:
+def startup_agents(checkpointer: BaseCheckpointSaver | None = None) -> None:
     """Register all agents at application startup.
 
     Import and register each agent's compiled graph here.
     To add a new agent:
-        1. Create agents/<name>/graph.py with a compiled_graph
-        2. Import and register it below
+        1. Create agents/<name>/graph.py with a build_<name>_graph(checkpointer)
+        2. Import, build and register it below
     """
-    from app.agents.chatbot.graph import compiled_graph as chatbot_graph
+    from app.agents.chatbot.graph import build_chatbot_graph
 
-    register_agent("chatbot", chatbot_graph)
+    register_agent("chatbot", build_chatbot_graph(checkpointer))
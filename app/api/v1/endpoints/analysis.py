@@ -2,15 +2,24 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, Query, status
 
+from app.core.admission import admission
 from app.core.dependencies import get_current_user, TokenUser
 from app.schemas.analysis import AnalysisRequest, AnalysisResponse
-from app.services.analysis_service import AnalysisService, get_analysis_service
+from app.services.analysis_service import (
+    AnalysisService,
+    get_analysis_read_service,
+    get_analysis_service,
+)
 from app.utils.utils import success_response
 
 router = APIRouter()
 
 
-@router.post("", status_code=status.HTTP_201_CREATED)
+@router.post(
+    "",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(admission("analysis"))],
+)
 async def create_analysis(
     body: AnalysisRequest = Depends(),
     current_user: TokenUser = Depends(get_current_user),
@@ -23,6 +32,7 @@ async def create_analysis(
         file=body.file,
         job_id=body.job_id,
         user=current_user,
+        batch=body.batch,
     )
 
     return success_response(
@@ -35,7 +45,7 @@ async def create_analysis(
 async def get_analyses(
     job_id: Optional[int] = Query(default=None),
     current_user: TokenUser = Depends(get_current_user),
-    service: AnalysisService = Depends(get_analysis_service),
+    service: AnalysisService = Depends(get_analysis_read_service),
 ):
     """Get all analyses for the authenticated user, optionally filtered by job."""
     analyses = await service.get_analyses_by_user(current_user, job_id=job_id)
@@ -49,7 +59,7 @@ async def get_analyses(
 async def get_analysis_by_id(
     analysis_id: int,
     current_user: TokenUser = Depends(get_current_user),
-    service: AnalysisService = Depends(get_analysis_service),
+    service: AnalysisService = Depends(get_analysis_read_service),
 ):
     """Get a single analysis by ID for the authenticated user."""
     analysis = await service.get_analysis_by_id(analysis_id, current_user)
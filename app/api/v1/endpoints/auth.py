@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, status
 
+from app.core.dependencies import TokenUser, get_current_user
+from app.core.security import revoke_token
 from app.schemas.user import UserLogin, UserRegister
 from app.services.auth_service import AuthService, get_auth_service
 from app.utils.utils import success_response
@@ -24,3 +26,10 @@ async def login(
     user = await auth_service.login(credentials)
     return success_response("User logged in successfully", data=user)
 
+
+@router.post("/logout", status_code=status.HTTP_200_OK)
+async def logout(current_user: TokenUser = Depends(get_current_user)):
+    """Revoke the access token used for this request."""
+    if current_user.jti and current_user.exp:
+        await revoke_token(current_user.jti, current_user.exp)
+    return success_response("User logged out successfully", data=None)
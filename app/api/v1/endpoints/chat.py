@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Request
 from fastapi.responses import StreamingResponse
 
-from app.core.dependencies import TokenUser, get_current_user, get_db
+from app.core.admission import AdmissionLease, admission_lease, release_when_done
+from app.core.dependencies import TokenUser, get_current_user, get_db, get_read_db
 from app.core.exceptions import NotFoundException
 from app.schemas.chat import ChatRequest
 from app.services.chat_service import ChatService
@@ -10,37 +11,85 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
+
 
 def get_chat_service(db: AsyncSession = Depends(get_db)) -> ChatService:
     return ChatService(db)
 
 
+def get_chat_read_service(db: AsyncSession = Depends(get_read_db)) -> ChatService:
+    return ChatService(db)
+
+
+def get_streaming_chat_service() -> ChatService:
+    """ChatService without a request-scoped session.
+
+    Streaming opens its own short transactions, so no pooled connection is
+    held for the lifetime of the StreamingResponse.
+    """
+    return ChatService()
+
+
 @router.post("/")
 async def chat(
     request: ChatRequest,
+    http_request: Request,
     user: TokenUser = Depends(get_current_user),
-    service: ChatService = Depends(get_chat_service),
+    service: ChatService = Depends(get_streaming_chat_service),
+    lease: AdmissionLease = Depends(admission_lease("chat")),
+):
+    """Stream AI chatbot response as SSE.
+
+    Events are numbered for Last-Event-ID resumption. If the client goes
+    away and does not resume within CHAT_STREAM_RESUME_GRACE_SECONDS,
+    generation is cancelled and the partial answer is saved with
+    is_truncated set. The admission lease is held until generation ends
+    (if the turn never starts, the dependency releases it).
+    """
+    stream = await service.start_turn(user.id, request.message, request.conversation_id)
+    if not stream:
+        raise NotFoundException(message=f"Conversation {request.conversation_id} not found")
+    release_when_done(stream.task, lease)
+
+    return StreamingResponse(
+        stream.attach(is_disconnected=http_request.is_disconnected),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
+@router.get("/streams/{stream_id}")
+async def resume_chat_stream(
+    stream_id: str,
+    http_request: Request,
+    last_event_id: int = Header(default=0, alias="Last-Event-ID"),
+    user: TokenUser = Depends(get_current_user),
+    service: ChatService = Depends(get_streaming_chat_service),
 ):
-    """Stream AI chatbot response as SSE."""
+    """Resume a dropped chat stream (stream_id from the meta event).
+
+    Replays the events after Last-Event-ID and follows the live answer
+    without generating it again.
+    """
+    stream = service.get_stream(stream_id, user.id)
+    if not stream:
+        raise NotFoundException(message=f"Chat stream {stream_id} not found")
     return StreamingResponse(
-        service.stream_message(
-            user_id=user.id,
-            message=request.message,
-            conversation_id=request.conversation_id,
-        ),
+        stream.attach(last_event_id, is_disconnected=http_request.is_disconnected),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
+        headers=SSE_HEADERS,
     )
 
 
 @router.get("/conversations")
 async def get_conversations(
     user: TokenUser = Depends(get_current_user),
-    service: ChatService = Depends(get_chat_service),
+    service: ChatService = Depends(get_chat_read_service),
 ):
     """List all conversations for the authenticated user."""
     conversations = await service.get_conversations(user.id)
@@ -54,7 +103,7 @@ async def get_conversations(
 async def get_conversation(
     conversation_id: int,
     user: TokenUser = Depends(get_current_user),
-    service: ChatService = Depends(get_chat_service),
+    service: ChatService = Depends(get_chat_read_service),
 ):
     """Get a conversation with all its messages."""
     detail = await service.get_conversation_detail(conversation_id, user.id)
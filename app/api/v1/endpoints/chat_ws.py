@@ -0,0 +1,213 @@
+import asyncio
+import logging
+
+import orjson
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
+
+from app.core.admission import admission_controller, release_when_done
+from app.core.config import settings
+from app.core.dependencies import TokenUser, authenticate_token
+from app.core.exceptions import AppException, UnauthorizedException
+from app.schemas.chat import ChatRequest
+from app.services.chat_service import ChatService
+from app.services.chat_streams import ChatStream
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class ChatSocket:
+    """One authenticated chat WebSocket carrying turns of several conversations.
+
+    Client messages are JSON (text or binary frames):
+
+        {"type": "chat", "ref": "a1", "message": "...", "conversation_id": 12 | null}
+        {"type": "resume", "ref": "a1", "stream_id": "...", "last_event_id": 40}
+        {"type": "cancel", "ref": "a1"}
+        {"type": "ping"}
+
+    Server messages are orjson-encoded binary frames. Turn events are the same
+    as the SSE events, tagged with the client's `ref` and the event `id`.
+
+    The socket outlives the token it was opened with, so the token is
+    verified again (expiry and revocation) before every chat or resume; once
+    it fails the socket is closed with 1008.
+    """
+
+    def __init__(self, websocket: WebSocket, token: str, user: TokenUser, service: ChatService):
+        self.websocket = websocket
+        self.token = token
+        self.user = user
+        self.service = service
+        self._outbox: asyncio.Queue[bytes] = asyncio.Queue()
+        self._relays: dict[str, asyncio.Task] = {}
+        self._streams: dict[str, ChatStream] = {}
+
+    async def run(self) -> None:
+        writer = asyncio.create_task(self._write())
+        try:
+            while True:
+                data = await self._receive()
+                if data is None:
+                    continue
+                if data.get("type") in ("chat", "resume") and not self._authorized():
+                    await self.websocket.close(
+                        code=status.WS_1008_POLICY_VIOLATION, reason="Token expired or revoked"
+                    )
+                    return
+                self._dispatch(data)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            # Detached turns keep running for the resume grace period (see ChatStream)
+            for task in self._relays.values():
+                task.cancel()
+            writer.cancel()
+
+    def _authorized(self) -> bool:
+        try:
+            authenticate_token(self.token)
+        except UnauthorizedException:
+            return False
+        return True
+
+    def send(self, payload: dict) -> None:
+        self._outbox.put_nowait(orjson.dumps(payload))
+
+    def _dispatch(self, data: dict) -> None:
+        kind = data.get("type")
+        ref = str(data.get("ref", ""))
+
+        if kind == "ping":
+            self.send({"type": "pong"})
+        elif kind == "chat":
+            if ref in self._relays:
+                self.send({"type": "error", "ref": ref, "content": "A turn with this ref is already running"})
+            elif len(self._relays) >= settings.CHAT_WS_MAX_ACTIVE_TURNS:
+                self.send({"type": "error", "ref": ref, "content": "Too many active turns on this connection"})
+            else:
+                try:
+                    request = ChatRequest.model_validate(data)
+                except ValidationError:
+                    self.send({"type": "error", "ref": ref, "content": "Invalid chat message"})
+                    return
+                self._start(ref, self._chat(ref, request))
+        elif kind == "resume":
+            stream = self.service.get_stream(str(data.get("stream_id")), self.user.id)
+            last_event_id = data.get("last_event_id") or 0
+            if ref in self._relays:
+                self.send({"type": "error", "ref": ref, "content": "A turn with this ref is already running"})
+            elif not stream or not isinstance(last_event_id, int):
+                self.send({"type": "error", "ref": ref, "content": "Chat stream not found"})
+            else:
+                self._start(ref, self._follow(ref, stream, last_event_id))
+        elif kind == "cancel":
+            stream = self._streams.get(ref)
+            if stream and stream.task:
+                stream.task.cancel()
+        else:
+            self.send({"type": "error", "ref": ref, "content": f"Unknown message type: {kind}"})
+
+    def _start(self, ref: str, relay) -> None:
+        task = asyncio.create_task(relay)
+        self._relays[ref] = task
+        task.add_done_callback(lambda _: self._forget(ref))
+
+    def _forget(self, ref: str) -> None:
+        self._relays.pop(ref, None)
+        self._streams.pop(ref, None)
+
+    async def _chat(self, ref: str, request: ChatRequest) -> None:
+        try:
+            lease = await admission_controller.admit(self.user.id, "chat")
+        except AppException as e:
+            retry_after = (e.headers or {}).get("Retry-After")
+            self.send({"type": "error", "ref": ref, "content": e.message, "retry_after": retry_after and int(retry_after)})
+            return
+
+        try:
+            stream = await self.service.start_turn(self.user.id, request.message, request.conversation_id)
+        except BaseException as e:
+            await lease.release()
+            if not isinstance(e, Exception):
+                raise
+            logger.exception("Chat turn failed")
+            self.send({"type": "error", "ref": ref, "content": str(e)})
+            return
+        if not stream:
+            await lease.release()
+            self.send({"type": "error", "ref": ref, "content": "Conversation not found"})
+            return
+        # Held until generation ends, which may be after this socket closes
+        release_when_done(stream.task, lease)
+
+        try:
+            await self._follow(ref, stream)
+        except Exception as e:
+            logger.exception("Chat turn failed")
+            self.send({"type": "error", "ref": ref, "content": str(e)})
+
+    async def _follow(self, ref: str, stream: ChatStream, last_event_id: int = 0) -> None:
+        self._streams[ref] = stream
+        async for event_id, payload in stream.follow(last_event_id):
+            self.send({"ref": ref, "id": event_id, **payload})
+
+    async def _receive(self) -> dict | None:
+        data = decode_message(await self.websocket.receive())
+        if data is None:
+            self.send({"type": "error", "content": "Messages must be JSON objects"})
+            return None
+        return data
+
+    async def _write(self) -> None:
+        while True:
+            await self.websocket.send_bytes(await self._outbox.get())
+
+
+def decode_message(message: dict) -> dict | None:
+    """Parse a received ASGI WebSocket message; None unless it is a JSON object."""
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", status.WS_1000_NORMAL_CLOSURE))
+    try:
+        data = orjson.loads(message.get("bytes") or message.get("text") or b"")
+    except orjson.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+async def authenticate_socket(websocket: WebSocket) -> tuple[str, TokenUser]:
+    """Authenticate from the handshake Authorization header or a first {"type": "auth"} message.
+
+    Returns the bearer token along with its user, for re-checking later.
+    """
+    authorization = websocket.headers.get("authorization")
+    if authorization:
+        token = authorization.removeprefix("Bearer ")
+        return token, authenticate_token(token)
+
+    data = decode_message(
+        await asyncio.wait_for(websocket.receive(), timeout=settings.CHAT_WS_AUTH_TIMEOUT_SECONDS)
+    )
+    if not data or data.get("type") != "auth" or not data.get("token"):
+        raise UnauthorizedException(message="Expected an auth message")
+    token = str(data["token"]).removeprefix("Bearer ")
+    return token, authenticate_token(token)
+
+
+@router.websocket("/ws")
+async def chat_socket(websocket: WebSocket):
+    """Chat over a single WebSocket: authenticate once, then stream many turns."""
+    await websocket.accept()
+    try:
+        token, user = await authenticate_socket(websocket)
+    except WebSocketDisconnect:
+        return
+    except (UnauthorizedException, TimeoutError) as e:
+        reason = e.message if isinstance(e, UnauthorizedException) else "Authentication timed out"
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=reason)
+        return
+
+    await websocket.send_bytes(orjson.dumps({"type": "ready", "user_id": user.id}))
+    await ChatSocket(websocket, token, user, ChatService()).run()
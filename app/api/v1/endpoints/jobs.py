@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, status
 
 from app.core.dependencies import get_current_user, TokenUser
 from app.schemas.job import JobCreate, JobResponse
-from app.services.job_service import JobService, get_job_service
+from app.services.job_service import JobService, get_job_read_service, get_job_service
 from app.utils.utils import success_response
 
 router = APIRouter()
@@ -22,7 +22,7 @@ async def create_job(
 @router.get("", status_code=status.HTTP_200_OK)
 async def get_jobs_by_user(
     current_user: TokenUser = Depends(get_current_user),
-    job_service: JobService = Depends(get_job_service),
+    job_service: JobService = Depends(get_job_read_service),
 ):
     """Get all jobs for the authenticated user."""
     jobs = await job_service.get_jobs_by_user(current_user)
@@ -33,7 +33,7 @@ async def get_jobs_by_user(
 async def get_job_by_id(
     job_id: int,
     current_user: TokenUser = Depends(get_current_user),
-    job_service: JobService = Depends(get_job_service),
+    job_service: JobService = Depends(get_job_read_service),
 ):
     """Get a job by ID for the authenticated user."""
     job = await job_service.get_job_by_id(job_id, current_user)
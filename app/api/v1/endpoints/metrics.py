@@ -0,0 +1,20 @@
+import secrets
+
+from fastapi import APIRouter, Header
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.exceptions import UnauthorizedException
+from app.core.metrics import registry
+
+router = APIRouter()
+
+
+@router.get("", response_class=PlainTextResponse)
+async def metrics(authorization: str | None = Header(default=None)):
+    """Process metrics in the Prometheus text format (only routed when METRICS_TOKEN is set)."""
+    if not settings.METRICS_TOKEN or not secrets.compare_digest(
+        authorization or "", f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        raise UnauthorizedException(message="Invalid metrics token")
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,5 +1,6 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, jobs, analysis, chat
+from app.api.v1.endpoints import auth, jobs, analysis, chat, chat_ws, metrics
+from app.core.config import settings
 
 router = APIRouter()
 
@@ -7,3 +8,9 @@ router.include_router(auth.router, prefix="/auth", tags=["Auth"])
 router.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
 router.include_router(analysis.router, prefix="/analyses", tags=["Analyses"])
 router.include_router(chat.router, prefix="/chat", tags=["Chat"])
+
+if settings.CHAT_WS_ENABLED:
+    router.include_router(chat_ws.router, prefix="/chat", tags=["Chat"])
+
+if settings.METRICS_TOKEN:
+    router.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
@@ -0,0 +1,313 @@
+import asyncio
+import logging
+import math
+import sqlite3
+import threading
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass
+
+from fastapi import Depends
+
+from app.core.config import settings
+from app.core.dependencies import TokenUser, get_current_user
+from app.core.exceptions import ServiceUnavailableException, TooManyRequestsException
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+admission_rejected = registry.counter(
+    "admission_rejected_total", "Requests rejected by admission control", ("route", "reason")
+)
+
+
+@dataclass(frozen=True)
+class UserLimit:
+    concurrency: int  # requests in flight per user
+    per_minute: int  # token bucket refill rate; also the burst size. 0 = no rate limit
+
+
+# A bucket holds at most per_minute tokens and refills per_minute a minute, so one
+# left alone this long is full again: the same as having no bucket at all.
+BUCKET_REFILL_SECONDS = 60.0
+
+
+ROUTE_LIMITS = {
+    "analysis": UserLimit(settings.ADMISSION_ANALYSIS_CONCURRENCY, settings.ADMISSION_ANALYSIS_PER_MINUTE),
+    "chat": UserLimit(settings.ADMISSION_CHAT_CONCURRENCY, settings.ADMISSION_CHAT_PER_MINUTE),
+}
+
+
+def _take_token(tokens: float, updated_at: float, now: float, limit: UserLimit) -> tuple[float, float]:
+    """Refill a token bucket and take one token; returns (tokens left, seconds until one is available)."""
+    if limit.per_minute <= 0:
+        return tokens, 0.0
+    rate = limit.per_minute / BUCKET_REFILL_SECONDS
+    tokens = min(float(limit.per_minute), tokens + (now - updated_at) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryAdmissionBackend:
+    """Per-user leases and token buckets for a single worker process."""
+
+    blocking = False
+
+    def __init__(self, lease_ttl: float):
+        self.lease_ttl = lease_ttl
+        self._leases: dict[str, dict[str, float]] = defaultdict(dict)  # key -> lease id -> expiry
+        self._buckets: dict[str, tuple[float, float]] = {}  # key -> (tokens, updated_at)
+        self._next_sweep = 0.0
+
+    def try_acquire(self, key: str, limit: UserLimit, lease_id: str) -> tuple[str, float] | None:
+        """Take a lease for `key`; returns (reason, retry_after) when the user is over a limit."""
+        now = time.time()
+        if now >= self._next_sweep:
+            self._sweep(now)
+        leases = self._leases[key]
+        for expired in [lid for lid, expires_at in leases.items() if expires_at <= now]:
+            del leases[expired]
+        if len(leases) >= limit.concurrency:
+            return "concurrency", settings.ADMISSION_RETRY_AFTER_SECONDS
+
+        tokens, updated_at = self._buckets.get(key, (float(limit.per_minute), now))
+        tokens, wait = _take_token(tokens, updated_at, now, limit)
+        if wait:
+            return "rate", wait
+        self._buckets[key] = (tokens, now)
+        leases[lease_id] = now + self.lease_ttl
+        return None
+
+    def release(self, key: str, lease_id: str) -> None:
+        leases = self._leases.get(key)
+        if leases is not None:
+            leases.pop(lease_id, None)
+            if not leases:
+                del self._leases[key]
+
+    def _sweep(self, now: float) -> None:
+        """Forget refilled buckets and keys without leases, at most once per refill period."""
+        idle_since = now - BUCKET_REFILL_SECONDS
+        self._buckets = {k: b for k, b in self._buckets.items() if b[1] > idle_since}
+        for key in [k for k, leases in self._leases.items() if not leases]:
+            del self._leases[key]
+        self._next_sweep = now + BUCKET_REFILL_SECONDS
+
+
+class SQLiteAdmissionBackend:
+    """Per-user leases and token buckets shared by all workers on a host via one SQLite file.
+
+    Leases carry an expiry, so a worker that dies mid-request can't hold a
+    user's slots forever.
+    """
+
+    blocking = True
+
+    def __init__(self, path: str, lease_ttl: float):
+        self.lease_ttl = lease_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases (lease_id TEXT PRIMARY KEY, key TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS leases_key ON leases (key, expires_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._next_sweep = 0.0
+
+    def try_acquire(self, key: str, limit: UserLimit, lease_id: str) -> tuple[str, float] | None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM leases WHERE key = ? AND expires_at <= ?", (key, now))
+                (active,) = self._conn.execute("SELECT count(*) FROM leases WHERE key = ?", (key,)).fetchone()
+                if active >= limit.concurrency:
+                    self._conn.execute("ROLLBACK")
+                    return "concurrency", settings.ADMISSION_RETRY_AFTER_SECONDS
+
+                row = self._conn.execute("SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens, wait = _take_token(*(row or (float(limit.per_minute), now)), now, limit)
+                if wait:
+                    self._conn.execute("ROLLBACK")
+                    return "rate", wait
+
+                if now >= self._next_sweep:
+                    self._conn.execute("DELETE FROM buckets WHERE updated_at <= ?", (now - BUCKET_REFILL_SECONDS,))
+                    self._next_sweep = now + BUCKET_REFILL_SECONDS
+                self._conn.execute(
+                    "INSERT INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                    (key, tokens, now),
+                )
+                self._conn.execute(
+                    "INSERT INTO leases (lease_id, key, expires_at) VALUES (?, ?, ?)",
+                    (lease_id, key, now + self.lease_ttl),
+                )
+                self._conn.execute("COMMIT")
+                return None
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def release(self, key: str, lease_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE lease_id = ?", (lease_id,))
+
+
+class AdmissionLease:
+    """One admitted request; release exactly once when the work is done (extra calls are no-ops).
+
+    `detached` is set once something other than the request (a producer task)
+    has taken over releasing it.
+    """
+
+    def __init__(self, controller: "AdmissionController | None" = None, key: str = "", lease_id: str = ""):
+        self._controller = controller
+        self._key = key
+        self._lease_id = lease_id
+        self.detached = False
+
+    async def release(self) -> None:
+        controller, self._controller = self._controller, None
+        if controller is not None:
+            await controller.release(self._key, self._lease_id)
+
+
+class AdmissionController:
+    """Per-user limits plus a global in-flight cap for expensive routes.
+
+    Per-user concurrency and rate limits reject with 429. The global cap is
+    per worker process, since it protects the worker's own DB pool and event
+    loop: requests beyond it wait in a bounded queue, and once the queue is
+    full (or the wait times out) they are shed with 503. Both carry Retry-After.
+    """
+
+    def __init__(self, backend, max_in_flight: int, max_queue: int, queue_timeout: float):
+        self.backend = backend
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    async def admit(self, user_id: int, route: str) -> AdmissionLease:
+        if not settings.ADMISSION_ENABLED:
+            return AdmissionLease()
+
+        key = f"{route}:{user_id}"
+        lease_id = uuid.uuid4().hex
+        rejected = await self._call(self.backend.try_acquire, key, ROUTE_LIMITS[route], lease_id)
+        if rejected:
+            reason, retry_after = rejected
+            admission_rejected.labels(route, reason).inc()
+            message = (
+                "Too many requests in progress" if reason == "concurrency" else "Rate limit exceeded"
+            )
+            raise TooManyRequestsException(message=message, retry_after=math.ceil(retry_after))
+
+        try:
+            await self._enter(route)
+        except BaseException:
+            await self._call(self.backend.release, key, lease_id)
+            raise
+        return AdmissionLease(self, key, lease_id)
+
+    async def release(self, key: str, lease_id: str) -> None:
+        self.in_flight -= 1
+        self._slots.release()
+        await self._call(self.backend.release, key, lease_id)
+
+    async def _enter(self, route: str) -> None:
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            self._shed(route, "queue_full")
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except TimeoutError:
+            self._shed(route, "queue_timeout")
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+
+    def _shed(self, route: str, reason: str) -> None:
+        admission_rejected.labels(route, reason).inc()
+        logger.warning("Shedding %s request: %s (%d in flight, %d queued)", route, reason, self.in_flight, self.waiting)
+        raise ServiceUnavailableException(retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS)
+
+    async def _call(self, fn, *args):
+        if self.backend.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
+
+
+def _create_backend():
+    if settings.ADMISSION_BACKEND == "sqlite":
+        return SQLiteAdmissionBackend(settings.ADMISSION_SQLITE_PATH, settings.ADMISSION_LEASE_TTL_SECONDS)
+    return MemoryAdmissionBackend(settings.ADMISSION_LEASE_TTL_SECONDS)
+
+
+admission_controller = AdmissionController(
+    backend=_create_backend(),
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+    max_queue=settings.ADMISSION_MAX_QUEUE,
+    queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+)
+registry.gauge("admission_in_flight", "Admitted expensive requests in flight", fn=lambda: admission_controller.in_flight)
+registry.gauge("admission_queued", "Requests waiting for a global in-flight slot", fn=lambda: admission_controller.waiting)
+
+
+def admission(route: str):
+    """Dependency admitting the current user for `route` for the duration of the request."""
+
+    async def dependency(user: TokenUser = Depends(get_current_user)) -> AsyncGenerator[None, None]:
+        lease = await admission_controller.admit(user.id, route)
+        try:
+            yield
+        finally:
+            await lease.release()
+
+    return dependency
+
+
+def admission_lease(route: str):
+    """Dependency returning the lease itself, for responses that outlive the handler (streams).
+
+    The handler hands the lease to the work that outlives it with
+    release_when_done(). Otherwise the lease is released when the request
+    ends, including when it fails body validation or the handler raises.
+    """
+
+    async def dependency(user: TokenUser = Depends(get_current_user)) -> AsyncGenerator[AdmissionLease, None]:
+        lease = await admission_controller.admit(user.id, route)
+        try:
+            yield lease
+        finally:
+            if not lease.detached:
+                await lease.release()
+
+    return dependency
+
+
+_releasing: set[asyncio.Task] = set()
+
+
+def release_when_done(task: asyncio.Task, lease: AdmissionLease) -> None:
+    """Release `lease` when `task` finishes, not when its client goes away.
+
+    Chat turns keep generating after a disconnect (for the resume grace
+    period), so the lease has to cover the producer task itself.
+    """
+
+    def release(_: asyncio.Task) -> None:
+        releasing = asyncio.ensure_future(lease.release())
+        _releasing.add(releasing)
+        releasing.add_done_callback(_releasing.discard)
+
+    lease.detached = True
+    task.add_done_callback(release)
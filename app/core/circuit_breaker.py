@@ -0,0 +1,182 @@
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+import groq
+
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableException
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+breaker_transitions = registry.counter(
+    "llm_breaker_transitions_total", "Circuit breaker state changes", ("model", "state")
+)
+breaker_state = registry.gauge(
+    "llm_breaker_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ("model",)
+)
+breaker_rejected = registry.counter(
+    "llm_breaker_rejected_total", "LLM calls failed fast by an open circuit breaker", ("model",)
+)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenException(ServiceUnavailableException):
+    def __init__(self, model: str, retry_after: int):
+        super().__init__(
+            message="The AI service is temporarily unavailable, please retry shortly",
+            errors={"model": model},
+            retry_after=retry_after,
+        )
+
+
+def is_service_failure(exc: BaseException) -> bool:
+    """Whether an error says the model service is unhealthy: a timeout, connection error, 429 or 5xx.
+
+    Anything else (a bad request, invalid output, a bug on our side) would fail
+    on any healthy model too, so it isn't held against the breaker.
+    """
+    if isinstance(exc, (groq.APIConnectionError, TimeoutError, ConnectionError)):
+        return True
+    if isinstance(exc, groq.APIStatusError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return False
+
+
+class CircuitBreaker:
+    """Fails calls to one model fast while it is erroring or slow.
+
+    Outcomes of the last `window_seconds` are kept; once at least `min_calls`
+    have been seen, the breaker opens when the share of failures reaches
+    `failure_rate` or the share of calls slower than `slow_seconds` reaches
+    `slow_rate`; only errors for which is_service_failure() holds count as
+    failures. While open every call raises CircuitOpenException. After
+    `open_seconds` a single probe call is let through (half-open): success
+    closes the breaker, failure re-opens it for another period.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float,
+        min_calls: int,
+        failure_rate: float,
+        slow_seconds: float,
+        slow_rate: float,
+        open_seconds: float,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_seconds = slow_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._calls: deque[tuple[float, bool, bool]] = deque()  # (finished_at, failed, slow)
+        breaker_state.labels(name).set(_STATE_VALUES[CLOSED])
+
+    def available(self) -> bool:
+        """True if a call would be let through right now."""
+        if self.state == OPEN:
+            return time.monotonic() - self._opened_at >= self.open_seconds
+        return self.state == CLOSED or not self._probing
+
+    @asynccontextmanager
+    async def guard(self):
+        """Run one call under the breaker; raises CircuitOpenException while open."""
+        self._before_call()
+        probe = self.state == HALF_OPEN
+        start = time.monotonic()
+        try:
+            yield
+        except Exception as e:
+            if is_service_failure(e):
+                self._record(probe, failed=True, elapsed=time.monotonic() - start)
+            elif probe:
+                self._probing = False  # inconclusive; let the next call probe
+            raise
+        except BaseException:
+            # Cancelled by the caller, not the model's fault; free the probe slot
+            if probe:
+                self._probing = False
+            raise
+        self._record(probe, failed=False, elapsed=time.monotonic() - start)
+
+    def _before_call(self) -> None:
+        if self.state == OPEN:
+            remaining = self.open_seconds - (time.monotonic() - self._opened_at)
+            if remaining > 0:
+                self._reject(remaining)
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probing:
+                self._reject(self.open_seconds)
+            self._probing = True
+
+    def _reject(self, retry_after: float) -> None:
+        breaker_rejected.labels(self.name).inc()
+        raise CircuitOpenException(self.name, retry_after=max(1, math.ceil(retry_after)))
+
+    def _record(self, probe: bool, failed: bool, elapsed: float) -> None:
+        slow = elapsed >= self.slow_seconds
+        if probe:
+            self._probing = False
+            if failed or slow:
+                self._open()
+            else:
+                self._calls.clear()
+                self._transition(CLOSED)
+            return
+
+        now = time.monotonic()
+        self._calls.append((now, failed, slow))
+        while self._calls and self._calls[0][0] < now - self.window_seconds:
+            self._calls.popleft()
+        if self.state != CLOSED or len(self._calls) < self.min_calls:
+            return
+        failures = sum(1 for _, f, _ in self._calls if f)
+        slow_calls = sum(1 for _, _, s in self._calls if s)
+        if failures / len(self._calls) >= self.failure_rate or slow_calls / len(self._calls) >= self.slow_rate:
+            logger.warning(
+                "Opening circuit for %s: %d/%d failed, %d slow over %.0fs",
+                self.name, failures, len(self._calls), slow_calls, self.window_seconds,
+            )
+            self._open()
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state != self.state:
+            self.state = state
+            breaker_transitions.labels(self.name, state).inc()
+            breaker_state.labels(self.name).set(_STATE_VALUES[state])
+            logger.info("Circuit for %s is now %s", self.name, state)
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(model: str) -> CircuitBreaker:
+    """The shared breaker for `model`, so chat and analysis see the same health."""
+    breaker = _breakers.get(model)
+    if breaker is None:
+        breaker = _breakers[model] = CircuitBreaker(
+            model,
+            window_seconds=settings.LLM_BREAKER_WINDOW_SECONDS,
+            min_calls=settings.LLM_BREAKER_MIN_CALLS,
+            failure_rate=settings.LLM_BREAKER_FAILURE_RATE,
+            slow_seconds=settings.LLM_BREAKER_SLOW_SECONDS,
+            slow_rate=settings.LLM_BREAKER_SLOW_RATE,
+            open_seconds=settings.LLM_BREAKER_OPEN_SECONDS,
+        )
+    return breaker
@@ -14,11 +14,32 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = ""
+    # Optional read replica for GET endpoints and chatbot tools; empty = read from the primary
+    DATABASE_REPLICA_URL: str = ""
+    # After a user's own write, their reads stay on the primary this long (replication lag)
+    DB_REPLICA_STICKY_SECONDS: float = 5.0
+    # Per worker process and engine: size the pools so workers * (pool_size + max_overflow)
+    # stays below the server's (or PgBouncer's) connection limit
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # seconds to wait for a connection before erroring
+    DB_POOL_RECYCLE: int = 1800  # seconds; replace connections older than this
+    DB_POOL_PRE_PING: bool = True
+    # Transaction-mode PgBouncer in front of Postgres: disable prepared statement caches
+    DB_PGBOUNCER: bool = False
 
     @property
     def ASYNC_DATABASE_URL(self) -> str:
         """Convert postgresql:// to postgresql+asyncpg:// for async driver"""
-        url = self.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+        return self._async_url(self.DATABASE_URL)
+
+    @property
+    def ASYNC_DATABASE_REPLICA_URL(self) -> str:
+        return self._async_url(self.DATABASE_REPLICA_URL) if self.DATABASE_REPLICA_URL else ""
+
+    @staticmethod
+    def _async_url(database_url: str) -> str:
+        url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
         if "?" in url:
             base, _ = url.split("?", 1)
             url = base + "?ssl=require"
@@ -32,6 +53,35 @@ class Settings(BaseSettings):
     # Security
     JWT_SECRET: str = ""
     ALGORITHM: str = "HS256"
+    JWT_CACHE_MAX_ENTRIES: int = 10000  # verified tokens kept to skip re-verification
+    # Where logout records revoked token ids: "memory" only covers the worker that handled
+    # the logout; "sqlite" shares them across workers on a host (needs a writable path)
+    JWT_REVOCATION_BACKEND: str = "memory"  # "memory" | "sqlite"
+    JWT_REVOCATION_SQLITE_PATH: str = "revocations.sqlite"
+    JWT_REVOCATION_REFRESH_SECONDS: float = 2.0  # how soon other workers see a logout
+    # Bearer token required by GET /api/v1/metrics; the route isn't registered while this is empty
+    METRICS_TOKEN: str = ""
+    # Admission control for expensive routes (analysis uploads, chat turns)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_BACKEND: str = "memory"  # "memory" | "sqlite" (shares per-user limits across workers)
+    ADMISSION_SQLITE_PATH: str = "admission.sqlite"
+    ADMISSION_ANALYSIS_CONCURRENCY: int = 2  # per user
+    ADMISSION_ANALYSIS_PER_MINUTE: int = 10  # per user; 0 disables the rate limit
+    ADMISSION_CHAT_CONCURRENCY: int = 2
+    ADMISSION_CHAT_PER_MINUTE: int = 30
+    ADMISSION_MAX_IN_FLIGHT: int = 32  # per worker, all users and routes
+    ADMISSION_MAX_QUEUE: int = 64  # waiting for an in-flight slot before shedding with 503
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 10.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 5
+    ADMISSION_LEASE_TTL_SECONDS: float = 900.0  # upper bound on a lease held by a crashed worker
+    # Argon2 cost; raising it rehashes existing passwords on their next login
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536  # KiB per hash
+    ARGON2_PARALLELISM: int = 4
+    # Dedicated password hashing threads (0 = CPU count) and how many hashes may wait
+    # for one before requests are rejected with 429
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_MAX_QUEUE: int = 32
 
     # Cloudinary
     CLOUDINARY_CLOUD_NAME: str = ""
@@ -41,7 +91,96 @@ class Settings(BaseSettings):
     # Groq
     GROQ_API_KEY: str = ""
     GROQ_MODEL: str = "llama-3.3-70b-versatile"
-    
+    GROQ_SUMMARY_MODEL: str = "llama-3.1-8b-instant"
+    GROQ_FAST_MODEL: str = "llama-3.1-8b-instant"
+    # Used for analyses (and chat while GROQ_MODEL's circuit is open); empty disables fallback
+    GROQ_FALLBACK_MODEL: str = ""
+    GROQ_TIMEOUT_SECONDS: float = 60.0
+    GROQ_MAX_RETRIES: int = 1
+    # Per-model circuit breaker — opens when, over the window, the failure or slow-call
+    # share reaches its threshold; while open, calls fail fast with 503
+    LLM_BREAKER_WINDOW_SECONDS: float = 60.0
+    LLM_BREAKER_MIN_CALLS: int = 10
+    LLM_BREAKER_FAILURE_RATE: float = 0.5
+    LLM_BREAKER_SLOW_SECONDS: float = 30.0
+    LLM_BREAKER_SLOW_RATE: float = 0.8
+    LLM_BREAKER_OPEN_SECONDS: float = 30.0
+    # Hedged analyses — a duplicate request is sent once the first has run longer than
+    # this percentile of recent latencies; the budget caps hedges to a share of analyses
+    ANALYSIS_HEDGE_ENABLED: bool = False
+    ANALYSIS_HEDGE_PERCENTILE: float = 0.95
+    ANALYSIS_HEDGE_MIN_DELAY_SECONDS: float = 2.0
+    ANALYSIS_HEDGE_MIN_SAMPLES: int = 20  # no hedging until this many latencies are known
+    ANALYSIS_HEDGE_BUDGET_RATIO: float = 0.1
+    ANALYSIS_HEDGE_BUDGET_BURST: int = 5
+    # LLM scheduler — concurrent Groq calls per worker; batch work may hold at most
+    # LLM_BATCH_MAX_SLOTS of them so chat and single analyses always find capacity
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_BATCH_MAX_SLOTS: int = 2
+
+    # Chat fast path — greetings from templates, platform FAQs on GROQ_FAST_MODEL without tools
+    CHAT_FAST_PATH_ENABLED: bool = True
+    CHAT_FAST_PATH_TOKEN_BUDGET: int = 800
+
+    # Chat context window (token estimates, see app/utils/tokens.py)
+    CHAT_CONTEXT_TOKEN_BUDGET: int = 6000  # system prompt + history sent per LLM call
+    CHAT_SUMMARY_TRIGGER_TOKENS: int = 4000  # unsummarized history that triggers folding
+    CHAT_SUMMARY_KEEP_TOKENS: int = 1500  # most recent history kept verbatim when folding
+    CHAT_SUMMARY_MAX_WORDS: int = 250
+
+    # Chat SSE streaming — tokens are coalesced into one frame per window or size
+    CHAT_STREAM_COALESCE_MS: int = 20
+    CHAT_STREAM_COALESCE_BYTES: int = 256
+    # How often a streaming turn checks whether the client is still connected
+    CHAT_DISCONNECT_POLL_SECONDS: float = 0.5
+    # Resumable streams — events kept per turn for Last-Event-ID replay; a turn with
+    # no attached client is cancelled after the grace period
+    CHAT_STREAM_BUFFER_EVENTS: int = 1024
+    CHAT_STREAM_RESUME_GRACE_SECONDS: float = 15.0
+    CHAT_STREAM_RETENTION_SECONDS: float = 60.0
+    # Chat WebSocket — one authenticated socket multiplexing several conversations
+    CHAT_WS_ENABLED: bool = True
+    CHAT_WS_AUTH_TIMEOUT_SECONDS: float = 10.0
+    CHAT_WS_MAX_ACTIVE_TURNS: int = 4  # concurrent turns per socket
+
+    # Chat checkpointer — persists graph state (incl. tool results) per conversation.
+    # Opt-in: "postgres" opens its own pool (on top of DB_POOL_SIZE) and creates its
+    # tables with saver.setup(), outside alembic.
+    CHAT_CHECKPOINTER: str = "none"  # "none" | "memory" | "sqlite" | "postgres"
+    CHAT_CHECKPOINT_SQLITE_PATH: str = "checkpoints.sqlite"
+    CHAT_CHECKPOINT_POOL_SIZE: int = 5
+    CHAT_CHECKPOINT_MAX_TURNS: int = 30  # older turns are dropped from the thread
+    CHAT_TOOL_RESULT_KEEP_TURNS: int = 3  # older tool results are replaced by a stub
+
+    # Max DB sessions leased by chatbot tools at once (tool calls run in parallel)
+    TOOL_SESSION_CONCURRENCY: int = 8
+
+    # Per-user data digest appended to the chatbot system prompt
+    CHAT_DIGEST_ENABLED: bool = True
+    CHAT_DIGEST_MAX_JOBS: int = 10
+    CHAT_DIGEST_TOP_N: int = 3
+    CHAT_DIGEST_MAX_USERS: int = 1000
+    CHAT_DIGEST_TTL_SECONDS: int = 600
+
+    # Chatbot tool output budgets (estimated tokens per tool call; larger output is paged)
+    CHAT_TOOL_OUTPUT_TOKEN_BUDGET: int = 1500
+    CHAT_TOOL_OUTPUT_BUDGETS: dict[str, int] = {
+        "get_analysis_details": 2500,
+        "get_resume_content": 3000,
+    }
+
+    # Chatbot tool result cache (invalidated by per-user data version)
+    CHAT_TOOL_CACHE_MAX_ENTRIES: int = 2048
+    CHAT_TOOL_CACHE_TTL_SECONDS: int = 300
+
+    # Answer cache for first-turn questions (invalidated by per-user data version)
+    CHAT_ANSWER_CACHE_ENABLED: bool = True
+    CHAT_ANSWER_CACHE_MAX_ENTRIES: int = 5000
+    CHAT_ANSWER_CACHE_TTL_SECONDS: int = 900
+    # 0 = exact normalized match only; > 0 also matches questions with the same content
+    # words whose cosine over hashed n-grams reaches this score
+    CHAT_ANSWER_CACHE_SIMILARITY: float = 0.0
+
     # Prompts
     CHATBOT_SYSTEM_PROMPT: str = """\
 You are **Unroll AI Assistant**, a helpful and concise chatbot for the Unroll AI Resume Analyzer platform.
@@ -70,8 +209,14 @@ You help users understand their resume analysis data. You can:
    (e.g., job details + analyses for that job), call tools sequentially.
 6. **Error handling.** If a tool returns no results, inform the user
    clearly — do not retry the same tool with the same arguments.
+   If an earlier tool result in this conversation already contains the data,
+   reuse it instead of calling the tool again.
 7. **Privacy.** Never expose raw database IDs unless the user explicitly
    asks for them. Present data in a human-friendly format.
+8. **Aggregate in the database.** For counts, averages, percentiles or
+   distributions, use the statistics tools (recommendation counts, score
+   statistics, job statistics, experience distribution) instead of listing
+   every analysis and counting yourself.
 """
 
 
@@ -0,0 +1,76 @@
+from collections import defaultdict
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.db import mark_user_write
+from app.models.analysis import Analysis
+from app.models.job import Job
+from app.models.resume import Resume
+
+VERSIONED_MODELS = (Analysis, Job, Resume)
+
+# Per-user data versions. Every committed write to a user's analyses, jobs or
+# resumes bumps the version; caches store the version they were computed at and
+# treat a mismatch as a miss. Counters are in-process, so with several workers
+# caches also keep a TTL as a safety net.
+_versions: dict[int, int] = defaultdict(int)
+
+_PENDING_KEY = "data_version_changes"
+
+# A committed change: ("insert" | "update" | "delete", model instance)
+Change = tuple[str, object]
+Listener = Callable[[int, int, list[Change]], None]
+
+_listeners: list[Listener] = []
+
+
+def get_data_version(user_id: int) -> int:
+    """Current data version for a user."""
+    return _versions[user_id]
+
+
+def bump_data_version(user_id: int) -> int:
+    """Mark a user's data as changed and return the new version."""
+    _versions[user_id] += 1
+    return _versions[user_id]
+
+
+def subscribe(listener: Listener) -> None:
+    """Call `listener(user_id, new_version, changes)` after each commit that writes a user's data.
+
+    Lets caches apply committed changes incrementally instead of rebuilding.
+    """
+    _listeners.append(listener)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_written_users(session: Session, flush_context) -> None:
+    """Remember which versioned rows were written in this transaction, per user."""
+    pending = session.info.setdefault(_PENDING_KEY, defaultdict(list))
+    for op, objects in (
+        ("insert", session.new),
+        ("update", session.dirty),
+        ("delete", session.deleted),
+    ):
+        for obj in objects:
+            if isinstance(obj, VERSIONED_MODELS):
+                pending[obj.user_id].append((op, obj))
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_written_users(session: Session) -> None:
+    for user_id, changes in session.info.pop(_PENDING_KEY, {}).items():
+        version = bump_data_version(user_id)
+        for listener in _listeners:
+            listener(user_id, version, changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written_users(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+# A user's reads stay on the primary until the replica has caught up with their write
+subscribe(lambda user_id, version, changes: mark_user_write(user_id))
@@ -1,49 +1,132 @@
-import contextvars
+import asyncio
+import time
+import uuid
 from contextlib import asynccontextmanager
 
+from sqlalchemy import exc, text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.metrics import registry
 
-
-engine = create_async_engine(
-    settings.ASYNC_DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_size=5,
-    max_overflow=10,
+pool_wait_seconds = registry.histogram(
+    "db_pool_wait_seconds", "Time spent waiting to check out a pooled DB connection"
+)
+pool_timeouts = registry.counter(
+    "db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT"
 )
 
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waits."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_timeouts.inc()
+            raise
+        finally:
+            pool_wait_seconds.observe(time.perf_counter() - start)
+
+
+def _connect_args() -> dict:
+    if not settings.DB_PGBOUNCER:
+        return {}
+    # Transaction-mode PgBouncer hands each transaction a different server
+    # connection, so no prepared statement may outlive its transaction.
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+    }
+
+
+def _create_engine(url: str):
+    return create_async_engine(
+        url,
+        echo=settings.DEBUG,
+        poolclass=TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=_connect_args(),
+    )
+
+
+def _register_pool_gauges(prefix: str, engine) -> None:
+    registry.gauge(f"{prefix}_pool_size", "Configured pool size", fn=lambda: engine.pool.size())
+    registry.gauge(f"{prefix}_pool_checked_out", "Connections currently checked out", fn=lambda: engine.pool.checkedout())
+    registry.gauge(f"{prefix}_pool_checked_in", "Idle connections in the pool", fn=lambda: engine.pool.checkedin())
+    registry.gauge(
+        f"{prefix}_pool_overflow",
+        "Connections beyond pool_size (negative while the pool is still filling)",
+        fn=lambda: engine.pool.overflow(),
+    )
+
+
+engine = _create_engine(settings.ASYNC_DATABASE_URL)
+_register_pool_gauges("db", engine)
+
+# Read replica; without one, reads share the primary engine
+read_engine = engine
+if settings.ASYNC_DATABASE_REPLICA_URL:
+    read_engine = _create_engine(settings.ASYNC_DATABASE_REPLICA_URL)
+    _register_pool_gauges("db_replica", read_engine)
+
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
     expire_on_commit=False,
 )
 
-# Context variable to share the request-scoped DB session with LangGraph tools
-_current_db_session: contextvars.ContextVar[AsyncSession | None] = contextvars.ContextVar(
-    "_current_db_session", default=None
+ReadSessionLocal = async_sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
 )
 
+# user_id -> monotonic deadline until which the user's reads go to the primary
+_primary_until: dict[int, float] = {}
+
+
+def mark_user_write(user_id: int) -> None:
+    """Pin a user's reads to the primary for DB_REPLICA_STICKY_SECONDS (read-your-writes)."""
+    if read_engine is not engine:
+        _primary_until[user_id] = time.monotonic() + settings.DB_REPLICA_STICKY_SECONDS
 
-def set_current_session(session: AsyncSession) -> contextvars.Token:
-    """Set the current request session so tools can reuse it."""
-    return _current_db_session.set(session)
 
+def read_session_factory(user_id: int) -> async_sessionmaker[AsyncSession]:
+    """Sessionmaker for a user's reads: the replica, unless they wrote recently."""
+    deadline = _primary_until.get(user_id)
+    if deadline is None:
+        return ReadSessionLocal
+    if deadline < time.monotonic():
+        _primary_until.pop(user_id, None)
+        return ReadSessionLocal
+    return AsyncSessionLocal
 
-def reset_current_session(token: contextvars.Token) -> None:
-    """Reset the context variable after the request."""
-    _current_db_session.reset(token)
+
+# Caps concurrently leased tool sessions so parallel tool calls can't drain the pool
+_tool_session_slots = asyncio.Semaphore(settings.TOOL_SESSION_CONCURRENCY)
 
 
 @asynccontextmanager
-async def get_tool_session():
-    """Get a DB session for tool use. Reuses the request session if available."""
-    existing = _current_db_session.get(None)
-    if existing:
-        yield existing
-    else:
-        async with AsyncSessionLocal() as session:
+async def get_tool_session(user_id: int):
+    """Lease an independent, read-only DB session for a single tool call.
+
+    AsyncSession is not safe for concurrent use, so every tool call gets its own
+    session from the pool; ToolNode can then run a turn's tool calls in parallel.
+    Sessions come from the read replica unless the user wrote recently.
+    """
+    async with _tool_session_slots:
+        async with read_session_factory(user_id)() as session:
+            await session.execute(text("SET TRANSACTION READ ONLY"))
             yield session
 
 
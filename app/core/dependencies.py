@@ -1,9 +1,9 @@
 from dataclasses import dataclass
 from typing import AsyncGenerator
-from fastapi import Header
+from fastapi import Depends, Header
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.db import AsyncSessionLocal
-from app.core.security import decode_access_token
+from app.core.db import AsyncSessionLocal, read_session_factory
+from app.core.security import verify_access_token
 from app.core.exceptions import UnauthorizedException
 
 
@@ -12,6 +12,8 @@ class TokenUser:
     """Lightweight user object decoded from a JWT — no DB query needed."""
     id: int
     email: str
+    jti: str | None = None
+    exp: float | None = None
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -31,12 +33,28 @@ async def get_current_user(
     if not authorization.startswith("Bearer "):
         raise UnauthorizedException(message="Invalid authorization header")
 
-    token = authorization.replace("Bearer ", "")
+    return authenticate_token(authorization.replace("Bearer ", ""))
 
+
+def authenticate_token(token: str) -> TokenUser:
+    """Verify a bare JWT (also used by the chat WebSocket, which authenticates once)."""
     try:
-        payload = decode_access_token(token)
-        return TokenUser(id=payload["user_id"], email=payload["email"])
+        payload = verify_access_token(token)
+        return TokenUser(
+            id=payload["user_id"],
+            email=payload["email"],
+            jti=payload.get("jti"),
+            exp=payload.get("exp"),
+        )
     except Exception as e:
         if isinstance(e, UnauthorizedException):
             raise
         raise UnauthorizedException(message="Invalid or expired token")
+
+
+async def get_read_db(
+    user: TokenUser = Depends(get_current_user),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only endpoints: the replica, or the primary right after the user wrote."""
+    async with read_session_factory(user.id)() as session:
+        yield session
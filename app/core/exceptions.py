@@ -3,10 +3,21 @@ from fastapi import status
 
 
 class AppException(Exception):
-    def __init__(self, message: str, status_code: int, errors: dict | None):
+    def __init__(
+        self,
+        message: str,
+        status_code: int,
+        errors: dict | None,
+        headers: dict[str, str] | None = None,
+    ):
         self.message = message
         self.status_code = status_code
         self.errors = errors
+        self.headers = headers
+
+
+def _retry_after_header(retry_after: int | None) -> dict[str, str] | None:
+    return {"Retry-After": str(retry_after)} if retry_after else None
 
 
 class ValidationException(AppException):
@@ -27,3 +38,27 @@ class NotFoundException(AppException):
 class UnauthorizedException(AppException):
     def __init__(self, message: str, errors: Dict | None = None):
         super().__init__(message, status.HTTP_401_UNAUTHORIZED, errors)
+
+
+class TooManyRequestsException(AppException):
+    def __init__(
+        self,
+        message: str = "Too many requests, please retry shortly",
+        errors: Dict | None = None,
+        retry_after: int | None = None,
+    ):
+        super().__init__(
+            message, status.HTTP_429_TOO_MANY_REQUESTS, errors, _retry_after_header(retry_after)
+        )
+
+
+class ServiceUnavailableException(AppException):
+    def __init__(
+        self,
+        message: str = "Server is busy, please retry shortly",
+        errors: Dict | None = None,
+        retry_after: int | None = None,
+    ):
+        super().__init__(
+            message, status.HTTP_503_SERVICE_UNAVAILABLE, errors, _retry_after_header(retry_after)
+        )
@@ -0,0 +1,136 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+
+from app.core.config import settings
+from app.core.metrics import registry
+
+queue_wait_seconds = registry.histogram(
+    "llm_queue_wait_seconds", "Time LLM calls wait for a scheduler slot", ("priority",)
+)
+queue_depth = registry.gauge("llm_queue_depth", "LLM calls waiting for a slot", ("priority",))
+running_calls = registry.gauge("llm_running", "LLM calls holding a slot", ("priority",))
+
+MAX_TRACKED_USERS = 10000
+
+
+class Priority(IntEnum):
+    """LLM priority classes; lower values are dispatched first."""
+
+    INTERACTIVE = 0  # chat turns a user is waiting on
+    ANALYSIS = 1  # single resume analyses
+    BATCH = 2  # bulk imports, backfills, background summaries
+
+
+class LLMScheduler:
+    """Admits LLM calls into a fixed number of concurrent slots.
+
+    Classes are strictly prioritized: a free slot always goes to the most
+    urgent waiting class, so queued batch work is overtaken by every
+    interactive or analysis call that arrives after it. Batch calls may also
+    hold at most `batch_max_slots` slots, keeping capacity free for the other
+    classes while a large import runs.
+
+    Within a class, users are served by weighted fair queuing: each call is
+    tagged with a virtual finish time, `max(class clock, user's last tag) +
+    cost / weight`, and the smallest tag runs next. A user with 500 queued
+    analyses therefore alternates with other users instead of going first.
+    """
+
+    def __init__(self, max_concurrency: int, batch_max_slots: int):
+        self.max_concurrency = max_concurrency
+        self.batch_max_slots = batch_max_slots
+        self._running = {priority: 0 for priority in Priority}
+        self._queues: dict[Priority, list] = {priority: [] for priority in Priority}
+        self._clock = {priority: 0.0 for priority in Priority}
+        self._user_tags: dict[tuple[Priority, int | None], float] = {}
+        self._seq = itertools.count()
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority, user_id: int | None = None, cost: float = 1.0, weight: float = 1.0):
+        """Hold a slot for one LLM call."""
+        await self._acquire(priority, user_id, cost, weight)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    async def _acquire(self, priority: Priority, user_id: int | None, cost: float, weight: float) -> None:
+        start = time.monotonic()
+        key = (priority, user_id)
+        tag = max(self._clock[priority], self._user_tags.get(key, 0.0)) + cost / weight
+        self._user_tags[key] = tag
+        if len(self._user_tags) > MAX_TRACKED_USERS:
+            self._forget_idle_users()
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queues[priority], (tag, next(self._seq), future))
+        queue_depth.labels(priority.name.lower()).inc()
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted just as the caller gave up
+                self._release(priority)
+            raise
+        queue_wait_seconds.labels(priority.name.lower()).observe(time.monotonic() - start)
+
+    def try_acquire(self, priority: Priority) -> bool:
+        """Take a slot only if one is free now and no call of equal or higher priority is waiting.
+
+        For optional extra calls (hedges); pair with release().
+        """
+        if any(self._queues[p] for p in Priority if p <= priority) or not self._can_start(priority):
+            return False
+        self._start(priority, self._clock[priority])
+        return True
+
+    def release(self, priority: Priority) -> None:
+        self._release(priority)
+
+    def _forget_idle_users(self) -> None:
+        """Drop tags at or behind their class clock; max() with the clock makes them irrelevant."""
+        self._user_tags = {
+            key: tag for key, tag in self._user_tags.items() if tag > self._clock[key[0]]
+        }
+
+    def _can_start(self, priority: Priority) -> bool:
+        if sum(self._running.values()) >= self.max_concurrency:
+            return False
+        return priority != Priority.BATCH or self._running[priority] < self.batch_max_slots
+
+    def _start(self, priority: Priority, tag: float) -> None:
+        self._running[priority] += 1
+        self._clock[priority] = tag
+        running_calls.labels(priority.name.lower()).inc()
+
+    def _release(self, priority: Priority) -> None:
+        self._running[priority] -= 1
+        running_calls.labels(priority.name.lower()).inc(-1)
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        for priority in Priority:
+            queue = self._queues[priority]
+            while queue and self._can_start(priority):
+                tag, _, future = heapq.heappop(queue)
+                queue_depth.labels(priority.name.lower()).inc(-1)
+                if future.done():  # waiter was cancelled
+                    continue
+                self._start(priority, tag)
+                future.set_result(None)
+            if queue and sum(self._running.values()) >= self.max_concurrency:
+                return
+
+    def queued(self, priority: Priority) -> int:
+        return len(self._queues[priority])
+
+
+llm_scheduler = LLMScheduler(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    batch_max_slots=settings.LLM_BATCH_MAX_SLOTS,
+)
@@ -1,11 +1,37 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
 import jwt
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, TypeVar
 
 from app.core.config import settings
+from app.core.exceptions import TooManyRequestsException, UnauthorizedException
+from app.core.metrics import registry
+
+T = TypeVar("T")
 
-pwd_hash = PasswordHash.recommended()
+logger = logging.getLogger(__name__)
+
+pwd_hash = PasswordHash(
+    (
+        Argon2Hasher(
+            time_cost=settings.ARGON2_TIME_COST,
+            memory_cost=settings.ARGON2_MEMORY_COST,
+            parallelism=settings.ARGON2_PARALLELISM,
+        ),
+    )
+)
 
 
 def get_password_hash(password: str) -> str:
@@ -16,10 +42,63 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_hash.verify(plain_password, hashed_password)
 
 
+password_hash_rejected = registry.counter(
+    "password_hash_rejected_total", "Password hashes rejected because the hashing executor was saturated"
+)
+
+
+class PasswordHashExecutor:
+    """Bounded thread pool for argon2, separate from the default executor.
+
+    Keeps a login storm from starving other to_thread work (PDF parsing,
+    uploads) and caps concurrent memory-hard hashes. Once `workers` hashes are
+    running and `max_queue` are waiting, new requests fail fast with 429.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self.in_flight >= self.workers + self.max_queue:
+            password_hash_rejected.inc()
+            raise TooManyRequestsException(
+                message="Too many sign-in attempts in progress, please retry shortly",
+                retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+            )
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+
+
+password_executor = PasswordHashExecutor(
+    workers=settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+registry.gauge(
+    "password_hash_in_flight", "Password hashes running or queued", fn=lambda: password_executor.in_flight
+)
+
+
+async def hash_password(password: str) -> str:
+    """Hash on the password executor."""
+    return await password_executor.run(get_password_hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify on the password executor; also returns a new hash if the stored one uses outdated parameters."""
+    return await password_executor.run(pwd_hash.verify_and_update, plain_password, hashed_password)
+
+
 def create_access_token(payload: Dict[str, Any]) -> str:
     to_encode = payload.copy()
     # Use timezone-aware UTC datetime for exp claim
     to_encode["exp"] = datetime.now(timezone.utc) + timedelta(days=7)
+    to_encode["jti"] = uuid.uuid4().hex  # lets a single token be revoked
     return jwt.encode(
         to_encode, settings.JWT_SECRET, algorithm=settings.ALGORITHM or "HS256"
     )
@@ -29,3 +108,164 @@ def decode_access_token(token: str) -> Dict[str, Any]:
     """Decode and verify a JWT, returning the payload."""
     algorithm = settings.ALGORITHM or "HS256"
     return jwt.decode(token, settings.JWT_SECRET, algorithms=[algorithm])
+
+
+token_cache_hits = registry.counter("jwt_cache_hits_total", "Requests authenticated from the verified token cache")
+token_cache_misses = registry.counter("jwt_cache_misses_total", "Requests that needed a full JWT verification")
+
+
+class VerifiedTokenCache:
+    """LRU of verified JWT payloads, keyed by the SHA-256 digest of the token.
+
+    A hit skips the HMAC verification and claim parsing of jwt.decode; `exp`
+    is still checked on every lookup, so a cached token never outlives its
+    expiry. Only tokens that passed verification are ever stored.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[bytes, Dict[str, Any]] = OrderedDict()
+
+    def get(self, token: str) -> Dict[str, Any] | None:
+        key = hashlib.sha256(token.encode()).digest()
+        payload = self._entries.get(key)
+        if payload is None:
+            token_cache_misses.inc()
+            return None
+        if payload["exp"] <= time.time():
+            del self._entries[key]
+            token_cache_misses.inc()
+            return None
+        self._entries.move_to_end(key)
+        token_cache_hits.inc()
+        return payload
+
+    def put(self, token: str, payload: Dict[str, Any]) -> None:
+        if "exp" not in payload:
+            return
+        key = hashlib.sha256(token.encode()).digest()
+        self._entries[key] = payload
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+token_cache = VerifiedTokenCache(max_entries=settings.JWT_CACHE_MAX_ENTRIES)
+
+class MemoryRevocationStore:
+    """Revoked token ids for a single worker process.
+
+    is_revoked() is a dict lookup; it runs on every authenticated request.
+    """
+
+    def __init__(self):
+        self._revoked: dict[str, float] = {}  # jti -> exp
+
+    async def revoke(self, jti: str, exp: float) -> None:
+        self._remember([(jti, exp)])
+
+    def is_revoked(self, jti: str) -> bool:
+        return jti in self._revoked
+
+    def _remember(self, rows: list[tuple[str, float]]) -> None:
+        now = time.time()
+        for expired in [j for j, e in self._revoked.items() if e <= now]:
+            del self._revoked[expired]
+        self._revoked.update((jti, exp) for jti, exp in rows if exp > now)
+
+
+class SQLiteRevocationStore(MemoryRevocationStore):
+    """Revoked token ids shared by all workers on a host via one SQLite file.
+
+    Lookups stay in memory. Each worker copies new rows from the file at most
+    every `refresh_seconds`, in a thread and only when a request comes in, so a
+    logout on one worker reaches the others within that interval (at once on
+    its own worker). Rows are kept only until the token would have expired.
+    """
+
+    def __init__(self, path: str, refresh_seconds: float):
+        super().__init__()
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS revoked_tokens ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, jti TEXT NOT NULL UNIQUE, expires_at REAL NOT NULL)"
+        )
+        self._seq = 0  # highest row already copied into memory
+        self._next_refresh = 0.0
+        self._refreshing: asyncio.Task | None = None
+        self._remember(self._fetch_since(0))
+
+    async def revoke(self, jti: str, exp: float) -> None:
+        self._remember([(jti, exp)])
+        await asyncio.to_thread(self._insert, jti, exp)
+
+    def is_revoked(self, jti: str) -> bool:
+        if self._refreshing is None and time.monotonic() >= self._next_refresh:
+            try:
+                self._refreshing = asyncio.get_running_loop().create_task(self.refresh())
+            except RuntimeError:  # no event loop (scripts); the memory copy is all we have
+                pass
+        return jti in self._revoked
+
+    async def refresh(self) -> None:
+        """Copy rows added by any worker since the last refresh into memory."""
+        try:
+            self._remember(await asyncio.to_thread(self._fetch_since, self._seq))
+        except Exception:
+            logger.exception("Could not refresh revoked tokens")
+        finally:
+            self._next_refresh = time.monotonic() + self.refresh_seconds
+            self._refreshing = None
+
+    def _fetch_since(self, seq: int) -> list[tuple[str, float]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, jti, expires_at FROM revoked_tokens WHERE seq > ? ORDER BY seq", (seq,)
+            ).fetchall()
+        if rows:
+            self._seq = max(self._seq, rows[-1][0])
+        return [(jti, exp) for _, jti, exp in rows]
+
+    def _insert(self, jti: str, exp: float) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM revoked_tokens WHERE expires_at <= ?", (time.time(),))
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO revoked_tokens (jti, expires_at) VALUES (?, ?)", (jti, exp)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+
+def _create_revocation_store():
+    if settings.JWT_REVOCATION_BACKEND == "sqlite":
+        return SQLiteRevocationStore(
+            settings.JWT_REVOCATION_SQLITE_PATH, settings.JWT_REVOCATION_REFRESH_SECONDS
+        )
+    return MemoryRevocationStore()
+
+
+revocations = _create_revocation_store()
+
+
+async def revoke_token(jti: str, exp: float) -> None:
+    """Reject the token with id `jti` from now until it expires."""
+    await revocations.revoke(jti, exp)
+
+
+def verify_access_token(token: str) -> Dict[str, Any]:
+    """Verified JWT payload, from the token cache when possible; revoked tokens are rejected."""
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = decode_access_token(token)
+        token_cache.put(token, payload)
+    jti = payload.get("jti")
+    if jti and revocations.is_revoked(jti):
+        raise UnauthorizedException(message="Token has been revoked")
+    return payload
@@ -3,6 +3,7 @@ from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.router import router
+from app.core import data_version  # noqa: F401 - registers write listeners for cache invalidation
 from app.core.config import setup_logging
 from app.core.exceptions import AppException
 from app.utils.utils import error_response
@@ -42,15 +43,25 @@ logger = logging.getLogger(__name__)  # Name will be "__main__"
 
 @app.on_event("startup")
 async def startup():
+    from app.agents.chatbot.checkpoint import open_checkpointer
     from app.agents.registry import startup_agents
-    startup_agents()
+    startup_agents(await open_checkpointer())
     logger.info("Application starting up — agents registered")
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    from app.agents.chatbot.checkpoint import close_checkpointer
+    await close_checkpointer()
+
+
 @app.exception_handler(AppException)
 async def app_exception_handler(request: Request, exc: AppException):
     return error_response(
-        message=exc.message, errors=exc.errors, status_code=exc.status_code
+        message=exc.message,
+        errors=exc.errors,
+        status_code=exc.status_code,
+        headers=exc.headers,
     )
 
 
@@ -31,6 +31,8 @@ class Analysis(Base):
 
     # Full data storage
     analysis_result: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    model_name: Mapped[str | None] = mapped_column(String(100), nullable=True)  # LLM that produced it
+    repairs: Mapped[list | None] = mapped_column(JSONB, nullable=True)  # fixes applied to the LLM output
 
     # Metadata
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
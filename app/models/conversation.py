@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING, List
 
-from sqlalchemy import Text, String, func, ForeignKey
+from sqlalchemy import Text, String, func, false, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.db import Base
@@ -15,6 +15,11 @@ class Conversation(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, index=True)
     title: Mapped[str] = mapped_column(String(255), default="New Chat")
+
+    # Rolling summary of older turns; messages with id <= summary_message_id are folded in
+    summary: Mapped[str | None] = mapped_column(Text, nullable=True, default=None)
+    summary_message_id: Mapped[int | None] = mapped_column(nullable=True, default=None)
+
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
     updated_at: Mapped[datetime | None] = mapped_column(
         onupdate=func.now(), default=None
@@ -40,6 +45,8 @@ class Message(Base):
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, index=True)
     role: Mapped[str] = mapped_column(String(20))  # "user" | "assistant"
     content: Mapped[str] = mapped_column(Text)
+    # Assistant answer cut short because the client disconnected mid-stream
+    is_truncated: Mapped[bool] = mapped_column(default=False, server_default=false())
     created_at: Mapped[datetime] = mapped_column(server_default=func.now())
 
     conversation_id: Mapped[int] = mapped_column(
@@ -52,14 +52,13 @@ class EducationItem(BaseModel):
     gpa: float | None = None
 
 
-class ScoreBreakdown(BaseModel):
-    overall: int
+class CategoryScores(BaseModel):
     experience: int
     projects: int
     tech: int
     education: int
 
-    @field_validator("overall", "experience", "projects", "tech", "education")
+    @field_validator("experience", "projects", "tech", "education")
     @classmethod
     def must_be_valid_score(cls, v: int) -> int:
         if not 0 <= v <= 100:
@@ -67,6 +66,17 @@ class ScoreBreakdown(BaseModel):
         return v
 
 
+class ScoreBreakdown(CategoryScores):
+    overall: int
+
+    @field_validator("overall")
+    @classmethod
+    def overall_must_be_valid_score(cls, v: int) -> int:
+        if not 0 <= v <= 100:
+            raise ValueError(f"Score must be between 0 and 100, got {v}")
+        return v
+
+
 class ScoreJustification(BaseModel):
     experience: str
     projects: str
@@ -121,8 +131,30 @@ class ExtractionStatus(BaseModel):
 # --- Main analysis schema ---
 
 
+class AnalysisLLMOutput(BaseModel):
+    """What the model generates; see app/utils/scoring.py for the fields derived from it"""
+
+    candidate_name: str
+    contact: ContactDetails
+    education: list[EducationItem]
+    target_role: str
+
+    scores: CategoryScores
+    score_justification: ScoreJustification
+
+    summary: str
+    shortlist_summary: str
+    key_vectors: list[str] = Field(min_length=3, max_length=5)
+
+    skills: list[SkillItem]
+    experience: list[ExperienceItem]
+    projects_extracted: bool
+
+    red_flags: list[RedFlag]
+
+
 class AnalysisResultSchema(BaseModel):
-    """The full detailed analysis output from AI"""
+    """The full detailed analysis, as stored and returned"""
 
     candidate_name: str
     contact: ContactDetails
@@ -159,6 +191,10 @@ class AnalysisRequest:
     job_id: int | None = Form(
         default=None, description="Optional job ID to match against"
     )
+    batch: bool = Form(
+        default=False,
+        description="Part of a bulk import; queued behind chat and single analyses",
+    )
 
     def validate_file(self) -> None:
         if self.file.content_type != "application/pdf":
@@ -180,6 +216,8 @@ class AnalysisResponse(BaseModel):
 
     # full detail
     analysis_result: AnalysisResultSchema
+    model_name: str | None = None
+    repairs: list[str] = []
 
     created_at: datetime
 
@@ -19,6 +19,7 @@ class MessageResponse(BaseModel):
     id: int
     role: str
     content: str
+    is_truncated: bool = False
     created_at: datetime
 
     model_config = {"from_attributes": True}
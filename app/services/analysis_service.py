@@ -1,5 +1,6 @@
 import asyncio
 import logging
+from dataclasses import dataclass
 import cloudinary
 import cloudinary.uploader
 import pymupdf
@@ -8,14 +9,16 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.dependencies import get_db
+from app.core.dependencies import get_db, get_read_db
 from app.core.exceptions import NotFoundException, ValidationException
+from app.core.llm_scheduler import Priority
 from app.models.analysis import Analysis
 from app.models.job import Job
 from app.models.resume import Resume
 from app.models.user import User
 from app.schemas.analysis import AnalysisResponse, AnalysisResultSchema
-from app.utils.ai import run_analysis
+from app.utils.ai import AnalysisRun, run_analysis
+from app.utils.contact_extraction import ExtractedContact, extract_contact
 
 logger = logging.getLogger(__name__)
 
@@ -28,20 +31,31 @@ cloudinary.config(
 )
 
 
-def parse_pdf(file_bytes: bytes) -> str:
-    """Extract text from PDF bytes using PyMuPDF."""
+@dataclass
+class ParsedResume:
+    text: str
+    contact: ExtractedContact
+
+
+def parse_pdf(file_bytes: bytes) -> ParsedResume:
+    """Extract text and contact details from PDF bytes using PyMuPDF."""
     doc = pymupdf.open(stream=file_bytes, filetype="pdf")
-    text = ""
+    pages = []
     for page in doc:
-        text += page.get_text("text")  # type: ignore[assignment]
+        links = [link["uri"] for link in page.get_links() if link.get("uri")]
+        pages.append((page.get_text("text"), links))
     doc.close()
+    text = "".join(page_text for page_text, _ in pages)
 
     if not text.strip():
         raise ValidationException(
             message="Could not extract text from PDF — the file may be image-based or empty"
         )
 
-    return text.strip()
+    return ParsedResume(
+        text=text.strip(),
+        contact=extract_contact(pages),
+    )
 
 
 def upload_to_cloudinary(file_bytes: bytes, filename: str) -> str:
@@ -65,6 +79,7 @@ class AnalysisService:
         file: UploadFile,
         job_id: int | None,
         user: User,
+        batch: bool = False,
     ) -> AnalysisResponse:
         """
         Full analysis pipeline:
@@ -73,18 +88,26 @@ class AnalysisService:
         3. Fetch job title + description (if job_id provided)
         4. Run LangChain analysis
         5. Save resume + analysis to DB
+
+        No transaction is open during step 4, which can wait minutes for a
+        scheduler slot; the rows are written in one short transaction after it.
         """
         # --- Read file bytes ---
         file_bytes = await file.read()
 
         # --- 1 & 2. Upload to Cloudinary + Parse PDF concurrently (both offloaded to threads) ---
         logger.info("Uploading resume to Cloudinary and parsing PDF concurrently: %s", file.filename)
-        resume_url, resume_text = await asyncio.gather(
+        resume_url, parsed = await asyncio.gather(
             asyncio.to_thread(upload_to_cloudinary, file_bytes, file.filename or "resume.pdf"),
             asyncio.to_thread(parse_pdf, file_bytes),
         )
+        resume_text = parsed.text
         logger.info("Resume uploaded: %s", resume_url)
-        logger.info("Extracted %d characters from PDF", len(resume_text))
+        logger.info(
+            "Extracted %d characters from PDF; contact fields found: %s",
+            len(resume_text),
+            ", ".join(parsed.contact.found()) or "none",
+        )
 
         # --- 3. Get job info ---
         job_title = "General Position"
@@ -101,25 +124,27 @@ class AnalysisService:
                 raise NotFoundException(message=f"Job with id {job_id} not found")
             job_title = job.title
             job_description = job.description
+            # End the read transaction so its pooled connection isn't held during the LLM call
+            await self.db.commit()
 
-        # --- 4. Save resume to DB ---
-        resume = Resume(
-            url=resume_url,
-            content=resume_text,
-            user_id=user.id,
-        )
-        self.db.add(resume)
-        await self.db.flush()  # get resume.id
-
-        # --- 5. Run AI analysis ---
+        # --- 4. Run AI analysis ---
         logger.info("Starting AI analysis...")
-        analysis_result: AnalysisResultSchema = await run_analysis(
+        run: AnalysisRun = await run_analysis(
             resume_text=resume_text,
             job_title=job_title,
             job_description=job_description,
+            priority=Priority.BATCH if batch else Priority.ANALYSIS,
+            user_id=user.id,
+            contact=parsed.contact,
         )
+        analysis_result = run.result
 
-        # --- 6. Save analysis to DB ---
+        # --- 5. Save resume + analysis to DB (committed by get_db) ---
+        resume = Resume(
+            url=resume_url,
+            content=resume_text,
+            user_id=user.id,
+        )
         analysis = Analysis(
             candidate_name=analysis_result.candidate_name,
             target_role=analysis_result.target_role,
@@ -127,11 +152,13 @@ class AnalysisService:
             overall_score=analysis_result.scores.overall,
             total_experience_years=analysis_result.total_experience_years,
             analysis_result=analysis_result.model_dump(mode="json"),
+            model_name=run.model_name,
+            repairs=run.repairs or None,
             user_id=user.id,
-            resume_id=resume.id,
+            resume=resume,
             job_id=job_id,
         )
-        self.db.add(analysis)
+        self.db.add_all([resume, analysis])
         await self.db.flush()
 
         logger.info("Analysis saved with id: %d", analysis.id)
@@ -145,6 +172,8 @@ class AnalysisService:
             overall_score=analysis.overall_score,
             total_experience_years=analysis.total_experience_years,
             analysis_result=analysis_result,
+            model_name=analysis.model_name,
+            repairs=analysis.repairs or [],
             created_at=analysis.created_at,
         )
 
@@ -170,6 +199,8 @@ class AnalysisService:
                 overall_score=a.overall_score,
                 total_experience_years=a.total_experience_years,
                 analysis_result=AnalysisResultSchema.model_validate(a.analysis_result),
+                model_name=a.model_name,
+                repairs=a.repairs or [],
                 created_at=a.created_at,
             )
             for a in analyses
@@ -200,9 +231,15 @@ class AnalysisService:
             analysis_result=AnalysisResultSchema.model_validate(
                 analysis.analysis_result
             ),
+            model_name=analysis.model_name,
+            repairs=analysis.repairs or [],
             created_at=analysis.created_at,
         )
 
 
 def get_analysis_service(db: AsyncSession = Depends(get_db)) -> AnalysisService:
     return AnalysisService(db)
+
+
+def get_analysis_read_service(db: AsyncSession = Depends(get_read_db)) -> AnalysisService:
+    return AnalysisService(db)
@@ -1,5 +1,3 @@
-import asyncio
-
 from fastapi import Depends
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,7 +7,7 @@ from app.core.exceptions import (
     ConflictException,
     UnauthorizedException,
 )
-from app.core.security import get_password_hash, verify_password, create_access_token
+from app.core.security import create_access_token, hash_password, verify_and_update_password
 from app.models.user import User
 from app.schemas.user import (
     UserBaseResponse,
@@ -34,9 +32,7 @@ class AuthService:
         if existing_user:
             raise ConflictException(message="User with this email already exists")
 
-        hashed_password = await asyncio.to_thread(
-            get_password_hash, register_data.password
-        )
+        hashed_password = await hash_password(register_data.password)
         user = User(
             full_name=register_data.full_name,
             email=register_data.email,
@@ -55,11 +51,14 @@ class AuthService:
         if not user:
             raise UnauthorizedException(message="Invalid credentials")
 
-        is_valid = await asyncio.to_thread(
-            verify_password, credentials.password, user.password
+        is_valid, updated_hash = await verify_and_update_password(
+            credentials.password, user.password
         )
         if not is_valid:
             raise UnauthorizedException(message="Invalid credentials")
+        if updated_hash:
+            # Argon2 parameters changed since this hash was made
+            user.password = updated_hash
 
         payload = {
             "user_id": user.id,
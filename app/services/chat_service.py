@@ -1,121 +1,282 @@
-import json
+import asyncio
 import logging
-from collections.abc import AsyncGenerator
 
 from langchain_core.messages import HumanMessage, AIMessage
-from sqlalchemy import select, func, desc
-from sqlalchemy.ext.asyncio import AsyncSession
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from sqlalchemy import select, func, desc, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.agents.chatbot.answer_cache import answer_cache
+from app.agents.chatbot.checkpoint import prune_checkpoint_messages, thread_config
+from app.agents.chatbot.context import needs_summary, summarizer
 from app.agents.registry import get_agent
-from app.core.db import set_current_session, reset_current_session
+from app.core import data_version
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal, mark_user_write
+from app.core.exceptions import AppException
 from app.models.conversation import Conversation, Message
 from app.schemas.chat import (
     ConversationResponse,
     ConversationDetailResponse,
     MessageResponse,
 )
+from app.services.chat_streams import ChatStream, stream_registry
+from app.utils.sse import TokenCoalescer
 
 logger = logging.getLogger(__name__)
 
-MAX_HISTORY_MESSAGES = 20
-
 
 class ChatService:
     """Orchestrates chatbot agent invocation with streaming and persistence."""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession | None = None,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    ):
         self.db = db
+        self.session_factory = session_factory
 
-
-
-    async def stream_message(
+    async def start_turn(
         self,
         user_id: int,
         message: str,
         conversation_id: int | None,
-    ) -> AsyncGenerator[str, None]:
-        """Stream a chat response as SSE events.
+    ) -> ChatStream | None:
+        """Start a chat turn and return its event stream (None if the conversation is missing).
 
-        1. Create or load conversation
-        2. Persist user message
-        3. Stream LLM response tokens via SSE
-        4. Persist complete AI message
+        No DB connection is held while the LLM streams — the turn is split into
+        short transactions on sessions from `session_factory`:
+
+        1. Create or load conversation and persist user message (commit)
+        2. Stream LLM response tokens as events (tools lease their own sessions)
+        3. Persist complete AI message (commit) and report token usage
+        4. Fold older turns into the rolling summary (background)
         """
         graph = get_agent("chatbot")
 
         # --- 1. Get or create conversation ---
-        if conversation_id:
-            conv = await self._get_conversation(conversation_id, user_id)
-            if not conv:
-                yield f"data: {json.dumps({'type': 'error', 'content': 'Conversation not found'})}\n\n"
-                return
-        else:
-            conv = Conversation(title="New Chat", user_id=user_id)
-            self.db.add(conv)
-            await self.db.flush()
+        async with self.session_factory() as db:
+            if conversation_id:
+                conv = await self._get_conversation(conversation_id, user_id, db)
+                if not conv:
+                    return None
+            else:
+                conv = Conversation(title="New Chat", user_id=user_id)
+                db.add(conv)
+                await db.flush()
 
-        # --- 2. Persist user message ---
-        user_msg = Message(
-            conversation_id=conv.id,
-            role="user",
-            content=message,
-        )
-        self.db.add(user_msg)
-        await self.db.flush()
+            # --- 2. Persist user message ---
+            user_msg = Message(
+                conversation_id=conv.id,
+                role="user",
+                content=message,
+            )
+            db.add(user_msg)
+            await db.commit()
+        mark_user_write(user_id)
 
+        # --- 3. Run the graph in a producer task; clients follow its event stream ---
+        # The task owns persistence, so the answer (or the truncated part of it)
+        # is saved even if every client detaches. A dropped client can resume
+        # from its last event id (see get_stream) without re-running the LLM.
+        stream = stream_registry.create(user_id, conv.id)
         # Send conversation_id immediately so frontend can track multi-turn
-        yield f"data: {json.dumps({'type': 'meta', 'conversation_id': conv.id})}\n\n"
+        stream.publish({"type": "meta", "conversation_id": conv.id, "stream_id": stream.id})
+        stream.task = asyncio.create_task(
+            self._run_turn(graph, conv, user_msg, message, bool(conversation_id), stream)
+        )
+        stream.task.add_done_callback(lambda _: stream_registry.finish(stream))
+        return stream
+
+    def get_stream(self, stream_id: str, user_id: int) -> ChatStream | None:
+        """Live or recently finished chat turn owned by the user."""
+        return stream_registry.get(stream_id, user_id)
+
+    async def _run_turn(
+        self,
+        graph,
+        conv: Conversation,
+        user_msg: Message,
+        message: str,
+        is_existing: bool,
+        stream: ChatStream,
+    ) -> None:
+        """Publish the graph run to `stream` as events and persist the answer.
+
+        Cancelling this task stops the graph run and closes the upstream LLM
+        HTTP stream. Whether the turn is cancelled or fails, whatever was
+        generated so far is saved as truncated.
+        """
+        history = list(conv.messages) if is_existing else []
+        parts: list[str] = []
+        usage = {"prompt_tokens": 0, "completion_tokens": 0, "llm_calls": 0}
+
+        # First turns don't depend on earlier context, so their answers can be reused
+        cacheable = not history and settings.CHAT_ANSWER_CACHE_ENABLED
+        version = data_version.get_data_version(conv.user_id)
+        cached = answer_cache.get(conv.user_id, message) if cacheable else None
+
+        try:
+            if cached is not None:
+                parts.append(cached)
+                stream.publish({"type": "token", "content": cached})
+            else:
+                await self._stream_graph(graph, conv, message, history, stream, parts, usage)
+        except asyncio.CancelledError:
+            await self._persist_partial(conv, message, parts)
+            logger.info("Generation cancelled for conversation %d after %d parts", conv.id, len(parts))
+            raise
+        except AppException as e:
+            logger.warning("Turn failed for conversation %d: %s", conv.id, e.message)
+            await self._persist_partial(conv, message, parts)
+            stream.publish({"type": "error", "content": e.message})
+            return
+        except Exception as e:
+            logger.exception("Streaming error")
+            await self._persist_partial(conv, message, parts)
+            stream.publish({"type": "error", "content": str(e)})
+            return
+
+        # --- 6. Persist full AI response ---
+        full_response = "".join(parts)
+        if full_response:
+            ai_msg = await self._persist_response(conv, message, full_response)
+            history += [user_msg, ai_msg]
+            if cacheable and cached is None:
+                answer_cache.put(conv.user_id, message, full_response, version)
+
+        logger.info(
+            "Chat turn for conversation %d: %d LLM calls, %d prompt tokens, %d completion tokens%s",
+            conv.id,
+            usage["llm_calls"],
+            usage["prompt_tokens"],
+            usage["completion_tokens"],
+            " (answer cache hit)" if cached is not None else "",
+        )
+        stream.publish({"type": "usage", **usage, "cached": cached is not None})
+
+        # --- 7. Fold older turns into the rolling summary off the hot path ---
+        if needs_summary(history, conv.summary_message_id):
+            summarizer.schedule(conv.id)
 
-        # --- 3. Build LangChain message history (capped) ---
-        lc_messages = []
-        if conversation_id and hasattr(conv, "messages"):
-            recent = conv.messages[-MAX_HISTORY_MESSAGES:]
-            for msg in recent:
+        stream.publish({"type": "done"})
+
+    async def _stream_graph(
+        self,
+        graph,
+        conv: Conversation,
+        message: str,
+        history: list[Message],
+        stream: ChatStream,
+        parts: list[str],
+        usage: dict,
+    ) -> None:
+        """Run the chatbot graph, publishing coalesced token events and collecting `parts`."""
+        # --- 4. Build graph input ---
+        config = thread_config(conv.id)
+        checkpointed = []
+        if history and isinstance(graph.checkpointer, BaseCheckpointSaver):
+            snapshot = await graph.aget_state(config)
+            checkpointed = snapshot.values.get("messages", [])
+
+        if checkpointed:
+            # Thread restored from the checkpoint (tool results included): only send
+            # pruning updates and the new message. Turns folded into the summary are dropped.
+            unfolded = sum(
+                1 for msg in history
+                if msg.role == "user"
+                and (conv.summary_message_id is None or msg.id > conv.summary_message_id)
+            )
+            lc_messages = prune_checkpoint_messages(checkpointed, unfolded)
+            lc_messages.append(HumanMessage(content=message))
+        else:
+            # No checkpoint yet: rebuild from the turns not folded into the summary.
+            # chat_node trims them to the token budget.
+            lc_messages = []
+            for msg in history:
+                if conv.summary_message_id is not None and msg.id <= conv.summary_message_id:
+                    continue
                 if msg.role == "user":
                     lc_messages.append(HumanMessage(content=msg.content))
                 elif msg.role == "assistant":
                     lc_messages.append(AIMessage(content=msg.content))
 
-        if not lc_messages or lc_messages[-1].content != message:
-            lc_messages.append(HumanMessage(content=message))
-
-        # --- 4. Stream LLM response ---
-        # Share our DB session with tools via contextvars
-        ctx_token = set_current_session(self.db)
-        full_response = ""
+            if not lc_messages or lc_messages[-1].content != message:
+                lc_messages.append(HumanMessage(content=message))
 
+        # --- 5. Stream LLM response ---
+        # Tools lease their own read-only sessions (see get_tool_session).
+        # Tokens are coalesced into fewer events; the response is kept as a list of parts.
+        coalescer = TokenCoalescer()
         try:
             async for event in graph.astream_events(
-                {"messages": lc_messages, "user_id": user_id},
+                {"messages": lc_messages, "user_id": conv.user_id, "summary": conv.summary},
+                config=config,
                 version="v2",
             ):
-                if event["event"] == "on_chat_model_stream":
-                    chunk = event["data"]["chunk"]
-                    if chunk.content:
-                        full_response += chunk.content
-                        yield f"data: {json.dumps({'type': 'token', 'content': chunk.content})}\n\n"
-        except Exception as e:
-            logger.exception("Streaming error")
-            yield f"data: {json.dumps({'type': 'error', 'content': str(e)})}\n\n"
-            return
+                kind = event["event"]
+                if kind == "on_chat_model_stream":
+                    content = event["data"]["chunk"].content
+                    if content:
+                        parts.append(content)
+                        payload = coalescer.add(content)
+                    else:
+                        payload = coalescer.poll()
+                elif kind == "on_chat_model_end":
+                    self._add_usage(usage, event["data"].get("output"))
+                    payload = coalescer.flush()
+                elif kind == "on_chain_end" and not event["parent_ids"] and not parts:
+                    # Graph finished without streaming tokens (template reply): send the final answer
+                    content = event["data"]["output"]["messages"][-1].content
+                    payload = None
+                    if content:
+                        parts.append(content)
+                        payload = {"type": "token", "content": content}
+                else:
+                    payload = coalescer.poll()
+
+                if payload:
+                    stream.publish(payload)
         finally:
-            reset_current_session(ctx_token)
+            if payload := coalescer.flush():
+                stream.publish(payload)
 
-        # --- 5. Persist full AI response ---
-        if full_response:
-            ai_msg = Message(
-                conversation_id=conv.id,
-                role="assistant",
-                content=full_response,
-            )
-            self.db.add(ai_msg)
+    async def _persist_partial(self, conv: Conversation, message: str, parts: list[str]) -> None:
+        """Save the answer generated before the turn stopped early, if any."""
+        if not parts:
+            return
+        try:
+            await self._persist_response(conv, message, "".join(parts), truncated=True)
+        except Exception:
+            # The failure that stopped the turn may be the database itself
+            logger.exception("Could not save the partial answer for conversation %d", conv.id)
 
+    async def _persist_response(
+        self,
+        conv: Conversation,
+        message: str,
+        content: str,
+        truncated: bool = False,
+    ) -> Message:
+        """Save the assistant message (and the title of a new chat) in its own transaction."""
+        ai_msg = Message(
+            conversation_id=conv.id,
+            role="assistant",
+            content=content,
+            is_truncated=truncated,
+        )
+        async with self.session_factory() as db:
+            db.add(ai_msg)
             if conv.title == "New Chat":
-                conv.title = message[:80] + ("..." if len(message) > 80 else "")
-
-            await self.db.flush()
-
-        yield f"data: {json.dumps({'type': 'done'})}\n\n"
+                await db.execute(
+                    update(Conversation)
+                    .where(Conversation.id == conv.id)
+                    .values(title=message[:80] + ("..." if len(message) > 80 else ""))
+                )
+            await db.commit()
+        mark_user_write(conv.user_id)
+        return ai_msg
 
     # ------------------------------------------------------------------
     # Conversation CRUD
@@ -165,6 +326,7 @@ class ChatService:
                     id=m.id,
                     role=m.role,
                     content=m.content,
+                    is_truncated=m.is_truncated,
                     created_at=m.created_at,
                 )
                 for m in conv.messages
@@ -178,17 +340,32 @@ class ChatService:
             return False
         await self.db.delete(conv)
         await self.db.flush()
+        mark_user_write(user_id)
+
+        checkpointer = get_agent("chatbot").checkpointer
+        if isinstance(checkpointer, BaseCheckpointSaver):
+            await checkpointer.adelete_thread(str(conversation_id))
         return True
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def _add_usage(usage: dict, output) -> None:
+        """Accumulate token usage reported by Groq for one LLM call."""
+        metadata = getattr(output, "usage_metadata", None)
+        usage["llm_calls"] += 1
+        if metadata:
+            usage["prompt_tokens"] += metadata.get("input_tokens", 0)
+            usage["completion_tokens"] += metadata.get("output_tokens", 0)
+
     async def _get_conversation(
-        self, conversation_id: int, user_id: int
+        self, conversation_id: int, user_id: int, db: AsyncSession | None = None
     ) -> Conversation | None:
         from sqlalchemy.orm import selectinload
-        result = await self.db.execute(
+        db = db or self.db
+        result = await db.execute(
             select(Conversation)
             .where(
                 Conversation.id == conversation_id,
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from itertools import islice
+
+from app.core.config import settings
+from app.utils.sse import sse_frame
+
+logger = logging.getLogger(__name__)
+
+
+class ChatStream:
+    """Numbered events of one chat turn, kept in a bounded ring buffer.
+
+    The producer task publishes events; any number of clients can follow them
+    (over SSE or the chat WebSocket) and replay from a last seen event id.
+    When the last client detaches before the turn finishes, generation is
+    cancelled after a grace period unless a client reattaches in time.
+
+    A turn ends with either a `done` event or an `error` event, never both;
+    `error` is terminal and no `done` follows it.
+    """
+
+    def __init__(self, user_id: int, conversation_id: int, buffer_size: int, grace_seconds: float):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.conversation_id = conversation_id
+        self.grace_seconds = grace_seconds
+        self.task: asyncio.Task | None = None
+        self.done = False
+        self._events: deque[tuple[int, dict]] = deque(maxlen=buffer_size)
+        self._last_id = 0
+        self._changed = asyncio.Event()
+        self._subscribers = 0
+        self._grace: asyncio.TimerHandle | None = None
+
+    def publish(self, payload: dict) -> None:
+        """Number an event and append it to the buffer."""
+        self._last_id += 1
+        self._events.append((self._last_id, payload))
+        self._wake()
+
+    def close(self) -> None:
+        self.done = True
+        if self._grace is not None:
+            self._grace.cancel()
+            self._grace = None
+        self._wake()
+
+    async def attach(
+        self,
+        last_event_id: int = 0,
+        is_disconnected: Callable[[], Awaitable[bool]] | None = None,
+    ) -> AsyncGenerator[bytes, None]:
+        """`follow` encoded as SSE frames with `id:` lines."""
+        async for event_id, payload in self.follow(last_event_id, is_disconnected):
+            yield sse_frame(payload, event_id)
+
+    async def follow(
+        self,
+        last_event_id: int = 0,
+        is_disconnected: Callable[[], Awaitable[bool]] | None = None,
+    ) -> AsyncGenerator[tuple[int | None, dict], None]:
+        """Replay events after `last_event_id`, then follow the live turn until it ends."""
+        self._subscribers += 1
+        if self._grace is not None:
+            self._grace.cancel()
+            self._grace = None
+
+        sent = min(last_event_id, self._last_id)
+        poll_interval = settings.CHAT_DISCONNECT_POLL_SECONDS
+        last_check = time.monotonic()
+        try:
+            while True:
+                first_id = self._events[0][0] if self._events else self._last_id + 1
+                if sent + 1 < first_id:
+                    # Client fell further behind than the buffer holds
+                    yield None, {"type": "error", "content": "Stream events expired; reload the conversation"}
+                    return
+                for event_id, payload in list(islice(self._events, sent + 1 - first_id, None)):
+                    yield event_id, payload
+                    sent = event_id
+
+                if self.done and sent >= self._last_id:
+                    return
+                if sent >= self._last_id:
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), timeout=poll_interval)
+                    except TimeoutError:
+                        pass
+
+                if is_disconnected and time.monotonic() - last_check >= poll_interval:
+                    last_check = time.monotonic()
+                    if await is_disconnected():
+                        logger.info("Client detached from chat stream %s at event %d", self.id, sent)
+                        return
+        finally:
+            self._subscribers -= 1
+            if not self._subscribers and not self.done:
+                self._grace = asyncio.get_running_loop().call_later(self.grace_seconds, self._abandon)
+
+    def _abandon(self) -> None:
+        """No client came back within the grace period: stop generating."""
+        self._grace = None
+        if self._subscribers or self.done or self.task is None:
+            return
+        logger.info("Chat stream %s abandoned; cancelling generation", self.id)
+        self.task.cancel()
+
+    def _wake(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+class ChatStreamRegistry:
+    """In-process index of live and recently finished chat streams.
+
+    Streams are kept for `retention_seconds` after the turn ends so a client
+    that reconnects late still receives the final events. Resuming only works
+    against the worker that runs the turn.
+    """
+
+    def __init__(self, buffer_size: int, grace_seconds: float, retention_seconds: float):
+        self.buffer_size = buffer_size
+        self.grace_seconds = grace_seconds
+        self.retention_seconds = retention_seconds
+        self._streams: dict[str, ChatStream] = {}
+
+    def create(self, user_id: int, conversation_id: int) -> ChatStream:
+        stream = ChatStream(user_id, conversation_id, self.buffer_size, self.grace_seconds)
+        self._streams[stream.id] = stream
+        return stream
+
+    def get(self, stream_id: str, user_id: int) -> ChatStream | None:
+        stream = self._streams.get(stream_id)
+        if stream is None or stream.user_id != user_id:
+            return None
+        return stream
+
+    def finish(self, stream: ChatStream) -> None:
+        """Mark the turn finished and drop the stream after the retention period."""
+        stream.close()
+        asyncio.get_running_loop().call_later(
+            self.retention_seconds, self._streams.pop, stream.id, None
+        )
+
+
+stream_registry = ChatStreamRegistry(
+    buffer_size=settings.CHAT_STREAM_BUFFER_EVENTS,
+    grace_seconds=settings.CHAT_STREAM_RESUME_GRACE_SECONDS,
+    retention_seconds=settings.CHAT_STREAM_RETENTION_SECONDS,
+)
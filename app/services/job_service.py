@@ -1,6 +1,6 @@
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.core.dependencies import get_db
+from app.core.dependencies import get_db, get_read_db
 from app.models.job import Job
 from app.models.user import User
 from app.schemas.job import JobCreate, JobResponse
@@ -38,3 +38,7 @@ class JobService:
 
 def get_job_service(db: AsyncSession = Depends(get_db)) -> JobService:
     return JobService(db)
+
+
+def get_job_read_service(db: AsyncSession = Depends(get_read_db)) -> JobService:
+    return JobService(db)
@@ -1,8 +1,27 @@
+import json
 import logging
+from dataclasses import dataclass, field
 from langchain_groq import ChatGroq
 from langchain_core.prompts import ChatPromptTemplate
+from pydantic import ValidationError
+from app.core.circuit_breaker import get_breaker
 from app.core.config import settings
-from app.schemas.analysis import AnalysisResultSchema
+from app.core.llm_scheduler import Priority, llm_scheduler
+from app.schemas.analysis import AnalysisLLMOutput, AnalysisResultSchema
+from app.utils.analysis_repair import (
+    describe_errors,
+    invalid_fields,
+    normalize_analysis,
+    partial_schema,
+    raw_arguments,
+)
+from app.utils.contact_extraction import (
+    ExtractedContact,
+    apply_extracted_contact,
+    describe_known_contact,
+)
+from app.utils.hedging import hedge_delay, hedged, timed
+from app.utils.scoring import build_analysis_result
 
 logger = logging.getLogger(__name__)
 
@@ -68,12 +87,8 @@ CATEGORY DEFINITIONS (score only what is RELEVANT to the job):
                  Self-declared "Beginner" = 0–15. Unrelated tech stacks score 0.
   - education:   Degree relevance to the role + academic performance.
 
-The overall score is a weighted composite, but MUST adapt dynamically to the candidate's seniority:
-  - Junior/Fresher (<2 years exp): Projects should contribute heavily, as they lack professional experience.
-    Weights: experience: 10%  |  projects: 50%  |  tech: 25%  |  education: 15%
-  - Experienced (2+ years exp): Professional experience and absolute impact matter the most.
-    Weights: experience: 50%  |  projects: 10%  |  tech: 25%  |  education: 15%
-    (Do NOT completely ignore projects if present, but they must not meaningfully outweigh real experience.)
+Do NOT output an overall score: it is computed from your category scores, weighted by seniority
+(projects weigh most for candidates with under 2 years of experience, professional experience for everyone else).
 
 CRITICAL: Experience and projects in UNRELATED technologies contribute ZERO to their scores.
 A full-stack JavaScript developer applying for a Python role gets near-zero for JS experience/projects.
@@ -85,16 +100,6 @@ SCORING RULES:
 - Do NOT default to 50 as a "safe middle." Score what the evidence supports.
 - Peripheral/transferable skills may add minor points but CANNOT compensate for missing core requirements.
 
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
- RECOMMENDATION CRITERIA (STRICT)
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-Derive the recommendation ONLY from the overall score:
-  - HIRE:     overall >= 75
-  - CONSIDER: overall >= 50 AND overall < 75
-  - REJECT:   overall < 50
-
-Do NOT override the score-based recommendation with subjective judgment.
-
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
  RED FLAGS (strict evidence standard)
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -110,7 +115,9 @@ Do NOT fabricate or speculate about red flags. If none exist, return an empty li
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 - Set extraction_confidence to HIGH only when the data is clearly and unambiguously present in the resume.
 - Set extraction_confidence to LOW when inferring, partially reading, or when data is absent.
-- For extraction_status, mark each section as true ONLY if meaningful data was actually extracted.
+- Set projects_extracted to true ONLY if meaningful project data was actually found in the resume.
+- For each experience item, give start_year, end_year (null if current) and duration_years as precisely
+  as the dates allow; total experience is computed from them.
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
  OUTPUT QUALITY STANDARDS
@@ -135,6 +142,8 @@ HUMAN_PROMPT = """Analyze this resume for the following job position:
 **Job Title:** {job_title}
 **Job Description:** {job_description}
 
+**Contact fields already extracted from the PDF (return null for these):** {known_contact}
+
 ---
 
 **Resume Content:**
@@ -142,14 +151,35 @@ HUMAN_PROMPT = """Analyze this resume for the following job position:
 """
 
 
-def build_analysis_chain():
-    """Build a LangChain chain that outputs a structured AnalysisResultSchema."""
-    llm = ChatGroq(
-        model=settings.GROQ_MODEL,
+REASK_PROMPT = """\
+Your previous analysis of this resume had missing or invalid values in these fields: {fields}
+
+Validation errors:
+{errors}
+
+The rest of your previous analysis, for consistency:
+{previous}
+
+Return ONLY the fields listed above, corrected, following all of the original rules.
+"""
+
+
+def build_llm(model: str) -> ChatGroq:
+    return ChatGroq(
+        model=model,
         api_key=settings.GROQ_API_KEY,  # type: ignore[arg-type]
         temperature=0.1,
+        timeout=settings.GROQ_TIMEOUT_SECONDS,
+        max_retries=settings.GROQ_MAX_RETRIES,
     )
 
+
+def build_analysis_chain(model: str):
+    """Build a LangChain chain that outputs a structured AnalysisLLMOutput.
+
+    The chain returns {"raw", "parsed", "parsing_error"}, so output that fails
+    validation can be repaired instead of discarded.
+    """
     prompt = ChatPromptTemplate.from_messages(
         [
             ("system", SYSTEM_PROMPT),
@@ -157,49 +187,153 @@ def build_analysis_chain():
         ]
     )
 
-    structured_llm = llm.with_structured_output(AnalysisResultSchema)
+    structured_llm = build_llm(model).with_structured_output(AnalysisLLMOutput, include_raw=True)
     chain = prompt | structured_llm
 
     return chain
 
 
-# Module-level singleton — built once on first use, reused for every request
-_analysis_chain = None
+def build_reask_chain(model: str, fields: list[str]):
+    """Build a chain asking the model again for only `fields` of the analysis."""
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", SYSTEM_PROMPT),
+            ("human", HUMAN_PROMPT),
+            ("human", REASK_PROMPT),
+        ]
+    )
+    return prompt | build_llm(model).with_structured_output(partial_schema(fields))
+
+
+# Built once per model on first use, reused for every request
+_analysis_chains: dict = {}
 
 
-def get_analysis_chain():
-    global _analysis_chain
-    if _analysis_chain is None:
-        _analysis_chain = build_analysis_chain()
-    return _analysis_chain
+def get_analysis_chain(model: str):
+    chain = _analysis_chains.get(model)
+    if chain is None:
+        chain = _analysis_chains[model] = build_analysis_chain(model)
+    return chain
+
+
+def analysis_models() -> list[str]:
+    """Models to try for an analysis, in order."""
+    models = [settings.GROQ_MODEL]
+    if settings.GROQ_FALLBACK_MODEL and settings.GROQ_FALLBACK_MODEL != settings.GROQ_MODEL:
+        models.append(settings.GROQ_FALLBACK_MODEL)
+    return models
+
+
+@dataclass
+class AnalysisRun:
+    result: AnalysisResultSchema
+    model_name: str
+    repairs: list[str] = field(default_factory=list)  # fixes applied to the model's output
+
+
+async def _repair(model: str, payload: dict, output: dict) -> tuple[AnalysisLLMOutput, list[str]]:
+    """Validate structured output, repairing it locally and re-asking only for fields still invalid."""
+    if output["parsed"] is not None:
+        return output["parsed"], []
+
+    repairs: list[str] = []
+    data = normalize_analysis(raw_arguments(output["raw"], repairs) or {}, repairs)
+    try:
+        return AnalysisLLMOutput.model_validate(data), repairs
+    except ValidationError as e:
+        fields = invalid_fields(e)
+        if not fields:
+            raise
+        errors = describe_errors(e)
+
+    logger.warning("Analysis output from %s invalid in %s; re-asking for those fields", model, fields)
+    previous = {k: v for k, v in data.items() if k not in fields}
+    async with get_breaker(model).guard():
+        patch = await build_reask_chain(model, fields).ainvoke(
+            {
+                **payload,
+                "fields": ", ".join(fields),
+                "errors": errors,
+                "previous": json.dumps(previous, default=str),
+            }
+        )
+    repairs.append(f"re-asked: {', '.join(fields)}")
+    data = normalize_analysis({**data, **patch.model_dump(mode="json")}, repairs)
+    return AnalysisLLMOutput.model_validate(data), repairs
+
+
+async def _invoke_model(model: str, payload: dict, priority: Priority) -> tuple[str, AnalysisLLMOutput, list[str]]:
+    breaker = get_breaker(model)
+    chain = get_analysis_chain(model)
+
+    async def attempt():
+        async with breaker.guard():
+            return await timed(model, chain.ainvoke(payload))
+
+    if settings.ANALYSIS_HEDGE_ENABLED:
+        output = await hedged(attempt, hedge_delay(model), priority)
+    else:
+        output = await attempt()
+    llm_output, repairs = await _repair(model, payload, output)
+    if repairs:
+        logger.info("Repaired analysis output from %s: %s", model, "; ".join(repairs))
+    return model, llm_output, repairs
+
+
+async def _invoke_analysis(payload: dict, priority: Priority) -> tuple[str, AnalysisLLMOutput, list[str]]:
+    """Invoke the first model whose circuit is closed, falling back on failure."""
+    *preferred, last = analysis_models()
+    for model in preferred:
+        if not get_breaker(model).available():
+            continue
+        try:
+            return await _invoke_model(model, payload, priority)
+        except Exception:
+            logger.warning("Analysis on %s failed, falling back to %s", model, last, exc_info=True)
+    return await _invoke_model(last, payload, priority)
 
 
 async def run_analysis(
     resume_text: str,
     job_title: str,
     job_description: str,
-) -> AnalysisResultSchema:
-    """Run the AI analysis chain and return structured output."""
-    chain = get_analysis_chain()
-
+    *,
+    priority: Priority = Priority.ANALYSIS,
+    user_id: int | None = None,
+    contact: ExtractedContact | None = None,
+) -> AnalysisRun:
+    """Run the AI analysis chain and return structured output with the model that produced it.
+
+    The call waits for an LLM scheduler slot in `priority`'s class, queued
+    fairly against the user's other pending analyses. GROQ_MODEL is tried
+    first; while its circuit is open, or if the call fails, GROQ_FALLBACK_MODEL
+    is used instead. With ANALYSIS_HEDGE_ENABLED a slow call is hedged with a
+    duplicate request (see app.utils.hedging). Contact fields already found
+    in the PDF (`contact`) are not generated by the model, only merged in.
+    """
+    contact = contact or ExtractedContact()
     logger.info("Running AI analysis for job: %s", job_title)
 
-    result = await chain.ainvoke(
-        {
-            "resume_text": resume_text,
-            "job_title": job_title,
-            "job_description": job_description,
-        }
-    )
-
-    # The chain is configured with_structured_output so result is always AnalysisResultSchema
-    assert isinstance(result, AnalysisResultSchema)
-
+    async with llm_scheduler.slot(priority, user_id):
+        model, llm_output, repairs = await _invoke_analysis(
+            {
+                "resume_text": resume_text,
+                "job_title": job_title,
+                "job_description": job_description,
+                "known_contact": describe_known_contact(contact),
+            },
+            priority,
+        )
+
+    # Merged before the derived fields, so extraction_status sees the PDF's contact details
+    llm_output.contact = apply_extracted_contact(llm_output.contact, contact)
+    result = build_analysis_result(llm_output)
     logger.info(
-        "Analysis complete — candidate: %s, recommendation: %s, score: %d",
+        "Analysis complete — candidate: %s, recommendation: %s, score: %d, model: %s",
         result.candidate_name,
         result.recommendation,
         result.scores.overall,
+        model,
     )
 
-    return result
+    return AnalysisRun(result=result, model_name=model, repairs=repairs)
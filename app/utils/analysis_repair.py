@@ -0,0 +1,196 @@
+import json
+import re
+
+from langchain_core.messages import AIMessage
+from pydantic import BaseModel, ValidationError, create_model
+
+from app.schemas.analysis import AnalysisLLMOutput, Confidence, RedFlagType, Severity
+
+SCORE_FIELDS = ("experience", "projects", "tech", "education")
+KEY_VECTORS_MAX = 5
+MAX_REPORTED_ERRORS = 20
+
+_decoder = json.JSONDecoder()
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+# A key (string after `{` or `,`) with no value yet, at the very end of truncated output
+_DANGLING_KEY = re.compile(r'([{,])\s*"(?:[^"\\]|\\.)*"\s*:?\s*$')
+
+
+# --- JSON ---
+
+
+def _close_truncated(text: str) -> str:
+    """Terminate an unfinished string, drop a dangling key or comma and close open brackets."""
+    closers = []
+    in_string = escaped = False
+    for ch in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            closers.append("}" if ch == "{" else "]")
+        elif ch in "}]" and closers:
+            closers.pop()
+
+    if in_string:
+        text += '"'
+    if closers and closers[-1] == "}":
+        text = _DANGLING_KEY.sub(r"\1", text)
+    text = text.rstrip().rstrip(",")
+    return text + "".join(reversed(closers))
+
+
+def parse_json_lenient(text: str, repairs: list[str]) -> dict | None:
+    """Parse a JSON object, fixing fences, trailing commas and truncation; fixes are appended to `repairs`."""
+    fixes = (
+        ("stripped code fence", lambda t: _FENCE.sub("", t)),
+        ("dropped text before JSON", lambda t: t[t.find("{"):] if "{" in t else t),
+        ("removed trailing commas", lambda t: _TRAILING_COMMA.sub(r"\1", t)),
+        ("closed truncated JSON", _close_truncated),
+    )
+    for description, fix in (("", None), *fixes):
+        if fix is not None:
+            fixed = fix(text)
+            if fixed == text:
+                continue
+            text = fixed
+            repairs.append(description)
+        try:
+            data, _ = _decoder.raw_decode(text)  # ignores anything after the object
+        except json.JSONDecodeError:
+            continue
+        return data if isinstance(data, dict) else None
+    return None
+
+
+def raw_arguments(raw: AIMessage, repairs: list[str]) -> dict | None:
+    """The analysis JSON the model produced, whether or not it parsed as a tool call."""
+    if raw.tool_calls:
+        return raw.tool_calls[0]["args"]
+    for call in raw.invalid_tool_calls:
+        if call.get("args"):
+            return parse_json_lenient(call["args"], repairs)
+    if isinstance(raw.content, str) and raw.content:
+        return parse_json_lenient(raw.content, repairs)
+    return None
+
+
+# --- Values ---
+
+
+def _clamp(value, path: str, repairs: list[str], low: int = 0, high: int = 100):
+    """Coerce to an int within [low, high]; values that aren't numbers are left for the validator."""
+    try:
+        number = float(value.strip().rstrip("%")) if isinstance(value, str) else float(value)
+    except (TypeError, ValueError):
+        return value
+    clamped = int(round(min(high, max(low, number))))
+    if clamped != value:
+        repairs.append(f"{path}: {value!r} -> {clamped}")
+    return clamped
+
+
+def _enum(value, enum_cls, path: str, repairs: list[str]):
+    """Match an enum value case-insensitively; returns None when nothing matches."""
+    if not isinstance(value, str):
+        return None
+    normalized = value.strip().replace(" ", "_").replace("-", "_")
+    for member in enum_cls:
+        if member.value.lower() == normalized.lower():
+            if member.value != value:
+                repairs.append(f"{path}: {value!r} -> {member.value!r}")
+            return member.value
+    return None
+
+
+def normalize_analysis(data: dict, repairs: list[str]) -> dict:
+    """Fix out-of-range and mis-cased values in raw analysis output, recording each change."""
+    data = dict(data)
+
+    for key in ("education", "skills", "experience", "red_flags"):
+        if key in data and data[key] is None:
+            data[key] = []
+            repairs.append(f"{key}: null -> []")
+
+    scores = data.get("scores")
+    if isinstance(scores, dict):
+        data["scores"] = {
+            k: _clamp(v, f"scores.{k}", repairs) if k in SCORE_FIELDS else v for k, v in scores.items()
+        }
+
+    for i, skill in enumerate(data.get("skills") or []):
+        if isinstance(skill, dict) and "level" in skill:
+            skill["level"] = _clamp(skill["level"], f"skills[{i}].level", repairs)
+    for i, item in enumerate(data.get("experience") or []):
+        if isinstance(item, dict) and "match_percentage" in item:
+            item["match_percentage"] = _clamp(
+                item["match_percentage"], f"experience[{i}].match_percentage", repairs
+            )
+
+    vectors = data.get("key_vectors")
+    if isinstance(vectors, list):
+        kept = [v for v in vectors if isinstance(v, str) and v.strip()]
+        if len(kept) > KEY_VECTORS_MAX:
+            kept = kept[:KEY_VECTORS_MAX]
+        if len(kept) != len(vectors):
+            repairs.append(f"key_vectors: kept {len(kept)} of {len(vectors)}")
+        data["key_vectors"] = kept
+
+    contact = data.get("contact")
+    if isinstance(contact, dict) and "extraction_confidence" in contact:
+        confidence = _enum(contact["extraction_confidence"], Confidence, "contact.extraction_confidence", repairs)
+        if confidence is not None:
+            contact["extraction_confidence"] = confidence
+
+    flags = data.get("red_flags")
+    if isinstance(flags, list):
+        kept = []
+        for i, flag in enumerate(flags):
+            if not isinstance(flag, dict):
+                continue
+            flag_type = _enum(flag.get("type"), RedFlagType, f"red_flags[{i}].type", repairs)
+            severity = _enum(flag.get("severity"), Severity, f"red_flags[{i}].severity", repairs)
+            if flag_type is None or severity is None:
+                repairs.append(f"red_flags[{i}]: dropped (type {flag.get('type')!r}, severity {flag.get('severity')!r})")
+                continue
+            kept.append({**flag, "type": flag_type, "severity": severity})
+        data["red_flags"] = kept
+
+    return data
+
+
+# --- Re-ask ---
+
+
+def invalid_fields(error: ValidationError) -> list[str]:
+    """Top-level AnalysisLLMOutput fields with at least one validation error."""
+    fields = []
+    for err in error.errors():
+        field = str(err["loc"][0]) if err["loc"] else None
+        if field in AnalysisLLMOutput.model_fields and field not in fields:
+            fields.append(field)
+    return fields
+
+
+def describe_errors(error: ValidationError) -> str:
+    lines = [
+        f"- {'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+        for err in error.errors()[:MAX_REPORTED_ERRORS]
+    ]
+    return "\n".join(lines)
+
+
+def partial_schema(fields: list[str]) -> type[BaseModel]:
+    """A model with only `fields` of AnalysisLLMOutput, for re-asking just those."""
+    definitions = {
+        name: (AnalysisLLMOutput.model_fields[name].annotation, AnalysisLLMOutput.model_fields[name])
+        for name in fields
+    }
+    return create_model("AnalysisResultPatch", **definitions)  # type: ignore[call-overload]
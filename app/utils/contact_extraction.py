@@ -0,0 +1,124 @@
+import re
+from dataclasses import dataclass, fields
+from urllib.parse import unquote, urlparse
+
+from app.schemas.analysis import Confidence, ContactDetails
+
+EMAIL = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}")
+# Digits with the usual separators; length and shape are checked in _phone()
+PHONE = re.compile(r"(?<![\w/.])\+?\(?\d[\d\s().-]{6,20}\d(?![\w/])")
+LINKEDIN = re.compile(r"(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/in/([A-Za-z0-9_%-]+)", re.I)
+GITHUB = re.compile(r"(?:https?://)?(?:www\.)?github\.com/([A-Za-z0-9](?:[A-Za-z0-9-]{0,38}))(?![A-Za-z0-9-])", re.I)
+URL = re.compile(r"(?:https?://|www\.)[^\s<>()\"'|,]+", re.I)
+
+GITHUB_RESERVED = {"orgs", "features", "about", "topics", "marketplace", "sponsors", "settings"}
+# Hosts whose links are credentials, documents or profiles handled above, not a personal site
+NOT_PORTFOLIO_HOSTS = (
+    "linkedin.com", "github.com", "gitlab.com", "google.com", "credly.com", "coursera.org",
+    "udemy.com", "leetcode.com", "hackerrank.com", "medium.com", "youtube.com", "twitter.com", "x.com",
+)
+
+
+@dataclass
+class ExtractedContact:
+    """Contact fields found deterministically in the PDF; None where nothing was found."""
+
+    email: str | None = None
+    phone: str | None = None
+    linkedin: str | None = None
+    github: str | None = None
+    portfolio: str | None = None
+
+    def found(self) -> dict[str, str]:
+        return {f.name: getattr(self, f.name) for f in fields(self) if getattr(self, f.name)}
+
+
+def _phone(text: str) -> str | None:
+    for match in PHONE.finditer(text):
+        candidate = match.group().strip()
+        digits = re.sub(r"\D", "", candidate)
+        # Ten digits rules out year ranges ("2019 - 2021") and short IDs
+        if 10 <= len(digits) <= 15 or (candidate.startswith("+") and 8 <= len(digits) <= 15):
+            return re.sub(r"\s+", " ", candidate)
+    return None
+
+
+def _linkedin(text: str) -> str | None:
+    match = LINKEDIN.search(text)
+    return f"https://www.linkedin.com/in/{match.group(1)}" if match else None
+
+
+def _github(text: str) -> str | None:
+    for match in GITHUB.finditer(text):
+        if match.group(1).lower() not in GITHUB_RESERVED:
+            return f"https://github.com/{match.group(1)}"
+    return None
+
+
+def _portfolio(urls: list[str]) -> str | None:
+    for url in urls:
+        url = url.rstrip(".;:")
+        host = urlparse(url if "://" in url else f"https://{url}").netloc.lower().split(":")[0]
+        if host and not any(host == h or host.endswith("." + h) for h in NOT_PORTFOLIO_HOSTS):
+            return url if "://" in url else f"https://{url}"
+    return None
+
+
+def extract_contact(pages: list[tuple[str, list[str]]]) -> ExtractedContact:
+    """Pull contact fields from PDF link annotations, then from the text.
+
+    `pages` holds each page's text and link URIs, in order.
+
+    Annotations come first: they hold the exact target even when the visible
+    text is just "LinkedIn". A portfolio is only taken from the first page,
+    where contact headers live, so project links further down aren't mistaken
+    for a personal site.
+    """
+    text = "".join(page_text for page_text, _ in pages)
+    link_uris = [uri for _, uris in pages for uri in uris]
+    first_page_text, first_page_uris = pages[0] if pages else ("", [])
+
+    contact = ExtractedContact()
+    web_links = []
+    for uri in link_uris:
+        if uri.lower().startswith("mailto:"):
+            address = unquote(uri[7:]).split("?")[0]
+            if EMAIL.fullmatch(address):
+                contact.email = contact.email or address
+        elif uri.lower().startswith("tel:"):
+            contact.phone = contact.phone or _phone(unquote(uri[4:]))
+        else:
+            web_links.append(uri)
+
+    links = "\n".join(web_links)
+    contact.email = contact.email or (m.group() if (m := EMAIL.search(text)) else None)
+    contact.phone = contact.phone or _phone(text)
+    contact.linkedin = _linkedin(links) or _linkedin(text)
+    contact.github = _github(links) or _github(text)
+    contact.portfolio = _portfolio(
+        [uri for uri in first_page_uris if uri.lower().startswith(("http", "www."))]
+        + URL.findall(first_page_text)
+    )
+    return contact
+
+
+def apply_extracted_contact(details: ContactDetails, extracted: ExtractedContact) -> ContactDetails:
+    """Overlay locally extracted fields on the model's ContactDetails.
+
+    Confidence is HIGH when every field other than location came from the
+    extractor; otherwise the model's own confidence stands.
+    """
+    found = extracted.found()
+    merged = details.model_copy(update=found)
+    from_model = [
+        name for name in ("email", "phone", "linkedin", "github", "portfolio")
+        if getattr(merged, name) and name not in found
+    ]
+    if found and not from_model:
+        merged.extraction_confidence = Confidence.HIGH
+    return merged
+
+
+def describe_known_contact(extracted: ExtractedContact) -> str:
+    """Prompt text naming the contact fields the model should leave null."""
+    return ", ".join(extracted.found()) or "none"
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from app.core.config import settings
+from app.core.llm_scheduler import Priority, llm_scheduler
+from app.core.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+hedges = registry.counter("llm_hedges_total", "Hedge requests sent, by whether they won", ("outcome",))
+hedges_skipped = registry.counter(
+    "llm_hedges_skipped_total", "Hedges that were due but not sent", ("reason",)
+)
+
+LATENCY_SAMPLES = 200
+
+
+class LatencyTracker:
+    """Latencies of the most recent successful calls to one model."""
+
+    def __init__(self, size: int = LATENCY_SAMPLES):
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def observe(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        if len(self._samples) < settings.ANALYSIS_HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class HedgeBudget:
+    """Token bucket limiting hedges to `ratio` of calls, with a small burst allowance."""
+
+    def __init__(self, ratio: float, burst: int):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = float(burst)
+
+    def earn(self) -> None:
+        self.tokens = min(float(self.burst), self.tokens + self.ratio)
+
+    def available(self) -> bool:
+        return self.tokens >= 1
+
+    def spend(self) -> None:
+        self.tokens -= 1
+
+
+_latencies: dict[str, LatencyTracker] = {}
+hedge_budget = HedgeBudget(settings.ANALYSIS_HEDGE_BUDGET_RATIO, settings.ANALYSIS_HEDGE_BUDGET_BURST)
+
+
+def latency_tracker(model: str) -> LatencyTracker:
+    tracker = _latencies.get(model)
+    if tracker is None:
+        tracker = _latencies[model] = LatencyTracker()
+    return tracker
+
+
+def hedge_delay(model: str) -> float | None:
+    """Seconds to wait before hedging a call to `model`, or None while latencies are unknown."""
+    latency = latency_tracker(model).percentile(settings.ANALYSIS_HEDGE_PERCENTILE)
+    if latency is None:
+        return None
+    return max(settings.ANALYSIS_HEDGE_MIN_DELAY_SECONDS, latency)
+
+
+async def timed(model: str, call: Awaitable[T]) -> T:
+    """Await `call`, recording its latency for `model` if it succeeds."""
+    start = time.monotonic()
+    result = await call
+    latency_tracker(model).observe(time.monotonic() - start)
+    return result
+
+
+def _start_hedge(attempt: Callable[[], Awaitable[T]], priority: Priority) -> asyncio.Task | None:
+    if not hedge_budget.available():
+        hedges_skipped.labels("budget").inc()
+        return None
+    # A hedge never queues: it only runs on capacity nobody else is waiting for
+    if not llm_scheduler.try_acquire(priority):
+        hedges_skipped.labels("capacity").inc()
+        return None
+    hedge_budget.spend()
+    task = asyncio.ensure_future(attempt())
+    task.add_done_callback(lambda _: llm_scheduler.release(priority))
+    return task
+
+
+async def hedged(attempt: Callable[[], Awaitable[T]], delay: float | None, priority: Priority) -> T:
+    """Run `attempt()`, sending an identical second attempt if the first is still running after `delay`.
+
+    The first attempt to succeed wins and the other is cancelled; an attempt
+    that fails doesn't cancel one still running. The caller must already hold
+    an LLM scheduler slot for the first attempt; the hedge takes its own.
+    """
+    hedge_budget.earn()
+    tasks = [asyncio.ensure_future(attempt())]
+    hedge = None
+    try:
+        if delay is not None:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                hedge = _start_hedge(attempt, priority)
+                if hedge is not None:
+                    logger.info("Hedging LLM call after %.1fs", delay)
+                    tasks.append(hedge)
+
+        error: BaseException | None = None
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if hedge is not None:
+                        hedges.labels("won" if task is hedge else "lost").inc()
+                    return task.result()
+                error = error or task.exception()
+        assert error is not None
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,64 @@
+from datetime import date
+
+from app.schemas.analysis import (
+    AnalysisLLMOutput,
+    AnalysisResultSchema,
+    CategoryScores,
+    ExperienceItem,
+    ExtractionStatus,
+    Recommendation,
+    ScoreBreakdown,
+)
+
+# Overall score weights by seniority (SYSTEM_PROMPT describes the same split to the model)
+JUNIOR_MAX_YEARS = 2
+JUNIOR_WEIGHTS = {"experience": 0.10, "projects": 0.50, "tech": 0.25, "education": 0.15}
+EXPERIENCED_WEIGHTS = {"experience": 0.50, "projects": 0.10, "tech": 0.25, "education": 0.15}
+
+HIRE_THRESHOLD = 75
+CONSIDER_THRESHOLD = 50
+
+
+def total_experience_years(experience: list[ExperienceItem]) -> float:
+    """Sum of role durations, capped at the calendar years the roles span so overlaps count once."""
+    if not experience:
+        return 0.0
+    total = sum(max(0.0, item.duration_years) for item in experience)
+    current_year = date.today().year
+    start = min(item.start_year for item in experience)
+    end = max(item.end_year or current_year for item in experience)
+    return round(min(total, max(end - start, 0) + 1), 1)
+
+
+def overall_score(scores: CategoryScores, experience_years: float) -> int:
+    weights = JUNIOR_WEIGHTS if experience_years < JUNIOR_MAX_YEARS else EXPERIENCED_WEIGHTS
+    return round(sum(getattr(scores, category) * weight for category, weight in weights.items()))
+
+
+def recommendation_for(overall: int) -> Recommendation:
+    if overall >= HIRE_THRESHOLD:
+        return Recommendation.HIRE
+    if overall >= CONSIDER_THRESHOLD:
+        return Recommendation.CONSIDER
+    return Recommendation.REJECT
+
+
+def build_analysis_result(output: AnalysisLLMOutput) -> AnalysisResultSchema:
+    """Complete the model's output with the fields computed from it."""
+    years = total_experience_years(output.experience)
+    overall = overall_score(output.scores, years)
+    contact = output.contact
+    return AnalysisResultSchema(
+        **output.model_dump(exclude={"scores", "projects_extracted"}),
+        total_experience_years=years,
+        scores=ScoreBreakdown(**output.scores.model_dump(), overall=overall),
+        recommendation=recommendation_for(overall),
+        extraction_status=ExtractionStatus(
+            personal_info=bool(output.candidate_name.strip())
+            and any([contact.email, contact.phone, contact.location, contact.linkedin]),
+            education=bool(output.education),
+            experience=bool(output.experience),
+            skills=bool(output.skills),
+            projects=output.projects_extracted,
+        ),
+    )
@@ -0,0 +1,59 @@
+import time
+
+import orjson
+
+from app.core.config import settings
+
+
+def sse_frame(payload: dict, event_id: int | None = None) -> bytes:
+    """Encode one SSE `data:` frame, with an `id:` line if `event_id` is given."""
+    frame = b"data: " + orjson.dumps(payload) + b"\n\n"
+    if event_id is not None:
+        frame = b"id: %d\n" % event_id + frame
+    return frame
+
+
+class TokenCoalescer:
+    """Merges streamed tokens into fewer, larger token events.
+
+    Tokens are buffered until `max_bytes` is reached or `window_ms` has passed
+    since the first buffered token. Callers must `flush()` before sending any
+    other event so ordering is preserved, and `poll()` on other stream events
+    so buffered text isn't held back while the model is idle.
+    """
+
+    def __init__(
+        self,
+        window_ms: int = settings.CHAT_STREAM_COALESCE_MS,
+        max_bytes: int = settings.CHAT_STREAM_COALESCE_BYTES,
+    ):
+        self.window = window_ms / 1000
+        self.max_bytes = max_bytes
+        self._parts: list[str] = []
+        self._size = 0
+        self._started = 0.0
+
+    def add(self, text: str) -> dict | None:
+        """Buffer a token; returns a token event when the buffer is due."""
+        if not self._parts:
+            self._started = time.monotonic()
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.max_bytes:
+            return self.flush()
+        return self.poll()
+
+    def poll(self) -> dict | None:
+        """Flush if the time window has elapsed."""
+        if self._parts and time.monotonic() - self._started >= self.window:
+            return self.flush()
+        return None
+
+    def flush(self) -> dict | None:
+        """Emit everything buffered as one token event."""
+        if not self._parts:
+            return None
+        content = "".join(self._parts)
+        self._parts.clear()
+        self._size = 0
+        return {"type": "token", "content": content}
@@ -0,0 +1,34 @@
+import json
+
+from langchain_core.messages import BaseMessage
+
+# Groq doesn't expose a tokenizer, so prompt budgets use a character-based
+# estimate. ~4 chars/token holds for English prose on Llama vocabularies and
+# slightly overestimates for JSON, which is the safe direction for a budget.
+CHARS_PER_TOKEN = 4
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a piece of text."""
+    if not text:
+        return 0
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def estimate_message_tokens(message: BaseMessage) -> int:
+    """Estimate the prompt tokens a single chat message will cost, including tool calls."""
+    content = message.content
+    if not isinstance(content, str):
+        content = json.dumps(content, default=str)
+
+    tokens = MESSAGE_OVERHEAD_TOKENS + estimate_tokens(content)
+    for call in getattr(message, "tool_calls", None) or []:
+        tokens += estimate_tokens(call["name"])
+        tokens += estimate_tokens(json.dumps(call.get("args", {}), default=str))
+    return tokens
+
+
+def estimate_messages_tokens(messages: list[BaseMessage]) -> int:
+    """Estimate the prompt tokens for a list of chat messages."""
+    return sum(estimate_message_tokens(m) for m in messages)
@@ -7,8 +7,14 @@ def success_response(message, data):
     return {"success": True, "message": message, "data": data}
 
 
-def error_response(message: str, errors: dict | None = None, status_code: int = 400):
+def error_response(
+    message: str,
+    errors: dict | None = None,
+    status_code: int = 400,
+    headers: dict[str, str] | None = None,
+):
     return JSONResponse(
         status_code=status_code,
         content={"success": False, "message": message, "errors": errors},
+        headers=headers,
     )
@@ -0,0 +1,156 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import chat
+from app.core import admission
+from app.core.admission import (
+    BUCKET_REFILL_SECONDS,
+    AdmissionController,
+    MemoryAdmissionBackend,
+    SQLiteAdmissionBackend,
+    UserLimit,
+    release_when_done,
+)
+from app.core.config import settings
+from app.core.exceptions import AppException
+from app.core.security import create_access_token
+from app.services.chat_service import ChatService
+from app.utils.utils import error_response
+
+
+def _controller(**overrides) -> AdmissionController:
+    options = {"max_in_flight": 4, "max_queue": 4, "queue_timeout": 1.0, **overrides}
+    return AdmissionController(backend=MemoryAdmissionBackend(lease_ttl=60), **options)
+
+
+async def test_lease_is_held_until_the_producer_finishes():
+    controller = _controller()
+    lease = await controller.admit(1, "chat")
+    finish = asyncio.Event()
+    producer = asyncio.create_task(finish.wait())
+
+    release_when_done(producer, lease)
+    await asyncio.sleep(0)  # the client has gone; generation continues
+    assert controller.in_flight == 1
+
+    finish.set()
+    await producer
+    await asyncio.sleep(0)
+    assert controller.in_flight == 0
+
+
+async def test_lease_is_released_when_the_producer_is_cancelled():
+    controller = _controller()
+    lease = await controller.admit(1, "chat")
+    producer = asyncio.create_task(asyncio.Event().wait())
+    release_when_done(producer, lease)
+
+    producer.cancel()
+    await asyncio.gather(producer, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert controller.in_flight == 0
+
+
+def test_rate_limit_and_retry_after():
+    backend = MemoryAdmissionBackend(lease_ttl=60)
+    limit = UserLimit(concurrency=10, per_minute=2)
+
+    assert backend.try_acquire("chat:1", limit, "a") is None
+    assert backend.try_acquire("chat:1", limit, "b") is None
+    reason, retry_after = backend.try_acquire("chat:1", limit, "c")
+
+    assert reason == "rate"
+    assert 0 < retry_after <= 30
+    # Other users have their own bucket
+    assert backend.try_acquire("chat:2", limit, "d") is None
+
+
+def test_concurrency_limit():
+    backend = MemoryAdmissionBackend(lease_ttl=60)
+    limit = UserLimit(concurrency=1, per_minute=10)
+
+    assert backend.try_acquire("chat:1", limit, "a") is None
+    assert backend.try_acquire("chat:1", limit, "b")[0] == "concurrency"
+    backend.release("chat:1", "a")
+    assert backend.try_acquire("chat:1", limit, "b") is None
+
+
+def test_zero_per_minute_means_unlimited():
+    backend = MemoryAdmissionBackend(lease_ttl=60)
+    limit = UserLimit(concurrency=100, per_minute=0)
+
+    assert all(backend.try_acquire("chat:1", limit, str(i)) is None for i in range(50))
+
+
+def test_refilled_buckets_are_evicted(monkeypatch):
+    backend = MemoryAdmissionBackend(lease_ttl=60)
+    limit = UserLimit(concurrency=1, per_minute=5)
+    now = 1_000_000.0
+    monkeypatch.setattr(time, "time", lambda: now)
+    for user_id in range(100):
+        backend.try_acquire(f"chat:{user_id}", limit, f"lease-{user_id}")
+        backend.release(f"chat:{user_id}", f"lease-{user_id}")
+
+    now += BUCKET_REFILL_SECONDS + 1
+    backend.try_acquire("chat:new", limit, "lease-new")
+
+    assert list(backend._buckets) == ["chat:new"]
+    assert list(backend._leases) == ["chat:new"]
+
+
+def test_sqlite_backend_shares_limits(tmp_path):
+    path = str(tmp_path / "admission.sqlite")
+    worker_a = SQLiteAdmissionBackend(path, lease_ttl=60)
+    worker_b = SQLiteAdmissionBackend(path, lease_ttl=60)
+    limit = UserLimit(concurrency=1, per_minute=10)
+
+    assert worker_a.try_acquire("chat:1", limit, "a") is None
+    assert worker_b.try_acquire("chat:1", limit, "b")[0] == "concurrency"
+    worker_a.release("chat:1", "a")
+    assert worker_b.try_acquire("chat:1", limit, "b") is None
+
+
+@pytest.fixture
+def chat_client(monkeypatch):
+    controller = _controller(max_in_flight=2)
+    monkeypatch.setattr(admission, "admission_controller", controller)
+    monkeypatch.setattr(settings, "ADMISSION_ENABLED", True)
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/chat")
+    app.add_exception_handler(
+        AppException, lambda request, exc: error_response(exc.message, status_code=exc.status_code)
+    )
+    token = create_access_token({"user_id": 1, "email": "a@example.com"})
+    client = TestClient(app, headers={"Authorization": f"Bearer {token}"})
+    return client, controller
+
+
+def test_invalid_chat_bodies_release_their_lease(chat_client):
+    client, controller = chat_client
+
+    for body in ({"message": ""}, {}, {"message": "hi", "conversation_id": "x"}, {"message": ""}):
+        assert client.post("/chat/", json=body).status_code == 422
+
+    assert controller.in_flight == 0
+    assert not controller.backend._leases
+    assert not controller._slots.locked()
+
+
+def test_turn_that_never_starts_releases_its_lease(chat_client, monkeypatch):
+    client, controller = chat_client
+
+    async def missing_conversation(self, user_id, message, conversation_id):
+        return None
+
+    monkeypatch.setattr(ChatService, "start_turn", missing_conversation)
+
+    for _ in range(3):
+        assert client.post("/chat/", json={"message": "hi", "conversation_id": 99}).status_code == 404
+
+    assert controller.in_flight == 0
+    assert not controller.backend._leases
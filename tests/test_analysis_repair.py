@@ -0,0 +1,93 @@
+import pytest
+from langchain_core.messages import AIMessage
+from pydantic import ValidationError
+
+from app.schemas.analysis import AnalysisLLMOutput
+from app.utils.analysis_repair import (
+    describe_errors,
+    invalid_fields,
+    normalize_analysis,
+    parse_json_lenient,
+    partial_schema,
+    raw_arguments,
+)
+
+
+def test_parse_plain_json():
+    repairs = []
+
+    assert parse_json_lenient('{"a": 1}', repairs) == {"a": 1}
+    assert repairs == []
+
+
+def test_parse_fenced_json_with_trailing_comma():
+    repairs = []
+
+    assert parse_json_lenient('```json\n{"a": [1, 2,],}\n```', repairs) == {"a": [1, 2]}
+    assert repairs == ["stripped code fence", "removed trailing commas"]
+
+
+def test_parse_truncated_json():
+    repairs = []
+
+    data = parse_json_lenient('Here you go: {"a": {"b": "unfinished', repairs)
+
+    assert data == {"a": {"b": "unfinished"}}
+    assert "closed truncated JSON" in repairs
+
+
+def test_parse_truncated_after_key():
+    assert parse_json_lenient('{"a": 1, "b":', []) == {"a": 1}
+
+
+def test_parse_gives_up_on_non_objects():
+    assert parse_json_lenient("[1, 2]", []) is None
+    assert parse_json_lenient("no json here", []) is None
+
+
+def test_raw_arguments_from_invalid_tool_call():
+    raw = AIMessage(
+        content="",
+        invalid_tool_calls=[{"name": "AnalysisLLMOutput", "args": '{"a": 1,}', "id": "1", "error": None}],
+    )
+
+    assert raw_arguments(raw, []) == {"a": 1}
+
+
+def test_normalize_clamps_and_fixes_enums():
+    repairs = []
+    data = {
+        "scores": {"experience": 120, "projects": "85%", "tech": -5, "education": 70},
+        "contact": {"extraction_confidence": "high"},
+        "key_vectors": ["a", "", "b", "c", "d", "e", "f"],
+        "red_flags": [
+            {"type": "Job Hopping", "severity": "medium", "description": "x"},
+            {"type": "vibes", "severity": "LOW", "description": "y"},
+        ],
+        "skills": None,
+    }
+
+    fixed = normalize_analysis(data, repairs)
+
+    assert fixed["scores"] == {"experience": 100, "projects": 85, "tech": 0, "education": 70}
+    assert fixed["contact"]["extraction_confidence"] == "HIGH"
+    assert fixed["key_vectors"] == ["a", "b", "c", "d", "e"]
+    assert fixed["red_flags"] == [{"type": "job_hopping", "severity": "MEDIUM", "description": "x"}]
+    assert fixed["skills"] == []
+    assert "scores.experience: 120 -> 100" in repairs
+
+
+def test_invalid_fields_and_partial_schema(llm_output):
+    data = llm_output.model_dump(mode="json")
+    data["scores"]["tech"] = "lots"
+    del data["summary"]
+
+    with pytest.raises(ValidationError) as invalid:
+        AnalysisLLMOutput.model_validate(data)
+    fields = invalid_fields(invalid.value)
+    errors = describe_errors(invalid.value)
+
+    assert fields == ["scores", "summary"]
+    assert "scores.tech" in errors
+    patch = partial_schema(fields)
+    assert set(patch.model_fields) == {"scores", "summary"}
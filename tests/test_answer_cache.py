@@ -0,0 +1,67 @@
+import pytest
+
+from app.agents.chatbot.answer_cache import AnswerCache, content_words
+from app.core import data_version
+
+USER = 4242
+
+
+def _cache(similarity: float) -> AnswerCache:
+    return AnswerCache(max_entries=100, ttl_seconds=60, similarity=similarity)
+
+
+def _put(cache: AnswerCache, question: str, answer: str = "cached") -> None:
+    cache.put(USER, question, answer, data_version.get_data_version(USER))
+
+
+@pytest.mark.parametrize("similarity", [0.0, 0.5])
+def test_exact_normalized_match_hits(similarity):
+    cache = _cache(similarity)
+    _put(cache, "Who is my best candidate?")
+
+    assert cache.get(USER, "  who is my BEST candidate ") == "cached"
+
+
+@pytest.mark.parametrize(
+    "cached, asked",
+    [
+        ("how many candidates are shortlisted", "how many candidates are rejected"),
+        ("top 5 candidates for backend", "top 3 candidates for backend"),
+        ("candidates with python", "candidates without python"),
+        ("best candidates for the backend role", "best candidates for the frontend role"),
+        ("list my jobs", "list my jobs and candidates"),
+    ],
+)
+@pytest.mark.parametrize("similarity", [0.0, 0.5, 0.94])
+def test_near_miss_questions_do_not_hit(similarity, cached, asked):
+    cache = _cache(similarity)
+    _put(cache, cached)
+
+    assert cache.get(USER, asked) is None
+
+
+def test_default_is_exact_match_only():
+    cache = _cache(0.0)
+    _put(cache, "show me the top 5 for backend")
+
+    assert cache.get(USER, "top 5 for backend") is None
+
+
+def test_fuzzy_match_ignores_stopwords_and_word_order():
+    cache = _cache(0.5)
+    _put(cache, "show me the top 5 for backend")
+
+    assert cache.get(USER, "backend top 5") == "cached"
+
+
+def test_content_words_keep_numbers_and_negations():
+    assert content_words("show me my top 5 without python") == {"top", "5", "without", "python"}
+
+
+def test_answers_expire_with_the_data_version():
+    cache = _cache(0.0)
+    _put(cache, "how many jobs do i have")
+
+    data_version.bump_data_version(USER)
+
+    assert cache.get(USER, "how many jobs do i have") is None
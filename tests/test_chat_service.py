@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableException
+from app.services.chat_service import ChatService
+from app.services.chat_streams import ChatStream
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_ANSWER_CACHE_ENABLED", False)
+    service = ChatService()
+    service.saved = []
+
+    async def persist(conv, message, content, truncated=False):
+        service.saved.append((content, truncated))
+
+    monkeypatch.setattr(service, "_persist_response", persist)
+    return service
+
+
+def _fail_after_tokens(error: Exception):
+    async def stream_graph(graph, conv, message, history, stream, parts, usage):
+        parts.append("Partial ")
+        parts.append("answer")
+        raise error
+
+    return stream_graph
+
+
+@pytest.mark.parametrize("error", [RuntimeError("upstream reset"), ServiceUnavailableException()])
+async def test_failed_turn_saves_partial_answer(service, monkeypatch, error):
+    monkeypatch.setattr(service, "_stream_graph", _fail_after_tokens(error))
+    conv = SimpleNamespace(id=1, user_id=4242, messages=[], summary_message_id=None)
+    stream = ChatStream(4242, conv.id, buffer_size=16, grace_seconds=0)
+
+    await service._run_turn(None, conv, None, "question", False, stream)
+
+    assert service.saved == [("Partial answer", True)]
+    events = [payload["type"] for _, payload in stream._events]
+    # error is the terminal event; no done follows it
+    assert events[-1] == "error"
+    assert "done" not in events
@@ -0,0 +1,47 @@
+import asyncio
+
+import orjson
+import pytest
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.v1.endpoints import chat_ws
+from app.core import security
+from app.core.security import MemoryRevocationStore, create_access_token
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(security, "revocations", MemoryRevocationStore())
+    app = FastAPI()
+    app.include_router(chat_ws.router)
+    return TestClient(app)
+
+
+def _receive(ws) -> dict:
+    return orjson.loads(ws.receive_bytes())
+
+
+def test_revoked_token_closes_socket_before_next_turn(client):
+    token = create_access_token({"user_id": 1, "email": "a@example.com"})
+    payload = security.verify_access_token(token)
+
+    with client.websocket_connect("/ws", headers={"Authorization": f"Bearer {token}"}) as ws:
+        assert _receive(ws)["type"] == "ready"
+        ws.send_text('{"type": "ping"}')
+        assert _receive(ws) == {"type": "pong"}
+
+        asyncio.run(security.revoke_token(payload["jti"], payload["exp"]))
+        ws.send_text('{"type": "chat", "ref": "a1", "message": "hi"}')
+
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_bytes()
+    assert closed.value.code == status.WS_1008_POLICY_VIOLATION
+
+
+def test_invalid_token_is_rejected_at_handshake(client):
+    with client.websocket_connect("/ws", headers={"Authorization": "Bearer nope"}) as ws:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_bytes()
+    assert closed.value.code == status.WS_1008_POLICY_VIOLATION
@@ -0,0 +1,87 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, ToolMessage
+
+from app.agents.chatbot.checkpoint import PRUNED_TOOL_RESULT, prune_checkpoint_messages
+from app.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def _limits(monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_CHECKPOINT_MAX_TURNS", 30)
+    monkeypatch.setattr(settings, "CHAT_TOOL_RESULT_KEEP_TURNS", 1)
+
+
+def _turn(n: int, tool: bool = False, answered: bool = True) -> list:
+    messages = [HumanMessage(id=f"h{n}", content=f"question {n}")]
+    if tool:
+        messages.append(
+            AIMessage(id=f"c{n}", content="", tool_calls=[{"id": f"call{n}", "name": "get_jobs", "args": {}}])
+        )
+        if not answered:
+            return messages
+        messages.append(ToolMessage(id=f"t{n}", content="[...]", tool_call_id=f"call{n}", name="get_jobs"))
+    messages.append(AIMessage(id=f"a{n}", content=f"answer {n}"))
+    return messages
+
+
+def _removed(updates) -> set[str]:
+    return {u.id for u in updates if isinstance(u, RemoveMessage)}
+
+
+def test_nothing_to_prune():
+    assert prune_checkpoint_messages(_turn(1) + _turn(2)) == []
+
+
+def test_turns_beyond_max_are_removed(monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_CHECKPOINT_MAX_TURNS", 2)
+
+    updates = prune_checkpoint_messages(_turn(1) + _turn(2) + _turn(3))
+
+    assert _removed(updates) == {"h1", "a1"}
+
+
+def test_turns_folded_into_summary_are_removed():
+    updates = prune_checkpoint_messages(_turn(1) + _turn(2) + _turn(3), unfolded_turns=1)
+
+    assert _removed(updates) == {"h1", "a1", "h2", "a2"}
+
+
+def test_all_turns_folded():
+    updates = prune_checkpoint_messages(_turn(1), unfolded_turns=0)
+
+    assert _removed(updates) == {"h1", "a1"}
+
+
+def test_old_tool_results_are_stubbed():
+    updates = prune_checkpoint_messages(_turn(1, tool=True) + _turn(2, tool=True))
+
+    assert len(updates) == 1
+    assert updates[0].id == "t1"
+    assert updates[0].content == PRUNED_TOOL_RESULT
+    assert updates[0].tool_call_id == "call1"
+
+
+def test_unanswered_tool_calls_are_removed():
+    # Turn 2 was cancelled after the model asked for a tool, before the tool ran
+    updates = prune_checkpoint_messages(_turn(1) + _turn(2, tool=True, answered=False))
+
+    assert _removed(updates) == {"c2"}
+
+
+def test_partially_answered_tool_calls_are_removed_with_their_results():
+    call = AIMessage(
+        id="c1",
+        content="",
+        tool_calls=[
+            {"id": "x", "name": "get_jobs", "args": {}},
+            {"id": "y", "name": "get_resumes", "args": {}},
+        ],
+    )
+    partial = ToolMessage(id="tx", content="[]", tool_call_id="x", name="get_jobs")
+    messages = [HumanMessage(id="h1", content="hi"), call, partial] + _turn(2)
+
+    updates = prune_checkpoint_messages(messages)
+
+    assert _removed(updates) == {"c1", "tx"}
+    # The removed result isn't also rewritten as a stub
+    assert not any(isinstance(u, ToolMessage) for u in updates)
@@ -0,0 +1,116 @@
+import groq
+import httpx
+import pytest
+
+from app.core.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenException,
+    is_service_failure,
+)
+
+REQUEST = httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+
+
+def _status_error(status_code: int) -> groq.APIStatusError:
+    return groq.APIStatusError("error", response=httpx.Response(status_code, request=REQUEST), body=None)
+
+
+def _breaker(**overrides) -> CircuitBreaker:
+    options = {
+        "window_seconds": 60,
+        "min_calls": 4,
+        "failure_rate": 0.5,
+        "slow_seconds": 30,
+        "slow_rate": 0.8,
+        "open_seconds": 30,
+        **overrides,
+    }
+    return CircuitBreaker("test-model", **options)
+
+
+async def _call(breaker: CircuitBreaker, error: Exception | None = None) -> None:
+    async with breaker.guard():
+        if error is not None:
+            raise error
+
+
+async def _fail(breaker: CircuitBreaker, error: Exception, times: int) -> None:
+    for _ in range(times):
+        with pytest.raises(type(error)):
+            await _call(breaker, error)
+
+
+@pytest.mark.parametrize(
+    "error, counted",
+    [
+        (groq.APITimeoutError(request=REQUEST), True),
+        (groq.APIConnectionError(request=REQUEST), True),
+        (TimeoutError(), True),
+        (_status_error(429), True),
+        (_status_error(503), True),
+        (_status_error(400), False),
+        (_status_error(401), False),
+        (ValueError("invalid output"), False),
+    ],
+)
+def test_service_failures(error, counted):
+    assert is_service_failure(error) is counted
+
+
+async def test_opens_on_service_failures():
+    breaker = _breaker()
+    await _call(breaker)
+    await _fail(breaker, _status_error(503), times=3)
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenException) as rejected:
+        await _call(breaker)
+    assert rejected.value.headers["Retry-After"] == "30"
+
+
+async def test_other_errors_do_not_open():
+    breaker = _breaker()
+    await _fail(breaker, _status_error(400), times=10)
+    await _fail(breaker, ValueError("bad output"), times=10)
+
+    assert breaker.state == CLOSED
+    assert not breaker._calls
+
+
+async def test_stays_closed_below_min_calls():
+    breaker = _breaker(min_calls=5)
+    await _fail(breaker, TimeoutError(), times=4)
+
+    assert breaker.state == CLOSED
+
+
+async def test_half_open_probe_closes_on_success():
+    breaker = _breaker(open_seconds=0)
+    await _fail(breaker, TimeoutError(), times=4)
+    assert breaker.state == OPEN
+
+    await _call(breaker)
+
+    assert breaker.state == CLOSED
+
+
+async def test_half_open_probe_reopens_on_failure():
+    breaker = _breaker(open_seconds=0)
+    await _fail(breaker, TimeoutError(), times=4)
+
+    await _fail(breaker, TimeoutError(), times=1)
+
+    assert breaker.state == OPEN
+
+
+async def test_inconclusive_probe_frees_the_probe_slot():
+    breaker = _breaker(open_seconds=0)
+    await _fail(breaker, TimeoutError(), times=4)
+
+    await _fail(breaker, _status_error(400), times=1)
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.available()
@@ -0,0 +1,102 @@
+from app.schemas.analysis import Confidence, ContactDetails
+from app.utils import ai
+from app.utils.contact_extraction import (
+    ExtractedContact,
+    apply_extracted_contact,
+    describe_known_contact,
+    extract_contact,
+)
+
+HEADER = """Jane Doe
+Berlin | +49 151 2345 6789 | jane.doe@example.com
+linkedin.com/in/jane-doe | github.com/janedoe | janedoe.dev
+Experience
+Backend Engineer, Acme 2019 - 2023
+"""
+
+
+def test_extracts_contact_from_text():
+    contact = extract_contact([(HEADER, [])])
+
+    assert contact == ExtractedContact(
+        email="jane.doe@example.com",
+        phone="+49 151 2345 6789",
+        linkedin="https://www.linkedin.com/in/jane-doe",
+        github="https://github.com/janedoe",
+        portfolio=None,  # bare domains without a scheme or www. aren't taken as links
+    )
+
+
+def test_link_annotations_win_over_text():
+    uris = [
+        "mailto:jane%40work.example.com?subject=Hi",
+        "tel:+4915199999999",
+        "https://de.linkedin.com/in/janed/",
+        "https://janedoe.dev/",
+    ]
+
+    contact = extract_contact([("Email | Phone | LinkedIn | Website", uris)])
+
+    assert contact.email == "jane@work.example.com"
+    assert contact.phone == "+4915199999999"
+    assert contact.linkedin == "https://www.linkedin.com/in/janed"
+    assert contact.portfolio == "https://janedoe.dev/"
+
+
+def test_year_ranges_are_not_phones():
+    assert extract_contact([("Acme 2019 - 2021, Initech 2021 - 2023", [])]).phone is None
+
+
+def test_portfolio_only_from_first_page():
+    pages = [(HEADER, ["https://github.com/janedoe"]), ("Projects", ["https://shop-demo.example.com"])]
+
+    assert extract_contact(pages).portfolio is None
+
+
+def test_github_reserved_paths_are_skipped():
+    contact = extract_contact([("See github.com/features and github.com/janedoe", [])])
+
+    assert contact.github == "https://github.com/janedoe"
+
+
+def test_apply_overrides_model_and_raises_confidence():
+    details = ContactDetails(email="wrong@example.com", location="Berlin", extraction_confidence=Confidence.LOW)
+    extracted = ExtractedContact(email="jane@example.com", phone="+49 151 2345 6789")
+
+    merged = apply_extracted_contact(details, extracted)
+
+    assert merged.email == "jane@example.com"
+    assert merged.phone == "+49 151 2345 6789"
+    assert merged.location == "Berlin"
+    assert merged.extraction_confidence == Confidence.HIGH
+
+
+def test_apply_keeps_confidence_when_model_supplied_links():
+    details = ContactDetails(github="https://github.com/x", extraction_confidence=Confidence.LOW)
+
+    merged = apply_extracted_contact(details, ExtractedContact(email="jane@example.com"))
+
+    assert merged.extraction_confidence == Confidence.LOW
+
+
+def test_describe_known_contact():
+    assert describe_known_contact(ExtractedContact()) == "none"
+    assert describe_known_contact(ExtractedContact(email="a@b.co", github="x")) == "email, github"
+
+
+async def test_run_analysis_counts_extracted_contact_as_personal_info(monkeypatch, llm_output):
+    # The model was told to leave the extracted fields null
+    llm_output.contact = ContactDetails(extraction_confidence=Confidence.LOW)
+
+    async def invoke(payload, priority):
+        assert payload["known_contact"] == "email"
+        return "test-model", llm_output, []
+
+    monkeypatch.setattr(ai, "_invoke_analysis", invoke)
+
+    run = await ai.run_analysis(
+        "resume", "Backend Engineer", "Python", contact=ExtractedContact(email="jane@example.com")
+    )
+
+    assert run.result.contact.email == "jane@example.com"
+    assert run.result.extraction_status.personal_info
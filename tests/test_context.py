@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from app.agents.chatbot.context import (
+    ConversationSummarizer,
+    build_model_messages,
+    needs_summary,
+    split_turns,
+    trim_to_budget,
+)
+from app.core.config import settings
+from app.utils.tokens import estimate_messages_tokens
+
+
+def _stored(id: int, role: str, content: str) -> SimpleNamespace:
+    """Stand-in for a persisted Message row."""
+    return SimpleNamespace(id=id, role=role, content=content)
+
+
+def _turn(n: int, size: int = 10) -> list:
+    return [HumanMessage(content=f"q{n} " + "x" * size), AIMessage(content=f"a{n} " + "y" * size)]
+
+
+def test_split_turns_keeps_tool_calls_with_their_results():
+    call = AIMessage(content="", tool_calls=[{"id": "c1", "name": "get_jobs", "args": {}}])
+    messages = [
+        HumanMessage(content="hi"),
+        AIMessage(content="hello"),
+        HumanMessage(content="jobs?"),
+        call,
+        ToolMessage(content="[]", tool_call_id="c1"),
+        AIMessage(content="none"),
+    ]
+
+    turns = split_turns(messages)
+
+    assert [len(t) for t in turns] == [2, 4]
+    assert turns[1][1] is call
+
+
+def test_trim_to_budget_drops_oldest_whole_turns():
+    messages = _turn(1) + _turn(2) + _turn(3)
+    budget = estimate_messages_tokens(_turn(3)) + estimate_messages_tokens(_turn(2))
+
+    kept = trim_to_budget(messages, budget)
+
+    assert kept == _turn(2) + _turn(3)
+
+
+def test_trim_to_budget_always_keeps_latest_turn():
+    messages = _turn(1) + _turn(2, size=10_000)
+
+    assert trim_to_budget(messages, 10) == _turn(2, size=10_000)
+
+
+def test_build_model_messages_includes_summary(monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_CONTEXT_TOKEN_BUDGET", 100_000)
+
+    messages, tokens = build_model_messages(_turn(1), "Recruiter asked about job 7.")
+
+    assert "SUMMARY OF EARLIER CONVERSATION" in messages[0].content
+    assert "job 7" in messages[0].content
+    assert messages[1:] == _turn(1)
+    assert tokens == estimate_messages_tokens(messages)
+
+
+def test_needs_summary_ignores_folded_messages(monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_SUMMARY_TRIGGER_TOKENS", 100)
+    history = [_stored(i, "user", "x" * 200) for i in range(1, 4)]
+
+    assert needs_summary(history, None)
+    assert not needs_summary(history, summary_message_id=2)
+
+
+def test_select_foldable_never_splits_a_turn(monkeypatch):
+    monkeypatch.setattr(settings, "CHAT_SUMMARY_KEEP_TOKENS", 60)
+    pending = [
+        _stored(1, "user", "a" * 100),
+        _stored(2, "assistant", "b" * 100),
+        _stored(3, "user", "c" * 100),
+        _stored(4, "assistant", "d" * 100),
+    ]
+
+    folded = ConversationSummarizer()._select_foldable(pending)
+
+    # Only the last message fits the keep budget; the cut moves back to its user message
+    assert [m.id for m in folded] == [1, 2]
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.llm_scheduler import LLMScheduler, Priority
+from app.utils import hedging
+from app.utils.hedging import HedgeBudget, LatencyTracker, hedged
+
+
+@pytest.fixture(autouse=True)
+def scheduler(monkeypatch):
+    scheduler = LLMScheduler(max_concurrency=4, batch_max_slots=1)
+    monkeypatch.setattr(hedging, "llm_scheduler", scheduler)
+    monkeypatch.setattr(hedging, "hedge_budget", HedgeBudget(ratio=0.1, burst=5))
+    return scheduler
+
+
+def _attempts(*delays: float, error: Exception | None = None):
+    """An attempt factory whose n-th call sleeps delays[n] and returns n (or raises `error` first)."""
+    calls = []
+
+    async def attempt():
+        n = len(calls)
+        calls.append(n)
+        await asyncio.sleep(delays[n])
+        if error is not None and n == 0:
+            raise error
+        return n
+
+    return attempt, calls
+
+
+async def test_no_hedge_without_a_delay():
+    attempt, calls = _attempts(0.01)
+
+    assert await hedged(attempt, None, Priority.ANALYSIS) == 0
+    assert calls == [0]
+
+
+async def test_fast_call_is_not_hedged():
+    attempt, calls = _attempts(0.0)
+
+    assert await hedged(attempt, 1.0, Priority.ANALYSIS) == 0
+    assert calls == [0]
+
+
+async def test_slow_call_is_hedged_and_hedge_wins(scheduler):
+    attempt, calls = _attempts(5.0, 0.0)
+
+    assert await hedged(attempt, 0.01, Priority.ANALYSIS) == 1
+    assert calls == [0, 1]
+    await asyncio.sleep(0)
+    assert scheduler._running[Priority.ANALYSIS] == 0  # the hedge's slot was released
+
+
+async def test_failed_attempt_does_not_cancel_the_other():
+    attempt, _ = _attempts(0.02, 0.05, error=RuntimeError("first failed"))
+
+    assert await hedged(attempt, 0.01, Priority.ANALYSIS) == 1
+
+
+async def test_hedge_skipped_without_budget(monkeypatch):
+    monkeypatch.setattr(hedging, "hedge_budget", HedgeBudget(ratio=0.0, burst=0))
+    attempt, calls = _attempts(0.05)
+
+    assert await hedged(attempt, 0.01, Priority.ANALYSIS) == 0
+    assert calls == [0]
+
+
+async def test_hedge_skipped_when_others_are_waiting(scheduler):
+    scheduler.max_concurrency = 0  # no free capacity
+    attempt, calls = _attempts(0.05)
+
+    assert await hedged(attempt, 0.01, Priority.ANALYSIS) == 0
+    assert calls == [0]
+
+
+def test_latency_percentile_needs_samples(monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_HEDGE_MIN_SAMPLES", 10)
+    tracker = LatencyTracker()
+    for seconds in range(1, 10):
+        tracker.observe(seconds)
+    assert tracker.percentile(0.9) is None
+
+    tracker.observe(10)
+    assert tracker.percentile(0.9) == 10
+    assert tracker.percentile(0.5) == 6
+
+
+def test_budget_limits_hedges_to_a_ratio():
+    budget = HedgeBudget(ratio=0.5, burst=1)
+    budget.spend()
+
+    budget.earn()
+    assert not budget.available()
+    budget.earn()
+    assert budget.available()
+    budget.earn()
+    assert budget.tokens == 1  # capped at the burst
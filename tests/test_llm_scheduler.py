@@ -0,0 +1,85 @@
+import asyncio
+
+from app.core.llm_scheduler import LLMScheduler, Priority
+
+
+async def _run_in_order(scheduler: LLMScheduler, calls: list[tuple[Priority, int | None]]) -> list[int]:
+    """Queue `calls` behind a held slot, then release it and return the order they ran in."""
+    order: list[int] = []
+
+    async def call(i: int, priority: Priority, user_id: int | None):
+        async with scheduler.slot(priority, user_id):
+            order.append(i)
+            await asyncio.sleep(0)
+
+    async with scheduler.slot(Priority.INTERACTIVE):
+        tasks = [asyncio.create_task(call(i, p, u)) for i, (p, u) in enumerate(calls)]
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    return order
+
+
+async def test_higher_priority_runs_first():
+    scheduler = LLMScheduler(max_concurrency=1, batch_max_slots=1)
+
+    order = await _run_in_order(
+        scheduler, [(Priority.BATCH, 1), (Priority.ANALYSIS, 1), (Priority.INTERACTIVE, 1)]
+    )
+
+    assert order == [2, 1, 0]
+
+
+async def test_users_alternate_within_a_class():
+    scheduler = LLMScheduler(max_concurrency=1, batch_max_slots=1)
+
+    # User 1 queues three analyses before user 2 queues one
+    order = await _run_in_order(
+        scheduler,
+        [(Priority.ANALYSIS, 1), (Priority.ANALYSIS, 1), (Priority.ANALYSIS, 1), (Priority.ANALYSIS, 2)],
+    )
+
+    assert order == [0, 3, 1, 2]
+
+
+async def test_batch_is_capped():
+    scheduler = LLMScheduler(max_concurrency=4, batch_max_slots=1)
+    release = asyncio.Event()
+
+    async def batch():
+        async with scheduler.slot(Priority.BATCH):
+            await release.wait()
+
+    tasks = [asyncio.create_task(batch()) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    assert scheduler._running[Priority.BATCH] == 1
+    assert scheduler.queued(Priority.BATCH) == 2
+    # Free slots still go to other classes
+    assert scheduler.try_acquire(Priority.INTERACTIVE)
+    scheduler.release(Priority.INTERACTIVE)
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert scheduler._running[Priority.BATCH] == 0
+
+
+async def test_try_acquire_yields_to_waiting_calls():
+    scheduler = LLMScheduler(max_concurrency=1, batch_max_slots=1)
+
+    assert scheduler.try_acquire(Priority.ANALYSIS)
+    assert not scheduler.try_acquire(Priority.ANALYSIS)
+    scheduler.release(Priority.ANALYSIS)
+
+
+async def test_cancelled_waiter_does_not_hold_a_slot():
+    scheduler = LLMScheduler(max_concurrency=1, batch_max_slots=1)
+
+    async with scheduler.slot(Priority.ANALYSIS):
+        waiter = asyncio.create_task(scheduler.slot(Priority.ANALYSIS).__aenter__())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+    assert sum(scheduler._running.values()) == 0
+    async with scheduler.slot(Priority.ANALYSIS):
+        assert scheduler._running[Priority.ANALYSIS] == 1
@@ -0,0 +1,52 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import metrics
+from app.core.config import settings
+from app.core.exceptions import AppException
+from app.core.metrics import MetricsRegistry, _Metric
+from app.utils.utils import error_response
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(metrics.router, prefix="/metrics")
+    app.add_exception_handler(
+        AppException, lambda request, exc: error_response(exc.message, status_code=exc.status_code)
+    )
+    return TestClient(app)
+
+
+def test_metrics_require_the_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-me")
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-me"})
+    assert response.status_code == 200
+    assert "# TYPE" in response.text
+
+
+def test_metrics_closed_without_a_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+
+    assert client.get("/metrics", headers={"Authorization": "Bearer "}).status_code == 401
+
+
+def test_registry_renders_labelled_metrics():
+    registry = MetricsRegistry()
+    registry.counter("jobs_total", "Jobs", ("state",)).labels("done").inc(2)
+    registry.histogram("wait_seconds", "Wait", buckets=(1.0,)).observe(0.5)
+
+    text = registry.render()
+
+    assert 'jobs_total{state="done"} 2' in text
+    assert 'wait_seconds_bucket{le="1.0"} 1' in text
+    assert "wait_seconds_count 1" in text
+
+
+def test_metric_kinds_must_define_children():
+    with pytest.raises(TypeError):
+        _Metric("x", "y")  # type: ignore[abstract]
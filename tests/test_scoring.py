@@ -0,0 +1,72 @@
+from datetime import date
+
+from app.schemas.analysis import CategoryScores, ExperienceItem, Recommendation
+from app.utils.scoring import (
+    build_analysis_result,
+    overall_score,
+    recommendation_for,
+    total_experience_years,
+)
+
+
+def _role(start: int, end: int | None, years: float) -> ExperienceItem:
+    return ExperienceItem(
+        title="Engineer",
+        company="Acme",
+        start_year=start,
+        end_year=end,
+        duration_years=years,
+        match_percentage=50,
+        description="",
+    )
+
+
+def test_experience_years_sum_roles():
+    assert total_experience_years([_role(2015, 2017, 2.5), _role(2018, 2020, 2)]) == 4.5
+    assert total_experience_years([]) == 0.0
+
+
+def test_overlapping_roles_count_once():
+    # Two full-time roles at once over 2019-2020 can't add up to more than two calendar years
+    assert total_experience_years([_role(2019, 2020, 2), _role(2019, 2020, 2)]) == 2
+
+
+def test_current_role_runs_to_this_year():
+    start = date.today().year - 1
+    assert total_experience_years([_role(start, None, 5)]) == 2
+
+
+def test_overall_weights_depend_on_seniority():
+    scores = CategoryScores(experience=100, projects=0, tech=0, education=0)
+
+    assert overall_score(scores, experience_years=1) == 10
+    assert overall_score(scores, experience_years=2) == 50
+
+
+def test_recommendation_thresholds():
+    assert recommendation_for(75) == Recommendation.HIRE
+    assert recommendation_for(74) == Recommendation.CONSIDER
+    assert recommendation_for(50) == Recommendation.CONSIDER
+    assert recommendation_for(49) == Recommendation.REJECT
+
+
+def test_build_analysis_result(llm_output):
+    result = build_analysis_result(llm_output)
+
+    assert result.total_experience_years == 5
+    # Experienced weights: 80*.5 + 60*.1 + 70*.25 + 50*.15
+    assert result.scores.overall == 71
+    assert result.recommendation == Recommendation.CONSIDER
+    assert result.extraction_status.model_dump() == {
+        "personal_info": True,
+        "education": True,
+        "experience": True,
+        "skills": True,
+        "projects": True,
+    }
+
+
+def test_personal_info_needs_a_name_and_contact(llm_output):
+    llm_output.contact.location = None
+
+    assert not build_analysis_result(llm_output).extraction_status.personal_info
@@ -0,0 +1,128 @@
+import time
+
+import jwt
+import pytest
+
+from app.core import security
+from app.core.config import settings
+from app.core.exceptions import TooManyRequestsException, UnauthorizedException
+from app.core.security import (
+    MemoryRevocationStore,
+    PasswordHashExecutor,
+    SQLiteRevocationStore,
+    VerifiedTokenCache,
+    create_access_token,
+    verify_access_token,
+)
+
+
+def test_token_cache_hit_and_lru():
+    cache = VerifiedTokenCache(max_entries=2)
+    exp = time.time() + 60
+    cache.put("a", {"exp": exp})
+    cache.put("b", {"exp": exp})
+    assert cache.get("a") == {"exp": exp}
+
+    cache.put("c", {"exp": exp})  # evicts "b", the least recently used
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_token_cache_never_serves_expired_tokens():
+    cache = VerifiedTokenCache(max_entries=10)
+    cache.put("t", {"exp": time.time() - 1})
+
+    assert cache.get("t") is None
+
+
+def test_token_cache_skips_tokens_without_exp():
+    cache = VerifiedTokenCache(max_entries=10)
+    cache.put("t", {"user_id": 1})
+
+    assert cache.get("t") is None
+
+
+def test_verify_rejects_tampered_token():
+    token = create_access_token({"user_id": 1, "email": "a@example.com"})
+    header, payload, signature = token.split(".")
+
+    with pytest.raises(jwt.InvalidSignatureError):
+        verify_access_token(f"{header}.{payload}.{signature[::-1]}")
+
+
+async def test_saturated_password_executor_sets_retry_after():
+    executor = PasswordHashExecutor(workers=1, max_queue=0)
+    executor.in_flight = 1
+
+    with pytest.raises(TooManyRequestsException) as exc:
+        await executor.run(lambda: None)
+
+    assert exc.value.headers["Retry-After"] == str(settings.ADMISSION_RETRY_AFTER_SECONDS)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path, monkeypatch):
+    if request.param == "memory":
+        store = MemoryRevocationStore()
+    else:
+        store = SQLiteRevocationStore(str(tmp_path / "r.sqlite"), refresh_seconds=60)
+    monkeypatch.setattr(security, "revocations", store)
+    return store
+
+
+async def test_revoked_token_is_rejected(store):
+    token = create_access_token({"user_id": 1, "email": "a@example.com"})
+    payload = verify_access_token(token)  # now also in the token cache
+
+    await security.revoke_token(payload["jti"], payload["exp"])
+
+    with pytest.raises(UnauthorizedException):
+        verify_access_token(token)
+    # Other tokens of the same user are unaffected
+    assert verify_access_token(create_access_token({"user_id": 1, "email": "a@example.com"}))
+
+
+async def test_sqlite_revocation_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / "r.sqlite")
+    worker_a = SQLiteRevocationStore(path, refresh_seconds=60)
+    worker_b = SQLiteRevocationStore(path, refresh_seconds=60)
+
+    await worker_a.revoke("jti-1", time.time() + 60)
+    assert not worker_b.is_revoked("jti-1")  # not refreshed yet
+
+    await worker_b.refresh()
+
+    assert worker_b.is_revoked("jti-1")
+    assert not worker_b.is_revoked("jti-2")
+    # A worker started later loads existing revocations up front
+    assert SQLiteRevocationStore(path, refresh_seconds=60).is_revoked("jti-1")
+
+
+async def test_sqlite_lookups_refresh_in_the_background(tmp_path):
+    path = str(tmp_path / "r.sqlite")
+    worker_a = SQLiteRevocationStore(path, refresh_seconds=0)
+    worker_b = SQLiteRevocationStore(path, refresh_seconds=0)
+    await worker_a.revoke("jti-1", time.time() + 60)
+
+    # The lookup itself never waits on the file: it answers from memory and schedules a refresh
+    assert not worker_b.is_revoked("jti-1")
+    await worker_b._refreshing
+
+    assert worker_b.is_revoked("jti-1")
+
+
+async def test_expired_revocations_are_purged(store):
+    await store.revoke("old", time.time() - 1)
+    await store.revoke("new", time.time() + 60)
+
+    assert not store.is_revoked("old")
+    assert store.is_revoked("new")
+
+
+def test_default_revocation_store_writes_no_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    assert isinstance(security._create_revocation_store(), MemoryRevocationStore)
+    assert not list(tmp_path.iterdir())
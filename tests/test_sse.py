@@ -0,0 +1,30 @@
+from app.utils.sse import TokenCoalescer, sse_frame
+
+
+def test_sse_frame():
+    assert sse_frame({"type": "done"}) == b'data: {"type":"done"}\n\n'
+    assert sse_frame({"type": "done"}, event_id=7) == b'id: 7\ndata: {"type":"done"}\n\n'
+
+
+def test_coalescer_flushes_at_max_bytes():
+    coalescer = TokenCoalescer(window_ms=60_000, max_bytes=10)
+
+    assert coalescer.add("Hello") is None
+    assert coalescer.add(", world") == {"type": "token", "content": "Hello, world"}
+    assert coalescer.flush() is None
+
+
+def test_coalescer_flushes_after_window():
+    coalescer = TokenCoalescer(window_ms=0, max_bytes=1000)
+
+    assert coalescer.add("Hi") == {"type": "token", "content": "Hi"}
+    assert coalescer.poll() is None
+
+
+def test_coalescer_holds_tokens_within_window():
+    coalescer = TokenCoalescer(window_ms=60_000, max_bytes=1000)
+
+    assert coalescer.add("a") is None
+    assert coalescer.add("b") is None
+    assert coalescer.poll() is None
+    assert coalescer.flush() == {"type": "token", "content": "ab"}